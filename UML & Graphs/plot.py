@@ -1,3 +1,4 @@
+import os
 import sys
 import numpy as np
 import matplotlib
@@ -7,6 +8,10 @@ import matplotlib.ticker as ticker
 
 # Change default path 
 # sys.path.append('PROGMOD_')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bench"))
+from complexity import improved_messages, original_messages
+from benchmark import load_results
 
 # Function for formatting file to array of specific variables
 # data = txt file
@@ -31,6 +36,19 @@ def txt_to_variable_array (data, sh_index, var_index):
     return (in_numbers, seperated, vars)
         
 
+# Function for picking one series per algorithm out of benchmark results
+# rows = result rows written by bench/benchmark.py
+# key = column to plot against the cluster size, e.g. messages or time_to_leader
+def results_to_xy (rows, key):
+    series = {}
+    for row in rows:
+        if row["initiator"] == 0 and row["failure"] == "none":
+            series.setdefault(row["algorithm"], {})[row["n"]] = row[key]
+
+    x = sorted(series["original"])
+    return (x, [series["original"][n] for n in x], [series["improved"][n] for n in x])
+
+
 def plotxy (x, y, y2, xlab, ylab, xunit, yunit):
 
 
@@ -55,9 +73,14 @@ def main():
     matplotlib.rcParams['font.serif'] = "Palatino Linotype" # Change default serif font
     matplotlib.rcParams['font.family'] = "serif" # Set default family to serif
 
-    x_num =          [2, 5, 10, 15, 17, 20, 22, 25, 30, 32]
-    y_num_original = [3 ,24, 99, 224, 288, 399, 483, 624, 899, 1023]
-    y_num_improved = [4, 13, 28, 43, 49, 58, 64, 73, 88, 94]
+    if len(sys.argv) > 1:
+        # Measured message counts from a benchmark run: python plot.py results.json
+        x_num, y_num_original, y_num_improved = results_to_xy(load_results(sys.argv[1]), "messages")
+    else:
+        # Exact message counts for an election started by process 0, see src/complexity.py
+        x_num =          np.arange(2, 33)
+        y_num_original = original_messages(x_num)
+        y_num_improved = improved_messages(x_num)
 
 
     plotxy(x_num, y_num_original, y_num_improved, "No. of processes", "No. of messages", "", "")
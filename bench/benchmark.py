@@ -0,0 +1,264 @@
+"""Benchmark election latency and message complexity of the election algorithms.
+
+Sweeps cluster size, initiator, failure pattern and backend, and writes one
+result row per run as JSON and/or CSV.
+
+Usage: python bench/benchmark.py --sizes 5 10 50 --backends sim thread --json results.json
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import resource
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from metrics import ClusterMetrics
+from convergence import ConvergenceMonitor
+from async_bully import AsyncCluster, AsyncProcessImproved, AsyncProcessOriginal, AsyncProcessRaft, AsyncProcessRing
+from chang_roberts import ProcessRing
+from raft_vote import ProcessRaft
+from peer_directory import PeerDirectory
+from network import DISTRIBUTIONS, NetworkModel
+from mailboxes import EPOCH_ALGORITHMS, MAILBOXES
+from scheduler import PoolCluster
+from simulation import SimulatedCluster
+
+ALGORITHMS = {"original": ProcessOriginal, "improved": ProcessImproved, "ring": ProcessRing, "raft": ProcessRaft}
+ASYNC_ALGORITHMS = {"original": AsyncProcessOriginal, "improved": AsyncProcessImproved,
+                    "ring": AsyncProcessRing, "raft": AsyncProcessRaft}
+
+# columns of the result rows, dropped and duplicated stay empty without a network model
+FIELDS = ["backend", "algorithm", "mailbox", "n", "initiator", "failure", "time_to_leader", "timed_out",
+          "messages", *MESSAGE_NAMES.values(), "dropped", "duplicated", "queue_wait_p99", "handler_time_mean",
+          "cpu_time", "peak_rss_kb"]
+
+
+def dead_ids(failure, n, seed):
+    """Ids of the processes that are dead before the election.
+    failure is 'none', 'leader', 'top:K' or 'random:K'"""
+    if failure == "none":
+        return []
+    if failure == "leader":
+        return [n - 1]
+    kind, k = failure.split(":")
+    # process 0 always stays alive
+    k = min(int(k), n - 1)
+    if kind == "top":
+        return list(range(n - k, n))
+    if kind == "random":
+        return random.Random(seed).sample(range(1, n), k)
+    raise ValueError(f"unknown failure pattern {failure}")
+
+
+def run_sim(algorithm, n, initiator, dead, timeout, network=None, mailbox=None):
+    cluster = SimulatedCluster(ALGORITHMS[algorithm], n, network=network, mailbox=mailbox)
+    metrics = ClusterMetrics(cluster.processes)
+    for _id in dead:
+        cluster.kill(_id)
+    monitor = ConvergenceMonitor(cluster.processes)
+    agreed = []  # virtual times at which the processes agreed on a leader
+    monitor.add_callback(lambda leader: agreed.append(cluster.simulator.now))
+    cluster.start_election(initiator)
+    # run to the end so every message is counted, pending state checks may outlive the election
+    end = cluster.run(until=timeout)
+    return agreed[0] if agreed else end, not agreed, cluster.processes, metrics
+
+
+def run_thread(algorithm, n, initiator, dead, timeout, mailbox=None):
+    processes = [ALGORITHMS[algorithm](i) for i in range(n)]
+    peers = PeerDirectory(processes)
+    for process in processes:
+        process.processes = peers
+        if mailbox is not None:
+            process.message_queue = mailbox()
+    metrics = ClusterMetrics(processes)
+    for process in processes:
+        process.start_thread()
+    for _id in dead:
+        processes[_id].kill()
+    monitor = ConvergenceMonitor(processes)
+    start = time.perf_counter()
+    processes[initiator].start_election()
+    leader = monitor.wait(timeout)
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.kill()
+    return elapsed, leader is None, processes, metrics
+
+
+def run_pool(algorithm, n, initiator, dead, timeout):
+    cluster = PoolCluster(ALGORITHMS[algorithm], n)
+    metrics = ClusterMetrics(cluster.processes)
+    cluster.start()
+    for _id in dead:
+        cluster.kill(_id)
+    monitor = ConvergenceMonitor(cluster.processes)
+    start = time.perf_counter()
+    cluster.start_election(initiator)
+    leader = monitor.wait(timeout)
+    elapsed = time.perf_counter() - start
+    cluster.stop()
+    return elapsed, leader is None, cluster.processes, metrics
+
+
+def run_async(algorithm, n, initiator, dead, timeout):
+    async def run():
+        cluster = AsyncCluster(ASYNC_ALGORITHMS[algorithm], n)
+        metrics = ClusterMetrics(cluster.processes)
+        cluster.start()
+        for _id in dead:
+            cluster.kill(_id)
+        # listeners run on the event loop, so the monitor can complete a future directly
+        agreed = asyncio.get_running_loop().create_future()
+        monitor = ConvergenceMonitor(cluster.processes)
+        monitor.add_callback(lambda leader: agreed.done() or agreed.set_result(leader))
+        start = time.perf_counter()
+        cluster.start_election(initiator)
+        timed_out = False
+        try:
+            await asyncio.wait_for(agreed, timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+        elapsed = time.perf_counter() - start
+        await cluster.stop()
+        return elapsed, timed_out, cluster.processes, metrics
+    return asyncio.run(run())
+
+
+BACKENDS = {"sim": run_sim, "thread": run_thread, "pool": run_pool, "async": run_async}
+
+
+def benchmark(backend, algorithm, n, initiator, failure, seed=0, timeout=30, network=None, mailbox="fifo"):
+    """Run one election and return its result row.
+    network holds NetworkModel arguments, only the sim backend models the network.
+    mailbox names the message queue, only the sim and thread backends running a bully
+    algorithm can replace theirs"""
+    dead = dead_ids(failure, n, seed)
+    options = {}
+    if mailbox != "fifo":
+        if backend not in ("sim", "thread"):
+            raise ValueError(f"the {backend} backend can not use the {mailbox} mailbox")
+        if algorithm not in EPOCH_ALGORITHMS:
+            raise ValueError(f"the {mailbox} mailbox orders bully epochs, not the payloads of {algorithm}")
+        options["mailbox"] = MAILBOXES[mailbox]
+    cpu_start = time.process_time()
+    if network is not None and backend == "sim":
+        # a fresh model per run, so every run sees the same random numbers
+        model = NetworkModel(seed, **network)
+        time_to_leader, timed_out, processes, metrics = run_sim(algorithm, n, initiator, dead, timeout, model,
+                                                                **options)
+    else:
+        model = None
+        time_to_leader, timed_out, processes, metrics = BACKENDS[backend](algorithm, n, initiator, dead, timeout,
+                                                                          **options)
+    row = {
+        "backend": backend,
+        "algorithm": algorithm,
+        "mailbox": mailbox,
+        "n": n,
+        "initiator": initiator,
+        "failure": failure,
+        "time_to_leader": time_to_leader,
+        "timed_out": timed_out,
+        "messages": sum(process.messages.value() for process in processes),
+    }
+    snapshot = metrics.snapshot()
+    for name, count in snapshot["sent"].items():
+        row[name] = count
+    if model is not None:
+        row["dropped"] = model.dropped
+        row["duplicated"] = model.duplicated
+    row["queue_wait_p99"] = snapshot["queue_wait"]["p99"]
+    row["handler_time_mean"] = snapshot["handler_time"]["mean"]
+    row["cpu_time"] = time.process_time() - cpu_start
+    # peak of the whole benchmark process so far, run sizes in increasing order to attribute it
+    row["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return row
+
+
+def load_results(path):
+    """Load result rows written by this script, from JSON or CSV"""
+    with open(path, newline="") as file:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(file))
+            for row in rows:
+                for key in ("n", "initiator", "messages", "peak_rss_kb", *MESSAGE_NAMES.values()):
+                    row[key] = int(row[key])
+                row["timed_out"] = row["timed_out"] == "True"
+                for key in ("dropped", "duplicated"):
+                    # empty without a network model, like the missing keys of JSON rows
+                    if row.get(key):
+                        row[key] = int(row[key])
+                    else:
+                        row.pop(key, None)
+                for key in ("time_to_leader", "queue_wait_p99", "handler_time_mean", "cpu_time"):
+                    row[key] = float(row[key])
+            return rows
+        return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10, 20, 50, 100])
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["sim"])
+    parser.add_argument("--mailbox", choices=MAILBOXES, default="fifo",
+                        help="message queue of the sim and thread backends, other than fifo only for bully algorithms")
+    parser.add_argument("--initiators", type=int, nargs="+", default=[0],
+                        help="initiator ids, skipped for clusters that are too small")
+    parser.add_argument("--failures", nargs="+", default=["none"],
+                        help="failure patterns: none, leader, top:K or random:K")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--latency", type=float, help="model the network of the sim backend with this link latency")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability that a message is lost")
+    parser.add_argument("--duplicate", type=float, default=0.0, help="probability that a message arrives twice")
+    parser.add_argument("--reorder", type=float, default=0.0, help="probability that a message is held back")
+    parser.add_argument("--json", help="write results as JSON to this file")
+    parser.add_argument("--csv", help="write results as CSV to this file")
+    args = parser.parse_args()
+    if args.mailbox != "fifo" and not set(args.algorithms) <= set(EPOCH_ALGORITHMS):
+        parser.error(f"--mailbox {args.mailbox} needs --algorithms from {', '.join(EPOCH_ALGORITHMS)}")
+    network = None
+    if args.latency is not None:
+        network = {"latency": args.latency, "jitter": args.jitter, "distribution": args.distribution,
+                   "drop": args.drop, "duplicate": args.duplicate, "reorder": args.reorder}
+
+    rows = []
+    for backend in args.backends:
+        for algorithm in args.algorithms:
+            for n in args.sizes:
+                for failure in args.failures:
+                    dead = dead_ids(failure, n, args.seed)
+                    for initiator in args.initiators:
+                        if initiator >= n or initiator in dead:
+                            continue
+                        row = benchmark(backend, algorithm, n, initiator, failure, args.seed, args.timeout, network,
+                                        args.mailbox)
+                        rows.append(row)
+                        print(f"{backend:<7}{algorithm:<10}n={n:<7}initiator={initiator:<5}{failure:<10}"
+                              f"{row['messages']:>10} msgs{row['time_to_leader']:>10.3f} s"
+                              f"{' timed out' if row['timed_out'] else ''}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(rows, file, indent=1)
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    if not args.json and not args.csv:
+        json.dump(rows, sys.stdout, indent=1)
+
+
+if __name__ == "__main__":
+    main()
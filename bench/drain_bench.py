@@ -0,0 +1,77 @@
+"""Throughput of one process receiving many OKs, handled one by one or in batches.
+
+A coordinator-like process gets the OKs of many concurrent senders, as when every
+other process answers its ELECTION. The one-by-one mailbox gets every message with
+its own Queue.get call, the batch mailbox drains all pending messages at once.
+
+Usage: python bench/drain_bench.py --senders 1 10 100 --messages 100000
+"""
+import argparse
+import os
+import sys
+import time
+from queue import Queue
+from threading import Event, Thread
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from types_ import *
+from batch_mailbox import BatchMailbox
+from bully_orginal import ProcessOriginal
+
+
+class SingleMailbox(Queue):
+    """queue.Queue that hands out one message per batch, like state_machine did before batching"""
+
+    def get_batch(self, timeout=None):
+        return [self.get(timeout=timeout)]
+
+
+MAILBOXES = {"single": SingleMailbox, "batch": BatchMailbox}
+
+
+def flood(process, sender_id, count):
+    """Send count OKs to process"""
+    for _ in range(count):
+        process.enqueue_message(sender_id, OK, 0)
+
+
+def run(mailbox_cls, senders, messages):
+    """Messages per second handled by one process receiving OKs from `senders` threads"""
+    process = ProcessOriginal(0)
+    process.processes = [process]
+    process.message_queue = mailbox_cls()
+    # the coordinator message sent after all OKs marks the end of the run
+    done = Event()
+    process.listeners.append(lambda process: done.set())
+    process.start_thread()
+    per_sender = messages // senders
+    threads = [Thread(target=flood, args=(process, i + 1, per_sender)) for i in range(senders)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    process.enqueue_message(senders + 1, I_AM_COORDINATOR, 0)
+    done.wait()
+    elapsed = time.perf_counter() - start
+    process.kill()
+    assert process.oks == per_sender * senders
+    return per_sender * senders / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--senders", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'senders':<10}" + "".join(f"{name + ' msg/s':>16}" for name in MAILBOXES) + f"{'speedup':>10}")
+    for senders in args.senders:
+        rates = {name: max(run(mailbox_cls, senders, args.messages) for _ in range(args.repeat))
+                 for name, mailbox_cls in MAILBOXES.items()}
+        print(f"{senders:<10}" + "".join(f"{rate:>16.0f}" for rate in rates.values())
+              + f"{rates['batch'] / rates['single']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
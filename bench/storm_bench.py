@@ -0,0 +1,79 @@
+"""Election storms: all or some followers start an election when the coordinator dies.
+
+Reports message amplification, inbox high-water marks and time to leader of both
+bully algorithms on the simulator, see src/storm.py. With --service-time messages queue
+at busy processes, --mailbox compares FIFO inboxes with the priority mailbox.
+
+Usage: python bench/storm_bench.py --sizes 100 1000 --initiators 1.0 0.1 --jitter 0 0.01
+       python bench/storm_bench.py --sizes 100 --jitter 0.5 --service-time 0.03 --mailbox fifo priority
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from mailboxes import MAILBOXES
+from storm import run_storm
+
+ALGORITHMS = {"original": ProcessOriginal, "improved": ProcessImproved}
+
+
+def initiators_arg(value):
+    """A fraction of the live processes if it contains a dot, else a count"""
+    return float(value) if "." in value else int(value)
+
+
+def fmt(value, spec):
+    """Format value with spec, "-" for the None of a storm that did not converge or has no baseline"""
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--initiators", type=initiators_arg, nargs="+", default=[1.0],
+                        help="fractions (1.0) or counts (10) of the live processes that start an election")
+    parser.add_argument("--jitter", type=float, nargs="+", default=[0.0],
+                        help="elections start uniformly within this many seconds")
+    parser.add_argument("--failed", type=int, default=1, help="number of highest processes that die")
+    parser.add_argument("--latency", type=float, default=0.001)
+    parser.add_argument("--mailbox", nargs="+", choices=MAILBOXES, default=["fifo"],
+                        help="inbox of the processes, fifo handles messages as they arrive")
+    parser.add_argument("--service-time", type=float, default=0.0,
+                        help="seconds a process is busy handling one message")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    rows = []
+    for algorithm in args.algorithms:
+        for n in args.sizes:
+            for initiators in args.initiators:
+                for jitter in args.jitter:
+                    for mailbox in args.mailbox:
+                        start = time.perf_counter()
+                        # fifo is the plain simulated inbox, it queues messages once there is a service time
+                        row = run_storm(ALGORITHMS[algorithm], n, initiators, jitter, args.failed,
+                                        args.latency, args.seed,
+                                        mailbox=None if mailbox == "fifo" else MAILBOXES[mailbox],
+                                        service_time=args.service_time)
+                        row["wall_time"] = time.perf_counter() - start
+                        rows.append(row)
+                        print(f"{algorithm:<10}n={n:<7}initiators={row['initiators']:<7}jitter={jitter:<7}{mailbox:<9}"
+                              f"{row['messages']:>10} msgs{fmt(row['amplification'], '.2f'):>8}x"
+                              f"{row['inbox_high_water']:>8} inbox{fmt(row['time_to_leader'], '.3f'):>9} s", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(rows, file, indent=1)
+    else:
+        json.dump(rows, sys.stdout, indent=1)
+
+
+if __name__ == "__main__":
+    main()
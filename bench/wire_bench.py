@@ -0,0 +1,48 @@
+"""Microbenchmark of the binary wire format against pickle and JSON.
+
+Usage: python bench/wire_bench.py [--messages N]
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from types_ import *
+import wire
+
+
+def bench(name, encode, decode, messages, repeat):
+    """Time encoding and decoding of all messages one by one"""
+    encoded = [encode(message) for message in messages]
+    encode_time = min(timeit.repeat(lambda: [encode(message) for message in messages], number=1, repeat=repeat))
+    decode_time = min(timeit.repeat(lambda: [decode(data) for data in encoded], number=1, repeat=repeat))
+    size = sum(len(data) for data in encoded) / len(encoded)
+    print(f"{name:<14}{size:>10.1f}{encode_time / len(messages) * 1e9:>14.0f}{decode_time / len(messages) * 1e9:>14.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    types = [ELECTION, OK, I_AM_COORDINATOR, YOU_ARE_COORDINATOR]
+    messages = [(types[i % len(types)], i, i // 100) for i in range(args.messages)]
+
+    print(f"{'format':<14}{'bytes/msg':>10}{'encode ns/msg':>14}{'decode ns/msg':>14}")
+    bench("wire", lambda m: wire.encode(*m), lambda d: wire.decode(d)[:3], messages, args.repeat)
+    bench("pickle", pickle.dumps, pickle.loads, messages, args.repeat)
+    bench("json", lambda m: json.dumps(m).encode(), json.loads, messages, args.repeat)
+
+    # batch encoding amortizes the per-call overhead over all messages
+    batch_time = min(timeit.repeat(lambda: wire.encode_batch(messages), number=1, repeat=args.repeat))
+    buffer = wire.encode_batch(messages)
+    unbatch_time = min(timeit.repeat(lambda: list(wire.decode_batch(buffer)), number=1, repeat=args.repeat))
+    print(f"{'wire batch':<14}{len(buffer) / len(messages):>10.1f}"
+          f"{batch_time / len(messages) * 1e9:>14.0f}{unbatch_time / len(messages) * 1e9:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
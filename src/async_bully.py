@@ -0,0 +1,137 @@
+import asyncio
+import time
+from types_ import *
+from peer_directory import PeerDirectory
+from event_trace import KILL
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from chang_roberts import ProcessRing
+from raft_vote import ProcessRaft
+
+TIMEOUT = None  # queue sentinel put by the deadline timer
+
+
+class AsyncProcess:
+    """Mixin that runs the state machine of a process as a coroutine instead of a thread.
+    Must be created inside a running event loop"""
+
+    def __init__(self, _id):
+        super().__init__(_id)
+        self.loop = asyncio.get_running_loop()
+        self.message_thread = None
+        self.message_queue = asyncio.Queue()
+        self.clock = self.loop.time
+        self.task = None
+        self.timer = None  # deadline timer handle
+        self.timer_deadline = None
+
+    def start_thread(self):
+        """Start the state machine task"""
+        self.task = self.loop.create_task(self.state_machine())
+
+    def kill(self):
+        """Kill the process and cancel its task"""
+        if self.tracer is not None:
+            self.tracer.record(self.clock(), self._id, KILL, state=self.state)
+        self.set_state(DEAD)
+        self.stop_worker.set()
+        self.notify_listeners()
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.task is not None:
+            self.task.cancel()
+
+    def enqueue_message(self, sender_id, msg_type, payload=None):
+        """Enqueue message to be processed by the state machine"""
+        self.messages.add()
+        if self.metrics is None:
+            if payload is None:
+                self.message_queue.put_nowait((msg_type, sender_id))
+            else:
+                self.message_queue.put_nowait((msg_type, sender_id, payload))
+        else:
+            self.message_queue.put_nowait((msg_type, sender_id, payload, time.perf_counter()))
+
+    def start_election(self):
+        """Start an election and arm the timer for the WAITING_FOR_OK threshold"""
+        super().start_election()
+        self.arm_timer()
+
+    def arm_timer(self):
+        """Arm the timer at the next deadline of the process, replacing an earlier one"""
+        deadline = self.next_deadline()
+        if deadline is None or deadline == self.timer_deadline or self.stop_worker.is_set():
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer_deadline = deadline
+        self.timer = self.loop.call_at(deadline, self.on_timer)
+
+    def on_timer(self):
+        """Wake the state machine to check its state"""
+        self.timer = None
+        self.timer_deadline = None
+        self.message_queue.put_nowait(TIMEOUT)
+
+    async def state_machine(self):
+        """State machine for process. Worker coroutine"""
+        while not self.stop_worker.is_set():
+            message = await self.message_queue.get()
+            if message is TIMEOUT:
+                self.check_state()
+            else:
+                self.dispatch(message)
+            self.arm_timer()
+
+
+class AsyncProcessOriginal(AsyncProcess, ProcessOriginal):
+    """Original bully process running as a coroutine"""
+
+
+class AsyncProcessImproved(AsyncProcess, ProcessImproved):
+    """Improved bully process running as a coroutine"""
+
+
+class AsyncProcessRing(AsyncProcess, ProcessRing):
+    """Chang-Roberts ring process running as a coroutine"""
+
+
+class AsyncProcessRaft(AsyncProcess, ProcessRaft):
+    """Raft-style voting process running as a coroutine"""
+
+
+class AsyncCluster:
+    """Hosts N async processes as coroutines in one event loop.
+    Must be created inside a running event loop"""
+
+    def __init__(self, process_cls, n):
+        self.processes = [process_cls(i) for i in range(n)]
+        peers = PeerDirectory(self.processes)
+        for process in self.processes:
+            process.processes = peers
+
+    def start(self):
+        """Start the state machine task of all processes"""
+        for process in self.processes:
+            process.start_thread()
+
+    def start_election(self, _id):
+        """Start an election at process with id _id"""
+        self.processes[_id].start_election()
+
+    def kill(self, _id):
+        """Kill process with id _id"""
+        self.processes[_id].kill()
+
+    async def stop(self):
+        """Kill all processes and wait for their tasks to finish"""
+        for process in self.processes:
+            process.kill()
+        await asyncio.gather(*(process.task for process in self.processes if process.task is not None),
+                             return_exceptions=True)
+
+    @property
+    def msg_count(self):
+        """Total number of messages sent in the cluster"""
+        return sum(process.messages.value() for process in self.processes)
@@ -0,0 +1,51 @@
+from collections import deque
+from queue import Empty
+from threading import Condition, Lock
+
+
+class BatchMailbox:
+    """Message queue of a process that hands out every pending message at once.
+    Producers append to a buffer under a lock, the consumer swaps the buffer for an
+    empty one and handles the messages without touching the lock again. The consumer
+    is only notified when the buffer goes from empty to non-empty"""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.not_empty = Condition(self.lock)
+        self.messages = deque()
+
+    def put(self, message):
+        """Enqueue message, None only wakes the consumer"""
+        with self.lock:
+            self.messages.append(message)
+            if len(self.messages) == 1:
+                self.not_empty.notify()
+
+    def get_batch(self, timeout=None):
+        """Remove and return all pending messages, waiting up to timeout for the first one.
+        Raises Empty if none arrived in time"""
+        with self.lock:
+            if not self.messages and not self.not_empty.wait_for(lambda: self.messages, timeout):
+                raise Empty
+            messages = self.messages
+            self.messages = deque()
+        return messages
+
+    def get(self, timeout=None):
+        """Remove and return the oldest message, waiting up to timeout for it"""
+        with self.lock:
+            if not self.messages and not self.not_empty.wait_for(lambda: self.messages, timeout):
+                raise Empty
+            return self.messages.popleft()
+
+    def get_nowait(self):
+        """Remove and return the oldest message without waiting"""
+        return self.get(timeout=0)
+
+    def empty(self):
+        """Check if there are no pending messages"""
+        return not self.messages
+
+    def qsize(self):
+        """Number of pending messages"""
+        return len(self.messages)
@@ -1,136 +1,196 @@
 # from enum import Enum
 # from dataclasses import dataclass
-from threading import Event, Thread
-from queue import Empty, Queue
-import time
 from types_ import *
+from process_base import ProcessBase
 
 
-class ProcessImproved:
+class ProcessImproved(ProcessBase):
     """Processes in the system"""
 
     def __init__(self, _id):
-        self.message_thread = Thread(target=self.state_machine, daemon=True)
-        self.stop_worker = Event()
-        self.message_queue = Queue()  # tuple[sender_id, type]
-        self._id = _id
-        self.state = NORMAL  # initial state
-        self.processes = []
+        super().__init__(_id)
         self.oks = 0  # vector oks: Each entry is an id corresponding to a OK from that process
         self.coordinator_msg_sent = False
         self.election_msg_sent = False
-        self.msg_count = 0  # number of messages sent, metric for performance
         # Improved bully attributes
         self.election_in_progess = False
         self.current_coordinator = -1
-        self.election_start_time = 0
+        self.epoch = 0  # election round, sent with every message so that stale messages can be dropped
+        self.decided_epoch = -1  # latest epoch whose coordinator is known
+        # time to wait for I_AM_COORDINATOR after an OK, the coordinator itself may wait threshold first
+        self.coordinator_timeout = 2 * THRESHOLD
+        self.coordinator_wait_start = 0
+        self.coordinator_wait_epoch = -1  # epoch of the election the process waits for a coordinator of
+        self.suspected = set()  # ids of processes believed dead, a process follows no suspected coordinator
+
+    def get_coordinator(self):
+        """Get the coordinator this process currently agrees on, None during an election"""
+        if self.state == COORDINATOR:
+            return self._id if self.coordinator_msg_sent else None
+        if self.state == NORMAL and self.current_coordinator >= 0:
+            return self.current_coordinator
+        return None
+
+    def handle_message(self, process_id, msg_type, payload=None):
+        """"Handle message from another process, payload is the epoch of the sender"""
+        # messages from transports without payload belong to the current epoch
+        epoch = self.epoch if payload is None else payload
+        if epoch > self.epoch:
+            # join the newer election
+            self.epoch = epoch
 
-    def start_thread(self):
-        """Start the message handler thread"""
-        self.message_thread.start()
-
-    def kill(self):
-        """Kill the process by setting state and stopiing worker thread"""
-        self.state = DEAD
-        self.stop_worker.set()
-
-    def get_id(self):
-        """Get process id"""
-        return self._id
-
-    def get_process(self, _id):
-        """Get process object by id"""
-        return self.processes[_id]
-
-    def enqueue_message(self, sender_id, msg_type):
-        """Enqueue message to be processed by the state machine"""
-        self.msg_count += 1
-        self.message_queue.put((msg_type, sender_id))
-
-    def message_handler(self, process_id, msg_type):
-        """"Handle message from another process"""
         # respond to election message by sending OK
         if msg_type == ELECTION:
             process = self.get_process(process_id)
-            process.enqueue_message(self._id, OK)
-            self.election_in_progess = True
+            # stale elections are answered too, the OK tells the sender about the newer epoch
+            self.send(process, OK, self.epoch)
+            if epoch < self.epoch:
+                return
+            if self.decided_epoch == self.epoch:
+                # the coordinator elected in this epoch is suspected, elect again
+                if self.state != COORDINATOR and self.current_coordinator in self.suspected:
+                    self.start_election()
+            else:
+                self.election_in_progess = True
+
+        # drop OK and coordinator messages of earlier elections
+        elif epoch < self.epoch:
+            return
 
         # respond to OK message by incrementing OK count
         elif msg_type == OK:
             self.oks += 1
+            self.sample_rtt()
             if process_id > self.current_coordinator:
                 self.current_coordinator = process_id
 
+        # a lower process may not lead while this process is alive, take over in a new epoch
+        elif msg_type == I_AM_COORDINATOR and process_id < self._id:
+            self.bully_back()
+
+        # a higher coordinator of this epoch is already known
+        elif (msg_type == I_AM_COORDINATOR and self.decided_epoch == self.epoch
+              and process_id < self.current_coordinator):
+            pass
+
         # accept coordinator message and do nothing
         elif msg_type == I_AM_COORDINATOR:
+            self.suspected.discard(process_id)
             self.current_coordinator = process_id
-            self.state = NORMAL
+            self.decided_epoch = self.epoch
+            self.set_state(NORMAL)
             self.election_in_progess = False
+            self.notify_listeners()
 
         elif msg_type == YOU_ARE_COORDINATOR:
-            self.start_election()   #perform cross check
-
-    def state_machine(self):
-        """State machine for process. Worker method"""
-        # try to get message from queue, if empty, check state and do something
-        while not self.stop_worker.is_set():
-            try:
-                msg_type, process_id = self.message_queue.get(timeout=1)
-
-            except Empty:
-                # if state is NORMAL, do nothing
-                if self.state == NORMAL or self.state == WAITING_FOR_COORDINATOR:
-                    pass
-                # if state is COORDINATOR, send coordinator message to all processes if not already sent
-                elif self.state == COORDINATOR:
-                    if not self.coordinator_msg_sent:
-                        self.send_coordinator()
-                # if state is WAITING_FOR_OK, check if OK count is > 0, if so, change state to NORMAL, else send coordinator message
-                # TODO: Maybe this is superfluous, since we change state to NORMAL when we receive OK message but this is not ideal
-                elif self.state == WAITING_FOR_OK:
-                    # Threshold calculation
-                    time_passed = time.time() - self.election_start_time
-                    time_expired = time_passed > THRESHOLD
-
-                    # Pick new coordinator
-                    if self.oks == len(self.processes)-self._id+1 or time_expired:      
-
-                        # if process has not received any oks, and time has expired, then itself becomes coordinator
-                        if self.oks == 0:
-                            self.current_coordinator = self._id
-                            self.state = COORDINATOR
-
-                        else:
-                            # get the new coordinator object
-                            new_coordinator = self.get_process(
-                                self.current_coordinator)
-                            # tell coordinator that it is the new coordinator
-                            new_coordinator.enqueue_message(
-                                self._id, YOU_ARE_COORDINATOR)
-                            self.state = WAITING_FOR_COORDINATOR
-
-                        self.oks = 0
-            # if message queue is not empty, handle message
-            else:
-                self.message_handler(process_id, msg_type)
+            if self.decided_epoch != self.epoch:
+                self.start_election()   #perform cross check
+            elif self.state == COORDINATOR:
+                # cross checked already in this epoch, only tell the sender
+                self.send(self.get_process(process_id), I_AM_COORDINATOR, self.epoch)
+
+    def handle_deadline(self):
+        """Check state when the next deadline is reached"""
+        # if state is NORMAL, do nothing
+        if self.state == NORMAL:
+            pass
+        # the process that answered died before announcing itself, elect again
+        elif self.state == WAITING_FOR_COORDINATOR:
+            if self.coordinator_timed_out():
+                self.start_election()
+        # if state is COORDINATOR, send coordinator message to all processes if not already sent
+        elif self.state == COORDINATOR:
+            if not self.coordinator_msg_sent:
+                self.send_coordinator()
+        # if state is WAITING_FOR_OK, check if OK count is > 0, if so, change state to NORMAL, else send coordinator message
+        # TODO: Maybe this is superfluous, since we change state to NORMAL when we receive OK message but this is not ideal
+        elif self.state == WAITING_FOR_OK:
+            # Threshold calculation
+            # compared like next_deadline, so the check at the deadline always sees it expired
+            time_expired = self.clock() >= self.election_start_time + self.threshold
+
+            # Pick new coordinator
+            if self.oks == len(self.get_peers().higher(self._id)) or time_expired:      
+
+                # if process has not received any oks, and time has expired, then itself becomes coordinator
+                if self.oks == 0:
+                    self.current_coordinator = self._id
+                    self.set_state(COORDINATOR)
+
+                else:
+                    # get the new coordinator object
+                    new_coordinator = self.get_process(
+                        self.current_coordinator)
+                    # tell coordinator that it is the new coordinator
+                    self.send(new_coordinator, YOU_ARE_COORDINATOR, self.epoch)
+                    self.wait_for_coordinator()
+
+                self.oks = 0
+
+    def next_deadline(self):
+        """Get the time at which check_state has to run next, None if there is nothing to do"""
+        if self.state == COORDINATOR and not self.coordinator_msg_sent:
+            return self.clock()
+        if self.state == WAITING_FOR_COORDINATOR:
+            return self.coordinator_wait_start + self.coordinator_timeout
+        if self.state == WAITING_FOR_OK:
+            if self.oks == len(self.get_peers().higher(self._id)):
+                return self.clock()
+            return self.election_start_time + self.threshold
+        return None
+
+    def wait_for_coordinator(self):
+        """Wait for the announcement of the coordinator, until coordinator_timeout"""
+        self.coordinator_wait_start = self.clock()
+        self.coordinator_wait_epoch = self.epoch
+        self.set_state(WAITING_FOR_COORDINATOR)
+
+    def waiting_in_epoch(self):
+        """Check if the process waits for the coordinator of the current epoch"""
+        return self.state == WAITING_FOR_COORDINATOR and self.coordinator_wait_epoch == self.epoch
+
+    def coordinator_timed_out(self):
+        """Check if the coordinator did not announce itself within coordinator_timeout"""
+        return self.clock() >= self.coordinator_wait_start + self.coordinator_timeout
 
     def send_coordinator(self):
         """Send coordinator message to all processes"""
-        other_processes = [
-            process for process in self.processes if process.get_id() != self._id]
+        other_processes = self.get_peers().others(self._id)
         for process in other_processes:
-            process.enqueue_message(self._id, I_AM_COORDINATOR)
+            self.send(process, I_AM_COORDINATOR, self.epoch)
         self.coordinator_msg_sent = True
+        self.decided_epoch = self.epoch
+        self.notify_listeners()
+
+    def bully_back(self):
+        """A lower process announced itself, elect again in a new epoch.
+        A process that is still electing lets its own election decide"""
+        if self.state in (WAITING_FOR_OK, WAITING_FOR_COORDINATOR):
+            return
+        self.epoch += 1
+        self.start_election()
 
     # Starts an election
-    def start_election(self):
-        """Send election msg to processes with higher id's"""
-        self.election_start_time = time.time()
+    def begin_election(self):
+        """Send election msg to processes with higher id's.
+        A new epoch is started once the election of the current one is decided, or when
+        its coordinator did not announce itself within coordinator_timeout.
+        A process that is waiting for OKs, or for a coordinator that may still announce
+        itself, merges into the running election"""
+        if self.state == WAITING_FOR_OK:
+            return
+        if self.waiting_in_epoch() and not self.coordinator_timed_out():
+            return
+        if self.state == COORDINATOR and not self.coordinator_msg_sent:
+            return
+        if self.decided_epoch == self.epoch or self.waiting_in_epoch():
+            self.epoch += 1
+        self.election_start_time = self.clock()
         self.current_coordinator = self._id
         self.coordinator_msg_sent = False
-        higher_priority_processes = [
-            process for process in self.processes if process.get_id() > self._id]
+        higher_priority_processes = self.get_peers().higher(self._id)
         for process in higher_priority_processes:
-            process.enqueue_message(self._id, ELECTION)
+            self.send(process, ELECTION, self.epoch)
 
-        self.state = WAITING_FOR_OK
+        self.set_state(WAITING_FOR_OK)
+        self.notify_listeners()
@@ -1,120 +1,178 @@
 # from enum import Enum
 # from dataclasses import dataclass
-from threading import Event, Thread
-from queue import Empty, Queue
 from types_ import *
-import time
+from process_base import ProcessBase
 
 
-class ProcessOriginal:
+class ProcessOriginal(ProcessBase):
     """Processes in the system"""
 
     def __init__(self, _id):
-        self.message_thread = Thread(target=self.state_machine, daemon=True)
-        self.stop_worker = Event()
-        self.message_queue = Queue()  # tuple[sender_id, type]
-        self._id = _id
-        self.state = NORMAL  # initial state
-        self.processes = []
+        super().__init__(_id)
         self.oks = 0
         self.coordinator_msg_sent = False
         self.election_msg_sent = False
-        self.msg_count = 0  # number of messages sent, metric for performance
         self.coordinator = None
-        self.election_start_time = 0
-
-    def start_thread(self):
-        """Start the message handler thread"""
-        self.message_thread.start()
-
-    def kill(self):
-        """Kill the process by setting state and stopiing worker thread"""
-        self.state = DEAD
-        self.stop_worker.set()
-
-    def get_id(self):
-        """Get process id"""
-        return self._id
-
-    def get_process(self, _id):
-        """Get process object by id"""
-        return self.processes[_id]
-
-    def enqueue_message(self, sender_id, msg_type):
-        """Enqueue message to be processed by the state machine"""
-        self.msg_count += 1
-        self.message_queue.put((msg_type, sender_id))
+        self.epoch = 0  # election round, sent with every message so that stale messages can be dropped
+        self.decided_epoch = -1  # latest epoch whose coordinator is known
+        # time to wait for I_AM_COORDINATOR after an OK, the coordinator itself may wait threshold first
+        self.coordinator_timeout = 2 * THRESHOLD
+        self.coordinator_wait_start = 0
+        self.coordinator_wait_epoch = -1  # epoch of the election the process waits for a coordinator of
+        self.suspected = set()  # ids of processes believed dead, a process follows no suspected coordinator
+
+    def get_coordinator(self):
+        """Get the coordinator this process currently agrees on, None during an election"""
+        if self.state == COORDINATOR:
+            return self._id if self.coordinator_msg_sent else None
+        if self.state == NORMAL and self.coordinator is not None:
+            return self.coordinator
+        return None
+
+    def handle_message(self, process_id, msg_type, payload=None):
+        """"Handle message from another process, payload is the epoch of the sender"""
+        # messages from transports without payload belong to the current epoch
+        epoch = self.epoch if payload is None else payload
+        if epoch > self.epoch:
+            # join the newer election
+            self.epoch = epoch
+            self.election_msg_sent = False
 
-    def message_handler(self, process_id, msg_type):
-        """"Handle message from another process"""
         # respond to election message by sending OK
         if msg_type == ELECTION:
             process = self.get_process(process_id)
-            process.enqueue_message(self._id, OK)
-            if not self.election_msg_sent:
+            # stale elections are answered too, the OK tells the sender about the newer epoch
+            self.send(process, OK, self.epoch)
+            if epoch < self.epoch:
+                return
+            if self.decided_epoch == self.epoch:
+                # the election of this epoch is over, only tell a late sender its result,
+                # unless the coordinator it elected is suspected
+                if self.state == COORDINATOR:
+                    self.send(process, I_AM_COORDINATOR, self.epoch)
+                elif self.coordinator in self.suspected:
+                    self.start_election()
+            elif not self.election_msg_sent:
                 self.start_election()
                 self.election_msg_sent = True
 
+        # drop OK and coordinator messages of earlier elections
+        elif epoch < self.epoch:
+            return
+
         # respond to OK message by incrementing OK count
         elif msg_type == OK:
             self.oks += 1
+            self.sample_rtt()
+
+        # a lower process may not lead while this process is alive, take over in a new epoch
+        elif msg_type == I_AM_COORDINATOR and process_id < self._id:
+            self.bully_back()
+
+        # a higher coordinator of this epoch is already known
+        elif (msg_type == I_AM_COORDINATOR and self.decided_epoch == self.epoch
+              and self.coordinator is not None and process_id < self.coordinator):
+            pass
 
         # accept coordinator message and do nothing
         elif msg_type == I_AM_COORDINATOR:
-            self.state = NORMAL
+            self.suspected.discard(process_id)
+            self.set_state(NORMAL)
             self.coordinator = process_id
+            self.decided_epoch = self.epoch
             self.election_msg_sent = False
-
-    def state_machine(self):
-        """State machine for process. Worker method"""
-        # try to get message from queue, if empty, check state and do something
-        while not self.stop_worker.is_set():
-            try:
-                msg_type, process_id = self.message_queue.get(timeout=1)
-
-            except Empty:
-                # if state is NORMAL, do nothing
-                if self.state == NORMAL or self.state == WAITING_FOR_COORDINATOR:
-                    pass
-                # if state is COORDINATOR, send coordinator message to all processes if not already sent
-                elif self.state == COORDINATOR:
-                    if not self.coordinator_msg_sent:
-                        self.send_coordinator()
-                # if state is WAITING_FOR_OK, check if OK count is > 0.
-                # If so, change state to NORMAL, else send coordinator message
-                elif self.state == WAITING_FOR_OK:
-                    time_passed = time.time() - self.election_start_time
-                    time_expired = time_passed > THRESHOLD
-
-                    if self.oks > 0:
-                        self.oks = 0
-                        self.state = WAITING_FOR_COORDINATOR
-                    elif time_expired:
-                        self.send_coordinator()
-                    else:
-                        pass
-
-            # if message queue is not empty, handle message
+            self.notify_listeners()
+
+    def handle_deadline(self):
+        """Check state when the next deadline is reached"""
+        # if state is NORMAL, do nothing
+        if self.state == NORMAL:
+            pass
+        # the process that answered died before announcing itself, elect again
+        elif self.state == WAITING_FOR_COORDINATOR:
+            if self.coordinator_timed_out():
+                self.start_election()
+        # if state is COORDINATOR, send coordinator message to all processes if not already sent
+        elif self.state == COORDINATOR:
+            if not self.coordinator_msg_sent:
+                self.send_coordinator()
+        # if state is WAITING_FOR_OK, check if OK count is > 0.
+        # If so, change state to NORMAL, else send coordinator message
+        elif self.state == WAITING_FOR_OK:
+            # compared like next_deadline, so the check at the deadline always sees it expired
+            time_expired = self.clock() >= self.election_start_time + self.threshold
+
+            if self.oks > 0:
+                self.oks = 0
+                self.wait_for_coordinator()
+            elif time_expired:
+                self.send_coordinator()
             else:
-                self.message_handler(process_id, msg_type)
+                pass
+
+    def next_deadline(self):
+        """Get the time at which check_state has to run next, None if there is nothing to do"""
+        if self.state == COORDINATOR and not self.coordinator_msg_sent:
+            return self.clock()
+        if self.state == WAITING_FOR_COORDINATOR:
+            return self.coordinator_wait_start + self.coordinator_timeout
+        if self.state == WAITING_FOR_OK:
+            if self.oks > 0:
+                return self.clock()
+            return self.election_start_time + self.threshold
+        return None
+
+    def wait_for_coordinator(self):
+        """Wait for the announcement of the coordinator, until coordinator_timeout"""
+        self.coordinator_wait_start = self.clock()
+        self.coordinator_wait_epoch = self.epoch
+        self.set_state(WAITING_FOR_COORDINATOR)
+
+    def waiting_in_epoch(self):
+        """Check if the process waits for the coordinator of the current epoch"""
+        return self.state == WAITING_FOR_COORDINATOR and self.coordinator_wait_epoch == self.epoch
+
+    def coordinator_timed_out(self):
+        """Check if the coordinator did not announce itself within coordinator_timeout"""
+        return self.clock() >= self.coordinator_wait_start + self.coordinator_timeout
 
     def send_coordinator(self):
         """Send coordinator message to all processes"""
-        other_processes = [
-            process for process in self.processes if process.get_id() != self._id]
+        other_processes = self.get_peers().others(self._id)
         for process in other_processes:
-            process.enqueue_message(self._id, I_AM_COORDINATOR)
+            self.send(process, I_AM_COORDINATOR, self.epoch)
         self.coordinator_msg_sent = True
-        self.state = COORDINATOR
+        self.decided_epoch = self.epoch
+        self.set_state(COORDINATOR)
+        self.notify_listeners()
+
+    def bully_back(self):
+        """A lower process announced itself, elect again in a new epoch.
+        A process that is still electing lets its own election decide"""
+        if self.state in (WAITING_FOR_OK, WAITING_FOR_COORDINATOR):
+            return
+        self.epoch += 1
+        self.election_msg_sent = False
+        self.start_election()
 
     # Starts an election
-    def start_election(self):
-        """Send election msg to processes with higher id's"""
-        self.election_start_time = time.time()
-        higher_priority_processes = [
-            process for process in self.processes if process.get_id() > self._id]
+    def begin_election(self):
+        """Send election msg to processes with higher id's.
+        A new epoch is started once the election of the current one is decided, or when
+        its coordinator did not announce itself within coordinator_timeout.
+        A process that is waiting for OKs, or for a coordinator that may still announce
+        itself, merges into the running election"""
+        if self.state == WAITING_FOR_OK:
+            return
+        if self.waiting_in_epoch() and not self.coordinator_timed_out():
+            return
+        if self.decided_epoch == self.epoch or self.waiting_in_epoch():
+            self.epoch += 1
+        self.election_start_time = self.clock()
+        higher_priority_processes = self.get_peers().higher(self._id)
         for process in higher_priority_processes:
-            process.enqueue_message(self._id, ELECTION)
+            self.send(process, ELECTION, self.epoch)
 
         self.election_msg_sent = True
-        self.state = WAITING_FOR_OK
\ No newline at end of file
+        self.set_state(WAITING_FOR_OK)
+        self.notify_listeners()
\ No newline at end of file
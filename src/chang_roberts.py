@@ -0,0 +1,117 @@
+from bisect import bisect_right
+from collections import deque
+from types_ import *
+from process_base import ProcessBase
+
+
+class ProcessRing(ProcessBase):
+    """Chang-Roberts (LCR) election on a ring ordered by id.
+    ELECTION carries the highest candidate seen so far and is passed to the successor,
+    the candidate that gets its own id back is the coordinator and sends I_AM_COORDINATOR
+    around the ring. Every hop is acknowledged with OK; a successor that does not
+    acknowledge within threshold is skipped from then on"""
+
+    def __init__(self, _id):
+        super().__init__(_id)
+        self.participant = False
+        self.coordinator = None
+        self.coordinator_msg_sent = False
+        self.unacked = deque()  # [deadline, successor id, type, payload, send time] of forwarded messages
+        self.suspected = set()  # ids of successors that did not acknowledge
+
+    def get_coordinator(self):
+        """Get the coordinator this process currently agrees on, None during an election"""
+        if self.state == COORDINATOR:
+            return self._id if self.coordinator_msg_sent else None
+        if self.state == NORMAL:
+            return self.coordinator
+        return None
+
+    def successor(self):
+        """Next process on the ring that is not suspected, None if there is none"""
+        ids = self.get_peers().ids
+        start = bisect_right(ids, self._id)
+        for i in range(len(ids)):
+            _id = ids[(start + i) % len(ids)]
+            if _id == self._id:
+                return None
+            if _id not in self.suspected:
+                return self.get_process(_id)
+        return None
+
+    def forward(self, msg_type, payload):
+        """Pass a message to the successor and wait for its acknowledgement"""
+        successor = self.successor()
+        if successor is None:
+            # alone on the ring, the message came around
+            self.handle_message(self._id, msg_type, payload)
+            return
+        self.send(successor, msg_type, payload)
+        now = self.clock()
+        self.unacked.append([now + self.threshold, successor.get_id(), msg_type, payload, now])
+
+    def handle_message(self, process_id, msg_type, payload=None):
+        """Handle message from another process"""
+        self.suspected.discard(process_id)
+        # acknowledge the hop
+        if msg_type == OK:
+            for entry in self.unacked:
+                if entry[1] == process_id:
+                    self.unacked.remove(entry)
+                    # acknowledgements are round trips too, adapt the hop timeout to them
+                    if self.rtt is not None:
+                        self.rtt.sample(self.clock() - entry[4])
+                        self.threshold = self.rtt.timeout()
+                    break
+            return
+        if process_id != self._id:
+            self.send(self.get_process(process_id), OK)
+
+        if msg_type == ELECTION:
+            if payload == self._id:
+                # own candidacy came around, announce it
+                self.coordinator = self._id
+                self.set_state(COORDINATOR)
+                self.coordinator_msg_sent = True
+                self.participant = False
+                self.notify_listeners()
+                self.forward(I_AM_COORDINATOR, self._id)
+            elif payload > self._id:
+                self.participant = True
+                self.set_state(ELECTING)
+                self.forward(ELECTION, payload)
+            elif not self.participant:
+                # replace the lower candidate with this process
+                self.begin_election()
+
+        elif msg_type == I_AM_COORDINATOR:
+            # the announcement stops at the coordinator
+            if payload != self._id:
+                self.coordinator = payload
+                self.participant = False
+                self.set_state(NORMAL)
+                self.notify_listeners()
+                self.forward(I_AM_COORDINATOR, payload)
+
+    def handle_deadline(self):
+        """Skip successors that did not acknowledge in time"""
+        now = self.clock()
+        while self.unacked and self.unacked[0][0] <= now:
+            _, successor, msg_type, payload, _ = self.unacked.popleft()
+            self.suspected.add(successor)
+            self.forward(msg_type, payload)
+
+    def next_deadline(self):
+        """Get the time at which check_state has to run next, None if there is nothing to do"""
+        if self.unacked:
+            return self.unacked[0][0]
+        return None
+
+    def begin_election(self):
+        """Send this process as candidate to the successor"""
+        self.election_start_time = self.clock()
+        self.participant = True
+        self.coordinator_msg_sent = False
+        self.set_state(ELECTING)
+        self.notify_listeners()
+        self.forward(ELECTION, self._id)
@@ -0,0 +1,273 @@
+"""Struct-of-arrays cluster for simulating very large elections.
+
+Instead of one Python object per process, every per-process field lives in a NumPy
+column indexed by id, about 28 bytes per process. Messages are kept in flat columns
+shared by all processes, as ranges: an ELECTION to all higher ids or an
+I_AM_COORDINATOR broadcast is one record, and the OKs answering one ELECTION are one
+record holding their number. The cluster runs in synchronous steps. A step delivers
+every message sent in the previous step at once, handled per message type with
+vectorized operations, then checks the timers of all processes once. Messages arrive
+`latency` seconds after they were sent, and the OK timeout is a fixed threshold.
+A process waiting for a coordinator that never announces itself elects again after
+2 * threshold, like coordinator_timeout of the process objects.
+
+The election logic follows bully_orginal.py and bully_improved.py, so single elections
+send the message counts of complexity.py. Epochs are not modelled: a YOU_ARE_COORDINATOR
+reaching a coordinator that already announced itself is answered like one of the
+current epoch. Messages of one step are handled in the order ELECTION, OK,
+I_AM_COORDINATOR, YOU_ARE_COORDINATOR.
+"""
+import numpy as np
+from types_ import *
+
+ALGORITHMS = ("original", "improved")
+
+
+class MessageBuffer:
+    """Flat growable columns of range messages. Record i was sent by node[i] to every id in
+    [lo[i], hi[i]), except for OK records, where count[i] processes replied to node[i] and
+    the highest of them is lo[i]. count[i] is the number of messages of a record"""
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.msg_type = np.zeros(capacity, dtype=np.int8)
+        self.node = np.zeros(capacity, dtype=np.int32)
+        self.lo = np.zeros(capacity, dtype=np.int32)
+        self.hi = np.zeros(capacity, dtype=np.int32)
+        self.count = np.zeros(capacity, dtype=np.int64)
+
+    def append(self, msg_type, node, lo, hi, count):
+        """Append one record per entry of node, the other arguments broadcast against it"""
+        k = len(node)
+        if k == 0:
+            return
+        end = self.size + k
+        if end > len(self.node):
+            capacity = max(end, 2 * len(self.node))
+            for name in ("msg_type", "node", "lo", "hi", "count"):
+                column = getattr(self, name)
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                setattr(self, name, grown)
+        self.msg_type[self.size:end] = msg_type
+        self.node[self.size:end] = node
+        self.lo[self.size:end] = lo
+        self.hi[self.size:end] = hi
+        self.count[self.size:end] = count
+        self.size = end
+
+    def records(self):
+        """Views of the used part of the columns: msg_type, node, lo, hi, count"""
+        return (self.msg_type[:self.size], self.node[:self.size], self.lo[:self.size],
+                self.hi[:self.size], self.count[:self.size])
+
+    def clear(self):
+        """Forget all records, keeping the memory"""
+        self.size = 0
+
+
+class CompactCluster:
+    """n processes with ids 0..n-1 running the original or improved bully algorithm
+    on NumPy columns instead of process objects"""
+
+    def __init__(self, n, algorithm="original", latency=0, threshold=THRESHOLD):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm}")
+        self.n = n
+        self.improved = algorithm == "improved"
+        self.latency = latency
+        self.threshold = threshold
+        self.now = 0.0
+        self.ids = np.arange(n, dtype=np.int32)
+        # per-process fields of ProcessOriginal and ProcessImproved
+        self.state = np.full(n, NORMAL, dtype=np.int8)
+        self.oks = np.zeros(n, dtype=np.int32)
+        self.current_coordinator = np.full(n, -1, dtype=np.int32)  # -1 while unknown
+        # start of the OK timeout, and of the coordinator timeout once the process waits for a coordinator
+        self.election_start_time = np.zeros(n, dtype=np.float64)
+        self.msg_count = np.zeros(n, dtype=np.int64)
+        self.coordinator_msg_sent = np.zeros(n, dtype=bool)
+        self.election_msg_sent = np.zeros(n, dtype=bool)
+        self.election_in_progess = np.zeros(n, dtype=bool)
+        self.outbox = MessageBuffer()  # sent in this step, delivered in the next
+        self.inbox = MessageBuffer()  # being delivered
+        self.steps = 0
+
+    def bytes_per_process(self):
+        """Memory of the per-process columns divided by the number of processes"""
+        columns = (self.state, self.oks, self.current_coordinator, self.election_start_time,
+                   self.msg_count, self.coordinator_msg_sent, self.election_msg_sent, self.election_in_progess)
+        return sum(column.itemsize for column in columns)
+
+    def covered(self, lo, hi):
+        """Number of ranges [lo, hi) that contain each id"""
+        diff = np.bincount(lo, minlength=self.n + 1) - np.bincount(hi, minlength=self.n + 1)
+        return np.cumsum(diff[:self.n])
+
+    def kill(self, ids):
+        """Kill the processes with the given ids"""
+        self.state[ids] = DEAD
+
+    def start_election(self, ids):
+        """Start an election at the processes with the given ids"""
+        self.begin_elections(np.atleast_1d(np.asarray(ids, dtype=np.int32)))
+        self.check_timers()
+
+    def begin_elections(self, ids):
+        """begin_election of every process in ids, processes that are already electing merge"""
+        state = self.state[ids]
+        electing = (state == WAITING_FOR_OK) | (state == WAITING_FOR_COORDINATOR) | (state == DEAD)
+        if self.improved:
+            electing |= (state == COORDINATOR) & ~self.coordinator_msg_sent[ids]
+        ids = ids[~electing]
+        self.election_start_time[ids] = self.now
+        if self.improved:
+            self.current_coordinator[ids] = ids
+            self.coordinator_msg_sent[ids] = False
+        else:
+            self.election_msg_sent[ids] = True
+        self.state[ids] = WAITING_FOR_OK
+        ids = ids[ids < self.n - 1]
+        self.outbox.append(ELECTION, ids, ids + 1, self.n, self.n - 1 - ids)
+
+    def send_coordinators(self, ids):
+        """send_coordinator of every process in ids"""
+        self.outbox.append(I_AM_COORDINATOR, ids, 0, ids, ids)
+        self.outbox.append(I_AM_COORDINATOR, ids, ids + 1, self.n, self.n - 1 - ids)
+        self.coordinator_msg_sent[ids] = True
+        if not self.improved:
+            self.state[ids] = COORDINATOR
+
+    def step(self):
+        """Deliver all messages sent in the previous step, then check the timers"""
+        self.inbox, self.outbox = self.outbox, self.inbox
+        self.outbox.clear()
+        self.now += self.latency
+        self.steps += 1
+        msg_type, node, lo, hi, count = self.inbox.records()
+        # messages are counted by their receivers, dead or alive
+        ok = msg_type == OK
+        self.msg_count += self.covered(lo[~ok], hi[~ok])
+        np.add.at(self.msg_count, node[ok], count[ok])
+        alive = self.state != DEAD
+
+        # every live receiver of an ELECTION answers with OK
+        election = msg_type == ELECTION
+        sender, e_lo, e_hi = node[election], lo[election], hi[election]
+        alive_below = np.concatenate(([0], np.cumsum(alive)))
+        repliers = alive_below[e_hi] - alive_below[e_lo]
+        # highest live id below every index, -1 if there is none
+        highest = np.maximum.accumulate(np.where(alive, self.ids, -1))
+        replied = repliers > 0
+        top = highest[e_hi[replied] - 1]
+        self.outbox.append(OK, sender[replied], top, top + 1, repliers[replied])
+        receivers = (self.covered(e_lo, e_hi) > 0) & alive
+        if self.improved:
+            self.election_in_progess[receivers] = True
+        else:
+            self.begin_elections(np.flatnonzero(receivers & ~self.election_msg_sent).astype(np.int32))
+
+        # count OKs, the improved algorithm remembers the highest process that answered
+        receiver, top, replies = node[ok], lo[ok], count[ok]
+        live = alive[receiver]
+        np.add.at(self.oks, receiver[live], replies[live])
+        if self.improved:
+            np.maximum.at(self.current_coordinator, receiver[live], top[live])
+
+        # accept coordinator messages, later ones win
+        for coordinator, c_lo, c_hi in zip(*(column[msg_type == I_AM_COORDINATOR] for column in (node, lo, hi))):
+            live = alive[c_lo:c_hi]
+            self.state[c_lo:c_hi][live] = NORMAL
+            self.current_coordinator[c_lo:c_hi][live] = coordinator
+            if self.improved:
+                self.election_in_progess[c_lo:c_hi][live] = False
+            else:
+                self.election_msg_sent[c_lo:c_hi][live] = False
+
+        # cross check of the improved algorithm, a coordinator that announced itself only tells the sender
+        you_are = msg_type == YOU_ARE_COORDINATOR
+        sender, target = node[you_are], lo[you_are]
+        announced = (self.state[target] == COORDINATOR) & self.coordinator_msg_sent[target]
+        self.outbox.append(I_AM_COORDINATOR, target[announced], sender[announced], sender[announced] + 1, 1)
+        targets = np.unique(target[~announced])
+        self.begin_elections(targets[alive[targets]])
+
+        self.check_timers()
+
+    def check_timers(self):
+        """check_state of every process"""
+        # the process that answered died before announcing itself, elect again
+        stalled = np.flatnonzero((self.state == WAITING_FOR_COORDINATOR)
+                                 & (self.now >= self.election_start_time + 2 * self.threshold)).astype(np.int32)
+        self.state[stalled] = NORMAL
+        self.begin_elections(stalled)
+
+        waiting = self.state == WAITING_FOR_OK
+        expired = waiting & (self.now >= self.election_start_time + self.threshold)
+        if self.improved:
+            decided = waiting & ((self.oks == self.n - 1 - self.ids) | expired)
+            alone = decided & (self.oks == 0)
+            self.current_coordinator[alone] = self.ids[alone]
+            self.state[alone] = COORDINATOR
+            asking = np.flatnonzero(decided & ~alone).astype(np.int32)
+            target = self.current_coordinator[asking]
+            self.outbox.append(YOU_ARE_COORDINATOR, asking, target, target + 1, 1)
+            self.state[asking] = WAITING_FOR_COORDINATOR
+            self.election_start_time[asking] = self.now
+            self.oks[decided] = 0
+            pending = (self.state == COORDINATOR) & ~self.coordinator_msg_sent
+            self.send_coordinators(np.flatnonzero(pending).astype(np.int32))
+        else:
+            answered = waiting & (self.oks > 0)
+            self.oks[answered] = 0
+            self.state[answered] = WAITING_FOR_COORDINATOR
+            self.election_start_time[answered] = self.now
+            self.send_coordinators(np.flatnonzero(expired & ~answered).astype(np.int32))
+
+    def next_deadline(self):
+        """Earliest OK or coordinator timeout of a waiting process, None if no process is waiting"""
+        waiting = self.state == WAITING_FOR_OK
+        stalled = self.state == WAITING_FOR_COORDINATOR
+        if not waiting.any() and not stalled.any():
+            return None
+        return min(np.min(self.election_start_time[waiting] + self.threshold, initial=np.inf),
+                   np.min(self.election_start_time[stalled] + 2 * self.threshold, initial=np.inf))
+
+    def run(self, until=None):
+        """Step while messages are in flight, and jump to the next timeout when none are.
+        Returns the time at which the run stopped"""
+        while True:
+            if self.outbox.size:
+                if until is not None and self.now + self.latency > until:
+                    break
+                self.step()
+                continue
+            deadline = self.next_deadline()
+            if deadline is None:
+                break
+            if until is not None and deadline > until:
+                self.now = until
+                break
+            self.now = max(deadline, self.now)
+            self.check_timers()
+        return self.now
+
+    def coordinators(self):
+        """Coordinator every process agrees on, like get_coordinator, -1 where there is none"""
+        views = np.where(self.state == NORMAL, self.current_coordinator, -1)
+        own = (self.state == COORDINATOR) & self.coordinator_msg_sent
+        views[own] = self.ids[own]
+        return views
+
+    def leader(self):
+        """Coordinator all live processes agree on, None if they do not agree"""
+        views = self.coordinators()[self.state != DEAD]
+        if len(views) == 0 or views[0] < 0 or not (views == views[0]).all():
+            return None
+        leader = int(views[0])
+        return leader if self.state[leader] != DEAD else None
+
+    @property
+    def total_msg_count(self):
+        """Total number of messages sent in the cluster"""
+        return int(self.msg_count.sum())
@@ -0,0 +1,76 @@
+"""Exact message counts of both bully algorithms, computed with NumPy instead of running a cluster.
+
+The counts follow the implementations in bully_orginal.py and bully_improved.py for an
+election started by one initiator, including the messages sent to dead processes.
+"""
+import numpy as np
+
+
+def original_messages(n, initiator=0, failed=0):
+    """Messages sent by ProcessOriginal in clusters of n processes with ids 0..n-1,
+    when the `failed` highest processes are dead. Arguments broadcast like NumPy arrays"""
+    n, initiator, failed = np.broadcast_arrays(*(np.asarray(a, dtype=np.int64) for a in (n, initiator, failed)))
+    leader = n - 1 - failed
+    if np.any(initiator > leader) or np.any(initiator < 0):
+        raise ValueError("initiator must be an alive process")
+    # every alive process from the initiator up to the new leader starts one election
+    electing = leader - initiator + 1
+    elections = electing * (n - 1) - (initiator + leader) * electing // 2
+    oks = electing * (electing - 1) // 2
+    return elections + oks + (n - 1)
+
+
+def improved_messages(n, initiator=0, failed=0):
+    """Messages sent by ProcessImproved in clusters of n processes with ids 0..n-1,
+    when the `failed` highest processes are dead. Arguments broadcast like NumPy arrays"""
+    n, initiator, failed = np.broadcast_arrays(*(np.asarray(a, dtype=np.int64) for a in (n, initiator, failed)))
+    leader = n - 1 - failed
+    if np.any(initiator > leader) or np.any(initiator < 0):
+        raise ValueError("initiator must be an alive process")
+    elections = n - 1 - initiator
+    oks = leader - initiator
+    # YOU_ARE_COORDINATOR and the cross check election of the new leader, unless the initiator wins
+    cross_check = np.where(oks > 0, 1 + (n - 1 - leader), 0)
+    return elections + oks + cross_check + (n - 1)
+
+
+def _alive_counts(alive):
+    """Per id: number of alive processes with a higher id, and suffix sums used by the models"""
+    alive = np.asarray(alive, dtype=bool)
+    n = len(alive)
+    ids = np.arange(n, dtype=np.int64)
+    # alive_above[i] = number of alive processes with id > i
+    alive_above = np.concatenate((np.cumsum(alive[::-1])[::-1][1:], [0])).astype(np.int64)
+    return alive, n, ids, alive_above
+
+
+def original_messages_alive(alive, initiators=0):
+    """Messages sent by ProcessOriginal for an arbitrary set of dead processes.
+    alive is a boolean mask over ids 0..n-1, initiators an id or an array of ids"""
+    alive, n, ids, alive_above = _alive_counts(alive)
+    initiators = np.asarray(initiators, dtype=np.int64)
+    if not np.all(alive[initiators]):
+        raise ValueError("initiator must be an alive process")
+    # suffix sums over alive processes j >= i of the messages they send when they start an election
+    elections_from = np.where(alive, n - 1 - ids, 0)
+    oks_to = np.where(alive, alive_above, 0)
+    elections_suffix = np.concatenate((np.cumsum(elections_from[::-1])[::-1], [0]))
+    oks_suffix = np.concatenate((np.cumsum(oks_to[::-1])[::-1], [0]))
+    # the initiator and every alive process above it start exactly one election
+    elections = elections_suffix[initiators]
+    oks = oks_suffix[initiators]
+    return elections + oks + (n - 1)
+
+
+def improved_messages_alive(alive, initiators=0):
+    """Messages sent by ProcessImproved for an arbitrary set of dead processes.
+    alive is a boolean mask over ids 0..n-1, initiators an id or an array of ids"""
+    alive, n, ids, alive_above = _alive_counts(alive)
+    initiators = np.asarray(initiators, dtype=np.int64)
+    if not np.all(alive[initiators]):
+        raise ValueError("initiator must be an alive process")
+    leader = ids[alive].max()
+    elections = n - 1 - initiators
+    oks = alive_above[initiators]
+    cross_check = np.where(oks > 0, 1 + (n - 1 - leader), 0)
+    return elections + oks + cross_check + (n - 1)
@@ -0,0 +1,81 @@
+from collections import Counter
+from threading import Condition
+from types_ import *
+
+
+class ConvergenceMonitor:
+    """Tracks the coordinator every live process agrees on and signals when
+    all live processes agree on the same live coordinator"""
+
+    def __init__(self, processes):
+        self.condition = Condition()
+        self.processes = list(processes)
+        self.views = {}  # id of a live process -> coordinator it agrees on
+        self.votes = Counter()  # coordinator -> number of live processes agreeing on it
+        self.leader = None
+        self.callbacks = []
+        with self.condition:
+            for process in self.processes:
+                process.listeners.append(self.update)
+                self.record(process)
+            self.check()
+
+    def record(self, process):
+        """Replace the view of process"""
+        _id = process.get_id()
+        if _id in self.views:
+            old = self.views.pop(_id)
+            self.votes[old] -= 1
+            if self.votes[old] == 0:
+                del self.votes[old]
+        if process.state != DEAD:
+            view = process.get_coordinator()
+            self.views[_id] = view
+            self.votes[view] += 1
+
+    def check(self):
+        """Recompute the agreed leader, returns True if it changed"""
+        leader = None
+        if len(self.votes) == 1:
+            candidate = next(iter(self.votes))
+            if candidate is not None and candidate in self.views:
+                leader = candidate
+        changed = leader != self.leader
+        self.leader = leader
+        if changed:
+            self.condition.notify_all()
+        return changed
+
+    def update(self, process):
+        """Listener called by a process when its coordinator may have changed"""
+        with self.condition:
+            self.record(process)
+            changed = self.check()
+            leader = self.leader
+        if changed and leader is not None:
+            for callback in self.callbacks:
+                callback(leader)
+
+    def add_callback(self, callback):
+        """Call callback(leader) whenever the processes agree on a new leader"""
+        self.callbacks.append(callback)
+
+    def wait(self, timeout=None):
+        """Wait until all live processes agree on a coordinator.
+        Returns its id, or None if the timeout expired first"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.leader is not None, timeout)
+            return self.leader
+
+    def close(self):
+        """Stop listening to the processes"""
+        for process in self.processes:
+            process.listeners.remove(self.update)
+
+
+def wait_for_leader(processes, timeout=None):
+    """Wait until all live processes agree on a coordinator, see ConvergenceMonitor.wait"""
+    monitor = ConvergenceMonitor(processes)
+    leader = monitor.wait(timeout)
+    monitor.close()
+    return leader
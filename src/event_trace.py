@@ -0,0 +1,81 @@
+"""Binary event trace of elections, written to a memory-mapped ring file.
+
+Every record has the same size, so a writer only has to claim a slot number and pack
+its record there. Slots are claimed with next() on an itertools.count, which is atomic
+under the GIL, so writers never take a lock. Once the file is full the oldest records
+are overwritten.
+"""
+from itertools import count
+import mmap
+import struct
+from types_ import *
+
+# time, node, event, peer, msg_type, state, payload
+RECORD = struct.Struct("<diBibbxi")
+HEADER = struct.Struct("<8sIQQ")  # magic, record size, capacity, records written
+HEADER_SIZE = 64
+MAGIC = b"BULLYTRC"
+
+# events, `state` is the state of node when the event happened
+SEND = 0  # node sends a message to peer
+HANDLE = 1  # node handles a message from peer
+STATE = 2  # node changed its state to `state`
+TIMER = 3  # node checks its state at a deadline
+ELECT = 4  # node starts an election
+KILL = 5  # node is killed
+
+EVENT_NAMES = {SEND: "SEND", HANDLE: "HANDLE", STATE: "STATE", TIMER: "TIMER", ELECT: "ELECT", KILL: "KILL"}
+NO_PEER = -1
+NO_PAYLOAD = -1  # messages without payload, payloads are ids or terms
+
+
+class TraceRecorder:
+    """Writes trace records of any number of processes into one ring file"""
+
+    def __init__(self, path, capacity=1 << 20):
+        self.path = path
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * RECORD.size
+        with open(path, "wb") as file:
+            file.truncate(size)
+        self.file = open(path, "r+b")
+        self.buffer = mmap.mmap(self.file.fileno(), size)
+        self.slots = count()
+        self.written = 0
+        self.write_header()
+
+    def write_header(self):
+        """Write the header, including the number of records written so far"""
+        HEADER.pack_into(self.buffer, 0, MAGIC, RECORD.size, self.capacity, self.written)
+
+    def record(self, time, node, event, peer=NO_PEER, msg_type=0, state=0, payload=None):
+        """Write one record into the next free slot"""
+        slot = next(self.slots)
+        RECORD.pack_into(self.buffer, HEADER_SIZE + slot % self.capacity * RECORD.size,
+                         time, node, event, peer, msg_type, state, NO_PAYLOAD if payload is None else payload)
+
+    def attach(self, process):
+        """Trace process"""
+        process.tracer = self
+
+    def close(self):
+        """Write the header and close the file"""
+        # the counter is one past the last claimed slot
+        self.written = next(self.slots)
+        self.write_header()
+        self.buffer.flush()
+        self.buffer.close()
+        self.file.close()
+
+
+def read_trace(path):
+    """Read the records of a closed trace file, oldest first.
+    Returns a list of (time, node, event, peer, msg_type, state, payload) tuples"""
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, record_size, capacity, written = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a trace file")
+    first = max(written - capacity, 0)
+    return [RECORD.unpack_from(data, HEADER_SIZE + slot % capacity * RECORD.size)
+            for slot in range(first, written)]
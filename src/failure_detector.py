@@ -0,0 +1,165 @@
+from collections import deque
+from threading import Event, Lock, Thread
+import math
+import time
+from types_ import *
+
+
+class PhiAccrualDetector:
+    """Phi accrual failure detector of one process (Hayashibara et al.).
+    phi is -log10 of the probability that a heartbeat arrives even later than now,
+    estimated from a normal distribution of the recent heartbeat intervals"""
+
+    def __init__(self, interval=HEARTBEAT_INTERVAL, window=100, min_std=None):
+        self.intervals = deque(maxlen=window)
+        self.total = 0.0  # sum and sum of squares of the intervals in the window
+        self.squares = 0.0
+        self.min_std = interval / 10 if min_std is None else min_std
+        # bootstrap the distribution with the expected interval
+        self.add_interval(interval)
+        self.last = None  # time of the last heartbeat
+
+    def add_interval(self, interval):
+        """Add an interval to the window, dropping the oldest one when it is full"""
+        if len(self.intervals) == self.intervals.maxlen:
+            old = self.intervals.popleft()
+            self.total -= old
+            self.squares -= old * old
+        self.intervals.append(interval)
+        self.total += interval
+        self.squares += interval * interval
+
+    def heartbeat(self, now):
+        """Record a heartbeat received at time now"""
+        if self.last is not None:
+            self.add_interval(now - self.last)
+        self.last = now
+
+    def phi(self, now):
+        """Suspicion level at time now, 0 before the first heartbeat"""
+        if self.last is None:
+            return 0.0
+        count = len(self.intervals)
+        mean = self.total / count
+        std = max(math.sqrt(max(self.squares / count - mean * mean, 0.0)), self.min_std)
+        later = 0.5 * math.erfc((now - self.last - mean) / (std * math.sqrt(2)))
+        # erfc underflows to 0 long after the heartbeats stopped
+        return -math.log10(later) if later > 0 else math.inf
+
+
+def notify_thread(process, coordinator):
+    """Tell a process running its own state machine thread that its coordinator is suspected.
+    The notice goes through its message queue, so the election starts on that thread"""
+    process.message_queue.put((SUSPECT, coordinator))
+
+
+class HeartbeatService:
+    """Failure detection for all processes hosted in one runtime.
+    Every interval each live local coordinator sends a HEARTBEAT message to its peers.
+    Its arrivals at the local followers feed one detector per coordinator shared by all of them,
+    so a heartbeat round is recorded once however many local processes it reaches. When phi of
+    a coordinator crosses phi_threshold, its highest local follower is sent a SUSPECT notice
+    and starts an election from its own state machine"""
+
+    def __init__(self, processes, interval=HEARTBEAT_INTERVAL, phi_threshold=PHI_THRESHOLD,
+                 clock=time.time, suspect=None):
+        self.processes = processes
+        self.local = {process.get_id(): process for process in processes}
+        self.interval = interval
+        self.phi_threshold = phi_threshold
+        self.clock = clock
+        # called with the follower and the suspected coordinator, the clusters pass their own
+        self.suspect = suspect or notify_thread
+        self.detectors = {}  # coordinator id -> PhiAccrualDetector
+        self.rounds = {}  # coordinator id -> latest heartbeat round recorded
+        self.followers = {}  # coordinator id -> ids of the local processes following it
+        self.suspected = set()  # coordinator ids an election has been started for
+        self.leases = []  # LeaderLookups renewed by the heartbeats
+        self.heartbeats = 0  # number of heartbeat messages sent
+        self.round = 0  # number of ticks, the payload of the heartbeats
+        self.lock = Lock()  # guards the detectors, arrivals are recorded on the process threads
+        self.stop_worker = Event()
+        self.thread = Thread(target=self.run, daemon=True)
+        for process in processes:
+            process.heartbeats = self
+            process.listeners.append(self.follow)
+            self.follow(process)
+
+    def follow(self, process):
+        """Listener of the local processes: track the coordinator each one follows.
+        The announcement of a coordinator counts as its first heartbeat"""
+        _id = process.get_id()
+        coordinator = process.get_coordinator()
+        now = self.clock()
+        with self.lock:
+            for followers in self.followers.values():
+                followers.discard(_id)
+            if process.state == DEAD or coordinator is None or coordinator == _id:
+                return
+            followers = self.followers.setdefault(coordinator, set())
+            if not followers:
+                # a coordinator elected again must not be judged by the gap since its last term
+                self.detectors[coordinator] = PhiAccrualDetector(self.interval)
+                self.detectors[coordinator].heartbeat(now)
+                self.suspected.discard(coordinator)
+            followers.add(_id)
+
+    def heard(self, coordinator, heartbeat_round):
+        """Record the arrival of a heartbeat of coordinator at a local process.
+        Called by the process that handles the HEARTBEAT message"""
+        now = self.clock()
+        with self.lock:
+            # the other local followers received the same round
+            if heartbeat_round <= self.rounds.get(coordinator, 0):
+                return
+            self.rounds[coordinator] = heartbeat_round
+            detector = self.detectors.get(coordinator)
+            if detector is None:
+                detector = self.detectors[coordinator] = PhiAccrualDetector(self.interval)
+            detector.heartbeat(now)
+            self.suspected.discard(coordinator)
+        for lease in self.leases:
+            if lease.lease[0] == coordinator:
+                lease.renew(coordinator, now)
+
+    def tick(self, now=None):
+        """Send the heartbeats of this interval and check the suspicion of every followed coordinator"""
+        if now is None:
+            now = self.clock()
+        self.round += 1
+        for process in self.processes:
+            _id = process.get_id()
+            if process.stop_worker.is_set() or process.get_coordinator() != _id:
+                continue
+            for peer in process.get_peers().others(_id):
+                process.send(peer, HEARTBEAT, self.round)
+                self.heartbeats += 1
+
+        suspects = []
+        with self.lock:
+            for coordinator, followers in self.followers.items():
+                if not followers or coordinator in self.suspected:
+                    continue
+                if self.detectors[coordinator].phi(now) >= self.phi_threshold:
+                    self.suspected.add(coordinator)
+                    # the highest follower sends the fewest ELECTION messages
+                    suspects.append((self.local[max(followers)], coordinator))
+        for process, coordinator in suspects:
+            self.suspect(process, coordinator)
+
+    def add_lease(self, lease):
+        """Renew the LeaderLookup lease on every heartbeat of its leader"""
+        self.leases.append(lease)
+
+    def run(self):
+        """Tick every interval until stopped. Worker method"""
+        while not self.stop_worker.wait(self.interval):
+            self.tick()
+
+    def start(self):
+        """Start ticking on a thread"""
+        self.thread.start()
+
+    def stop(self):
+        """Stop the ticking thread"""
+        self.stop_worker.set()
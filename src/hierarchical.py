@@ -0,0 +1,147 @@
+"""Two-level bully election for large clusters.
+
+Processes are split into groups of `group_size` consecutive ids. Each group elects a
+local leader among its own members only, so ELECTION, OK and coordinator broadcasts stay
+inside the group. Every group has one seat in a top-level cluster, held by its current
+leader, where the seats elect the global leader. The global leader then sends I_AM_COORDINATOR
+to the group leaders and to its own group, and every group leader relays it to its members:
+about O(N + G^2) messages for N processes in G groups.
+A new local leader takes over the seat of its group, so the failure of a leader that is
+not the global one is handled without any top-level traffic.
+"""
+from types_ import *
+from bully_improved import ProcessImproved
+from convergence import ConvergenceMonitor
+from simulation import SimulatedCluster, Simulator
+
+
+class HierarchicalCluster:
+    """Simulated two-level cluster of n processes with ids 0..n-1"""
+
+    def __init__(self, n, group_size, process_cls=ProcessImproved, latency=0):
+        self.simulator = Simulator()
+        self.latency = latency
+        self.group_size = group_size
+        self.groups = [SimulatedCluster(process_cls, range(start, min(start + group_size, n)),
+                                        latency, simulator=self.simulator)
+                       for start in range(0, n, group_size)]
+        # seat g of the top level belongs to group g, the highest group with a leader wins
+        self.top = SimulatedCluster(process_cls, len(self.groups), latency, simulator=self.simulator)
+        self.leaders = [None] * len(self.groups)  # id of the local leader of every group
+        self.global_group = None  # group whose leader is the global leader
+        self.top_electing = False  # a top-level election is running
+        # the global level of every process, it follows the global leader announced to it
+        self.views = SimulatedCluster(process_cls, n, latency, simulator=self.simulator)
+        self.announcement = 0  # epoch of the latest global announcement
+        for view in self.views.processes:
+            view.listeners.append(self.relay)
+        self.monitors = []
+        for g, group in enumerate(self.groups):
+            monitor = ConvergenceMonitor(group.processes)
+            monitor.add_callback(lambda leader, g=g: self.local_leader(g, leader))
+            self.monitors.append(monitor)
+        self.top_monitor = ConvergenceMonitor(self.top.processes)
+        self.top_monitor.add_callback(self.global_leader_elected)
+
+    def group_of(self, _id):
+        """Index of the group of process _id"""
+        return _id // self.group_size
+
+    def process(self, _id):
+        """Get process _id"""
+        return self.groups[self.group_of(_id)].peers.get(_id)
+
+    def start(self):
+        """Let every group elect its leader, starting at its lowest member"""
+        for group in self.groups:
+            group.start_election(group.processes[0].get_id())
+
+    def start_election(self, _id):
+        """Start a local election at process _id, e.g. after its leader failed"""
+        self.groups[self.group_of(_id)].start_election(_id)
+
+    def kill(self, _id):
+        """Kill process _id, its group gives up its seat once all members are dead"""
+        g = self.group_of(_id)
+        self.groups[g].kill(_id)
+        self.views.kill(_id)
+        if self.leaders[g] == _id:
+            self.leaders[g] = None
+        if all(process.state == DEAD for process in self.groups[g].processes):
+            self.top.kill(g)
+            if g == self.global_group:
+                self.global_group = None
+                # the highest remaining seat starts the election, it sends the fewest messages
+                seats = [seat.get_id() for seat in self.top.processes if seat.state != DEAD]
+                if seats:
+                    self.top_electing = True
+                    self.top.start_election(max(seats))
+
+    def local_leader(self, g, leader):
+        """Group g agreed on a new local leader"""
+        self.leaders[g] = leader
+        if g == self.global_group:
+            # the global leader changed within its group, announce the successor
+            self.announce()
+        elif self.global_group is None and not self.top_electing:
+            # the first group with a leader starts the top-level election
+            self.top_electing = True
+            self.top.start_election(g)
+
+    def global_leader_elected(self, g):
+        """The seats agreed on group g, announce its leader through the group leaders"""
+        self.global_group = g
+        self.top_electing = False
+        self.announce()
+
+    def announce(self):
+        """Send I_AM_COORDINATOR of the global leader, in a new epoch, to the other group leaders
+        and to the members of its own group"""
+        leader = self.global_leader()
+        if leader is None:
+            return
+        self.announcement += 1
+        origin = self.views.peers.get(leader)
+        for g, group_leader in enumerate(self.leaders):
+            if g == self.global_group:
+                self.broadcast(g, origin.send)
+            elif group_leader is not None:
+                origin.send(self.views.peers.get(group_leader), I_AM_COORDINATOR, self.announcement)
+
+    def relay(self, view):
+        """Listener of the global level: a group leader that accepted the announcement of the
+        global leader relays it to the members of its group"""
+        _id = view.get_id()
+        g = self.group_of(_id)
+        leader = self.global_leader()
+        if g == self.global_group or _id != self.leaders[g] or leader is None or view.get_coordinator() != leader:
+            return
+        # relayed on behalf of the global leader, the members follow the sender of the message
+        self.broadcast(g, lambda member, msg_type, payload: member.enqueue_message(leader, msg_type, payload),
+                       exclude=_id)
+
+    def broadcast(self, g, send, exclude=None):
+        """Send the current announcement with send(view, msg_type, payload) to the live members of group g"""
+        for process in self.groups[g].processes:
+            _id = process.get_id()
+            if process.state != DEAD and _id != exclude:
+                send(self.views.peers.get(_id), I_AM_COORDINATOR, self.announcement)
+
+    def global_view(self, _id):
+        """Global leader process _id follows, None before the first announcement reached it"""
+        return self.views.peers.get(_id).get_coordinator()
+
+    def global_leader(self):
+        """Id of the global leader, None while there is none"""
+        if self.global_group is None:
+            return None
+        return self.leaders[self.global_group]
+
+    def run(self, until=None):
+        """Run the simulation, see Simulator.run"""
+        return self.simulator.run(until)
+
+    @property
+    def msg_count(self):
+        """Total number of messages sent at both levels, including the announcements"""
+        return sum(group.msg_count for group in self.groups) + self.top.msg_count + self.views.msg_count
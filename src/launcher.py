@@ -0,0 +1,115 @@
+"""Start a cluster of OS processes on localhost that elect a leader over real sockets.
+
+Usage: python src/launcher.py --algorithm improved --nodes 5 --transport udp --mailbox priority
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from mailboxes import MAILBOXES
+from transport import BASE_PORT, TRANSPORTS, connect_process
+
+ALGORITHMS = {"original": ProcessOriginal, "improved": ProcessImproved}
+
+
+def run_node(args):
+    """Run a single node until the duration has passed and print its result as JSON"""
+    process = ALGORITHMS[args.algorithm](args.id)
+    process.message_queue = MAILBOXES[args.mailbox]()
+    transport = TRANSPORTS[args.transport](args.id, args.base_port)
+    connect_process(process, transport, args.nodes)
+    process.start_thread()
+
+    # tell the launcher we are listening and wait for the start signal
+    print("READY", flush=True)
+    start_time = float(sys.stdin.readline())
+    if args.id == args.initiator:
+        process.start_election()
+
+    # record when this node learned about its final leader
+    leader, leader_time = None, None
+    end = start_time + args.duration
+    while time.time() < end:
+        current = process.get_coordinator()
+        if current != leader:
+            leader, leader_time = current, time.time()
+        time.sleep(0.001)
+
+    state = process.state
+    process.kill()
+    transport.close()
+    print(json.dumps({
+        "id": args.id,
+        "state": state,
+        "leader": leader,
+        "latency": None if leader_time is None else leader_time - start_time,
+        "msg_count": process.msg_count,
+    }), flush=True)
+
+
+def launch(args):
+    """Start one OS process per node, start the election and collect the results"""
+    nodes = []
+    for i in range(args.nodes):
+        command = [sys.executable, os.path.abspath(__file__), "--node", "--id", str(i),
+                   "--algorithm", args.algorithm, "--transport", args.transport, "--mailbox", args.mailbox,
+                   "--nodes", str(args.nodes), "--base-port", str(args.base_port),
+                   "--initiator", str(args.initiator), "--duration", str(args.duration)]
+        nodes.append(subprocess.Popen(command, stdin=subprocess.PIPE,
+                                      stdout=subprocess.PIPE, text=True))
+    for node in nodes:
+        if node.stdout.readline().strip() != "READY":
+            raise RuntimeError("node failed to start")
+
+    start_time = time.time()
+    for node in nodes:
+        node.stdin.write(f"{start_time}\n")
+        node.stdin.flush()
+
+    results = []
+    for node in nodes:
+        output, _ = node.communicate()
+        results.append(json.loads(output))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="improved")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="udp")
+    parser.add_argument("--mailbox", choices=MAILBOXES, default="fifo", help="message queue of every node")
+    parser.add_argument("--nodes", type=int, default=5)
+    parser.add_argument("--initiator", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=3 * THRESHOLD,
+                        help="seconds to run after the election has been started")
+    parser.add_argument("--base-port", type=int, default=BASE_PORT)
+    parser.add_argument("--node", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--id", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.node:
+        run_node(args)
+        return
+
+    results = launch(args)
+    leaders = {result["leader"] for result in results}
+    latencies = [result["latency"] for result in results if result["latency"] is not None]
+    print(json.dumps({
+        "algorithm": args.algorithm,
+        "transport": args.transport,
+        "mailbox": args.mailbox,
+        "nodes": args.nodes,
+        "leaders": sorted(leader for leader in leaders if leader is not None),
+        "election_latency": max(latencies) if latencies else None,
+        "msg_count": sum(result["msg_count"] for result in results),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from types_ import *
+
+
+class LeaderLookup:
+    """Cached answer to "who is the leader?" for clients of a process.
+    A coordinator announcement grants a lease of `duration` seconds, during which lookups
+    are answered from the cache without touching the process or sending messages.
+    The lease is replaced by the next I_AM_COORDINATOR and renewed by heartbeats
+    of the leader, see HeartbeatService.add_lease"""
+
+    def __init__(self, process, duration=LEASE_DURATION):
+        self.process = process
+        self.duration = duration
+        # (leader, expiry) replaced as a whole, so readers on other threads need no lock
+        self.lease = (None, 0.0)
+        process.listeners.append(self.update)
+        self.update(process)
+
+    def update(self, process):
+        """Listener called by the process when its coordinator may have changed"""
+        if process.state == DEAD:
+            self.lease = (None, 0.0)
+            return
+        coordinator = process.get_coordinator()
+        # elections in progress keep the lease, only a new announcement replaces it
+        if coordinator is not None:
+            self.lease = (coordinator, process.clock() + self.duration)
+
+    def renew(self, leader, now):
+        """Extend the lease after a heartbeat of leader at time now"""
+        current, expiry = self.lease
+        if current == leader and now < expiry:
+            self.lease = (leader, now + self.duration)
+
+    def leader(self):
+        """Get the leader while the lease is valid, None once it expired"""
+        leader, expiry = self.lease
+        if leader is not None and self.process.clock() < expiry:
+            return leader
+        return None
+
+    def close(self):
+        """Stop listening to the process"""
+        self.process.listeners.remove(self.update)
@@ -0,0 +1,8 @@
+from batch_mailbox import BatchMailbox
+from priority_mailbox import PriorityMailbox
+
+# message queues by the name used on the command line
+MAILBOXES = {"fifo": BatchMailbox, "priority": PriorityMailbox}
+
+# algorithms whose payload is the election epoch the priority mailbox orders by
+EPOCH_ALGORITHMS = ("original", "improved")
@@ -0,0 +1,131 @@
+from threading import Lock, get_ident
+from types_ import *
+
+NUM_TYPES = max(MESSAGE_NAMES) + 1  # counters are indexed by message type
+
+
+class ShardedCounter:
+    """Counter incremented by many threads without a lock on the hot path.
+    Every thread adds to its own shard, the shards are summed when the value is read"""
+
+    def __init__(self):
+        self.shards = {}  # thread id -> [count], only written by that thread
+        self.lock = Lock()  # guards adding shards, taken once per thread
+
+    def add(self, n=1):
+        """Add n on the shard of the calling thread"""
+        shard = self.shards.get(get_ident())
+        if shard is None:
+            with self.lock:
+                shard = self.shards.setdefault(get_ident(), [0])
+        shard[0] += n
+
+    def value(self):
+        """Sum of all shards"""
+        with self.lock:
+            shards = list(self.shards.values())
+        return sum(shard[0] for shard in shards)
+
+
+class Histogram:
+    """Log-linear histogram of durations in the style of HdrHistogram.
+    Values are kept in nanoseconds with `significant_bits` bits of precision"""
+
+    def __init__(self, significant_bits=5, max_bits=40):
+        self.bits = significant_bits
+        self.half = 1 << (significant_bits - 1)
+        self.counts = [0] * ((max_bits - significant_bits + 2) * self.half)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def index(self, ns):
+        """Bucket index of a value in nanoseconds"""
+        exponent = max(ns.bit_length() - self.bits, 0)
+        return min(exponent * self.half + (ns >> exponent), len(self.counts) - 1)
+
+    def lowest(self, index):
+        """Lowest value in seconds that falls into bucket index"""
+        exponent = max((index >> (self.bits - 1)) - 1, 0)
+        return ((index - exponent * self.half) << exponent) / 1e9
+
+    def record(self, seconds):
+        """Record a duration in seconds"""
+        self.counts[self.index(max(int(seconds * 1e9), 0))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """Add the values recorded in other"""
+        for i, count in enumerate(other.counts):
+            if count:
+                self.counts[i] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        """Value in seconds below which `percent` of the recorded values fall"""
+        target = percent / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return self.lowest(i)
+        return 0.0
+
+    def summary(self):
+        """Count, mean and percentiles as a dict"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class NodeMetrics:
+    """Metrics of one process. Only written by the thread running that process,
+    so no locking is needed"""
+
+    def __init__(self):
+        self.sent = [0] * NUM_TYPES
+        self.received = [0] * NUM_TYPES
+        self.queue_wait = Histogram()  # time from enqueue_message to handling
+        self.handler_time = Histogram()  # time spent in message_handler
+
+
+class ClusterMetrics:
+    """Per-process metrics of a cluster, aggregated only when a snapshot is taken"""
+
+    def __init__(self, processes=()):
+        self.nodes = []
+        for process in processes:
+            self.attach(process)
+
+    def attach(self, process):
+        """Enable metrics for process"""
+        process.metrics = NodeMetrics()
+        self.nodes.append(process.metrics)
+
+    def snapshot(self):
+        """Sum the counters and merge the histograms of all processes"""
+        sent = [0] * NUM_TYPES
+        received = [0] * NUM_TYPES
+        queue_wait = Histogram()
+        handler_time = Histogram()
+        for node in self.nodes:
+            for msg_type in MESSAGE_NAMES:
+                sent[msg_type] += node.sent[msg_type]
+                received[msg_type] += node.received[msg_type]
+            queue_wait.merge(node.queue_wait)
+            handler_time.merge(node.handler_time)
+        return {
+            "sent": {name: sent[msg_type] for msg_type, name in MESSAGE_NAMES.items()},
+            "received": {name: received[msg_type] for msg_type, name in MESSAGE_NAMES.items()},
+            "queue_wait": queue_wait.summary(),
+            "handler_time": handler_time.summary(),
+        }
@@ -0,0 +1,236 @@
+import multiprocessing as mp
+import struct
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+from types_ import *
+import wire
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+
+ALGORITHMS = {"original": ProcessOriginal, "improved": ProcessImproved}
+
+# Ring layout: head (written by the consumer only), tail, count and dropped (written by producers)
+# followed by the slots
+HEAD = struct.Struct("Q")
+TAIL_OFFSET = 8
+COUNT_OFFSET = 16
+DROPPED_OFFSET = 24
+SLOTS_OFFSET = 64
+SLOT_SIZE = wire.message_size()  # messages in the wire format without payload
+
+# Control messages, handled by the mailbox in the node's own thread and not counted
+CONTROL_ELECTION = -1
+CONTROL_STOP = -2
+
+STOP_TIMEOUT = 5  # seconds MpCluster.stop waits for the results of the nodes
+
+
+class RingMailbox:
+    """Single-consumer ring buffer of fixed-size messages in shared memory.
+    Used as message_queue of a process. The consumer never locks, producers
+    serialize their writes on a lock, and a semaphore wakes the consumer.
+    A producer never waits for the consumer: a message that finds the ring full is
+    dropped like a message lost by the network, so two nodes sending to each other's
+    full rings can not block each other"""
+
+    def __init__(self, name, capacity, lock, doorbell, create=False):
+        size = SLOTS_OFFSET + capacity * SLOT_SIZE
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.buf = self.shm.buf
+        self.capacity = capacity
+        self.lock = lock
+        self.doorbell = doorbell
+        self.process = None  # local process, set in the consumer
+        self.results = None
+        if create:
+            self.buf[:SLOTS_OFFSET] = bytes(SLOTS_OFFSET)
+
+    def put(self, message):
+        """Write message to the ring. None only wakes the consumer.
+        Returns False if the ring was full and the message was dropped"""
+        if message is not None:
+            msg_type, sender_id = message[:2]
+            epoch = message[2] if len(message) > 2 else 0
+            with self.lock:
+                tail = HEAD.unpack_from(self.buf, TAIL_OFFSET)[0]
+                if tail - HEAD.unpack_from(self.buf, 0)[0] >= self.capacity:
+                    HEAD.pack_into(self.buf, DROPPED_OFFSET, self.dropped() + 1)
+                    return False
+                wire.encode_into(self.buf, SLOTS_OFFSET + (tail % self.capacity) * SLOT_SIZE,
+                                 msg_type, sender_id, epoch)
+                HEAD.pack_into(self.buf, TAIL_OFFSET, tail + 1)
+                if msg_type >= 0:
+                    HEAD.pack_into(self.buf, COUNT_OFFSET, self.count() + 1)
+        self.doorbell.release()
+        return True
+
+    def put_control(self, message, timeout=STOP_TIMEOUT):
+        """Write a control message, which must not be lost, retrying with backoff while the ring
+        is full. The lock is not held between attempts. Returns False if the timeout expired"""
+        deadline = time.monotonic() + timeout
+        delay = 0.0001
+        while not self.put(message):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+        return True
+
+    def get(self, timeout=None):
+        """Read the next message. Returns None when woken without a message"""
+        if not self.doorbell.acquire(timeout=timeout):
+            raise Empty
+        head = HEAD.unpack_from(self.buf, 0)[0]
+        if head == HEAD.unpack_from(self.buf, TAIL_OFFSET)[0]:
+            return None
+        msg_type, sender_id, epoch, _, _ = wire.decode(
+            self.buf, SLOTS_OFFSET + (head % self.capacity) * SLOT_SIZE)
+        HEAD.pack_into(self.buf, 0, head + 1)
+
+        if msg_type == CONTROL_ELECTION:
+            self.process.start_election()
+            return None
+        if msg_type == CONTROL_STOP:
+            self.results.put(node_result(self.process, self.count(), self.dropped()))
+            self.process.kill()
+            return None
+        return (msg_type, sender_id, epoch)
+
+    def get_batch(self, timeout=None):
+        """Read the next message and all messages already waiting behind it"""
+        messages = [self.get(timeout)]
+        while not self.empty():
+            try:
+                messages.append(self.get(timeout=0))
+            except Empty:
+                # written but not yet signalled, left for the next batch
+                break
+        return messages
+
+    def empty(self):
+        """Check if there are no pending messages"""
+        return HEAD.unpack_from(self.buf, 0)[0] == HEAD.unpack_from(self.buf, TAIL_OFFSET)[0]
+
+    def count(self):
+        """Number of messages ever written to the ring, the msg_count of its process"""
+        return HEAD.unpack_from(self.buf, COUNT_OFFSET)[0]
+
+    def dropped(self):
+        """Number of messages dropped because the ring was full"""
+        return HEAD.unpack_from(self.buf, DROPPED_OFFSET)[0]
+
+    def close(self):
+        """Detach from the shared memory"""
+        self.buf = None
+        self.shm.close()
+
+
+class ShmPeer:
+    """Stand-in for a process in another OS process, writing to its ring mailbox"""
+
+    def __init__(self, _id, mailbox):
+        self._id = _id
+        self.mailbox = mailbox
+
+    def get_id(self):
+        """Get process id"""
+        return self._id
+
+    def enqueue_message(self, sender_id, msg_type, payload=None):
+        """Write message to the mailbox of the remote process"""
+        self.mailbox.put((msg_type, sender_id, payload or 0))
+
+
+def node_result(process, msg_count, dropped):
+    """Summary of a process reported back to the cluster"""
+    return {"id": process.get_id(), "state": process.state, "leader": process.get_coordinator(),
+            "msg_count": msg_count, "dropped": dropped}
+
+
+def run_node(algorithm, _id, names, capacity, locks, doorbells, results, updates, threshold):
+    """Entry point of a node process: run the state machine on the ring mailbox"""
+    mailboxes = [RingMailbox(name, capacity, lock, doorbell)
+                 for name, lock, doorbell in zip(names, locks, doorbells)]
+    process = ALGORITHMS[algorithm](_id)
+    process.threshold = threshold
+    # report every change of the coordinator, see MpCluster.wait_for_leader
+    process.listeners.append(lambda process: updates.put((process.get_id(), process.get_coordinator())))
+    process.processes = [process if i == _id else ShmPeer(i, mailbox)
+                         for i, mailbox in enumerate(mailboxes)]
+    inbox = mailboxes[_id]
+    inbox.process = process
+    inbox.results = results
+    process.message_queue = inbox
+    process.state_machine()
+    for mailbox in mailboxes:
+        mailbox.close()
+
+
+class MpCluster:
+    """Runs every node in its own OS process with shared-memory ring mailboxes"""
+
+    def __init__(self, algorithm, n, capacity=1024, threshold=THRESHOLD):
+        self.n = n
+        self.capacity = capacity
+        self.locks = [mp.Lock() for _ in range(n)]
+        self.doorbells = [mp.Semaphore(0) for _ in range(n)]
+        self.mailboxes = []
+        for i in range(n):
+            mailbox = RingMailbox(None, capacity, self.locks[i], self.doorbells[i], create=True)
+            self.mailboxes.append(mailbox)
+        self.results = mp.Queue()
+        self.updates = mp.Queue()  # (id, coordinator) whenever the coordinator of a node may have changed
+        self.views = {}  # id -> coordinator the node agrees on, from updates
+        names = [mailbox.shm.name for mailbox in self.mailboxes]
+        self.workers = [mp.Process(target=run_node, daemon=True,
+                                   args=(algorithm, i, names, capacity, self.locks, self.doorbells, self.results,
+                                         self.updates, threshold))
+                        for i in range(n)]
+
+    def start(self):
+        """Start all node processes"""
+        for worker in self.workers:
+            worker.start()
+
+    def start_election(self, _id):
+        """Make node _id start an election"""
+        self.mailboxes[_id].put_control((CONTROL_ELECTION, -1))
+
+    def wait_for_leader(self, timeout=None):
+        """Wait until all nodes agree on a coordinator, like convergence.wait_for_leader.
+        Returns its id, or None if the timeout expired first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            leaders = set(self.views.values())
+            if len(self.views) == self.n and len(leaders) == 1 and None not in leaders:
+                return leaders.pop()
+            try:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                _id, leader = self.updates.get(timeout=remaining)
+            except Empty:
+                return None
+            self.views[_id] = leader
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Stop all nodes and return their results ordered by id.
+        Nodes that do not report within the timeout are terminated and left out of the results"""
+        deadline = time.monotonic() + timeout
+        for mailbox in self.mailboxes:
+            mailbox.put_control((CONTROL_STOP, -1), max(deadline - time.monotonic(), 0))
+        results = []
+        for _ in range(self.n):
+            try:
+                results.append(self.results.get(timeout=max(deadline - time.monotonic(), 0)))
+            except Empty:
+                break
+        results.sort(key=lambda result: result["id"])
+        for worker in self.workers:
+            worker.join(max(deadline - time.monotonic(), 0))
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        for mailbox in self.mailboxes:
+            mailbox.close()
+            mailbox.shm.unlink()
+        return results
@@ -0,0 +1,114 @@
+"""Seeded model of the network between simulated processes.
+
+Each link has a latency distribution and drop and duplication probabilities, messages
+can be held back to reorder them, and the network can be partitioned into groups that
+cannot reach each other. Random numbers are drawn from one seeded NumPy generator in
+batches, so a run is reproducible and sampling stays cheap with many thousands of links.
+"""
+import numpy as np
+
+# standard variates drawn in batches, and how a link turns one into a delay
+DISTRIBUTIONS = {
+    "constant": (lambda rng, size: np.zeros(size), lambda latency, jitter, x: latency),
+    "uniform": (lambda rng, size: rng.random(size) * 2 - 1, lambda latency, jitter, x: latency + jitter * x),
+    "normal": (lambda rng, size: rng.standard_normal(size), lambda latency, jitter, x: latency + jitter * x),
+    # shifted exponential, jitter is the mean of the exponential part
+    "exponential": (lambda rng, size: rng.standard_exponential(size), lambda latency, jitter, x: latency + jitter * x),
+    # latency is the median, jitter the sigma of the underlying normal distribution
+    "lognormal": (lambda rng, size: rng.standard_normal(size), lambda latency, jitter, x: latency * np.exp(jitter * x)),
+}
+
+
+class Link:
+    """Delivery parameters of the messages from one process to another"""
+
+    def __init__(self, latency, jitter, drop, duplicate):
+        self.latency = latency
+        self.jitter = jitter
+        self.drop = drop
+        self.duplicate = duplicate
+
+
+class NetworkModel:
+    """Decides when, how often and whether a message arrives, see SimulatedCluster"""
+
+    def __init__(self, seed=0, latency=0.001, jitter=0.0, distribution="uniform", drop=0.0,
+                 duplicate=0.0, reorder=0.0, reorder_delay=None, batch=4096):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"unknown distribution {distribution}")
+        self.rng = np.random.default_rng(seed)
+        self.sample_variates, self.to_delay = DISTRIBUTIONS[distribution]
+        self.default = Link(latency, jitter, drop, duplicate)
+        self.links = {}  # (sender id, receiver id) -> Link overriding the default
+        self.reorder = reorder  # probability that a message is held back
+        self.reorder_delay = 10 * latency if reorder_delay is None else reorder_delay
+        self.groups = None  # id -> partition group while the network is partitioned
+        self.batch = batch
+        # batches are converted to lists, indexing them is faster than indexing arrays
+        self.uniforms = []
+        self.variates = []
+        self.next_uniform = self.next_variate = 0
+        self.sent = 0
+        self.dropped = 0
+        self.duplicated = 0
+
+    def uniform(self):
+        """Next uniform number in [0, 1)"""
+        if self.next_uniform == len(self.uniforms):
+            self.uniforms = self.rng.random(self.batch).tolist()
+            self.next_uniform = 0
+        self.next_uniform += 1
+        return self.uniforms[self.next_uniform - 1]
+
+    def variate(self):
+        """Next standard variate of the latency distribution"""
+        if self.next_variate == len(self.variates):
+            self.variates = self.sample_variates(self.rng, self.batch).tolist()
+            self.next_variate = 0
+        self.next_variate += 1
+        return self.variates[self.next_variate - 1]
+
+    def set_link(self, sender, receiver, latency=None, jitter=None, drop=None, duplicate=None):
+        """Override the parameters of the link from sender to receiver"""
+        default = self.links.get((sender, receiver), self.default)
+        self.links[(sender, receiver)] = Link(
+            default.latency if latency is None else latency,
+            default.jitter if jitter is None else jitter,
+            default.drop if drop is None else drop,
+            default.duplicate if duplicate is None else duplicate)
+
+    def partition(self, *groups):
+        """Split the network, processes in different groups cannot reach each other.
+        Processes that are in no group form one more group"""
+        self.groups = {_id: i for i, group in enumerate(groups) for _id in group}
+
+    def heal(self):
+        """Remove the partition"""
+        self.groups = None
+
+    def connected(self, sender, receiver):
+        """Check if a message from sender can reach receiver"""
+        return self.groups is None or self.groups.get(sender, -1) == self.groups.get(receiver, -1)
+
+    def delay(self, link):
+        """Sample the delay of one copy of a message"""
+        delay = max(float(self.to_delay(link.latency, link.jitter, self.variate())), 0.0)
+        if self.reorder and self.uniform() < self.reorder:
+            delay += self.reorder_delay
+        return delay
+
+    def delays(self, sender, receiver):
+        """Delays of the copies of a message that arrive, empty if it is lost"""
+        self.sent += 1
+        link = self.links.get((sender, receiver), self.default)
+        if not self.connected(sender, receiver) or (link.drop and self.uniform() < link.drop):
+            self.dropped += 1
+            return []
+        if link.duplicate and self.uniform() < link.duplicate:
+            self.duplicated += 1
+            return [self.delay(link), self.delay(link)]
+        return [self.delay(link)]
+
+    def stats(self):
+        """Counts of the messages that went through the network"""
+        return {"sent": self.sent, "dropped": self.dropped, "duplicated": self.duplicated}
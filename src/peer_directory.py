@@ -0,0 +1,79 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+def _id_of(process):
+    return process.get_id()
+
+
+class PeerDirectory:
+    """Processes indexed by id, kept in id order. Ids may be sparse.
+    Election and broadcast target lists are cached and updated in place on membership change"""
+
+    def __init__(self, processes=()):
+        self.source = processes  # collection the directory was built from
+        self.ordered = sorted(processes, key=_id_of)
+        self.ids = [process.get_id() for process in self.ordered]
+        self.by_id = dict(zip(self.ids, self.ordered))
+        self.higher_cache = {}  # id -> processes with a higher id
+        self.others_cache = {}  # id -> all processes except id
+
+    def __len__(self):
+        return len(self.ordered)
+
+    def __iter__(self):
+        return iter(self.ordered)
+
+    def __contains__(self, _id):
+        return _id in self.by_id
+
+    def get(self, _id):
+        """Get process object by id"""
+        return self.by_id[_id]
+
+    def higher(self, _id):
+        """Get the processes with a higher id than _id, in id order"""
+        higher = self.higher_cache.get(_id)
+        if higher is None:
+            higher = self.ordered[bisect_right(self.ids, _id):]
+            self.higher_cache[_id] = higher
+        return higher
+
+    def others(self, _id):
+        """Get all processes except the one with id _id, in id order"""
+        others = self.others_cache.get(_id)
+        if others is None:
+            index = bisect_left(self.ids, _id)
+            others = self.ordered[:index] + self.ordered[index + (_id in self.by_id):]
+            self.others_cache[_id] = others
+        return others
+
+    def add(self, process):
+        """Add process to the directory"""
+        _id = process.get_id()
+        if _id in self.by_id:
+            raise ValueError(f"duplicate process id {_id}")
+        index = bisect_left(self.ids, _id)
+        self.ids.insert(index, _id)
+        self.ordered.insert(index, process)
+        self.by_id[_id] = process
+        for cached_id, higher in self.higher_cache.items():
+            if cached_id < _id:
+                insort(higher, process, key=_id_of)
+        for cached_id, others in self.others_cache.items():
+            if cached_id != _id:
+                insort(others, process, key=_id_of)
+
+    def remove(self, _id):
+        """Remove the process with id _id from the directory"""
+        process = self.by_id.pop(_id)
+        index = bisect_left(self.ids, _id)
+        del self.ids[index]
+        del self.ordered[index]
+        self.higher_cache.pop(_id, None)
+        self.others_cache.pop(_id, None)
+        for cached_id, higher in self.higher_cache.items():
+            if cached_id < _id:
+                higher.pop(bisect_left(higher, _id, key=_id_of))
+        for others in self.others_cache.values():
+            others.pop(bisect_left(others, _id, key=_id_of))
+        return process
@@ -0,0 +1,65 @@
+import heapq
+from itertools import count
+from queue import Queue
+from types_ import *
+
+# handling order of the message types within an epoch, coordinator messages first
+PRIORITY = {I_AM_COORDINATOR: 0, YOU_ARE_COORDINATOR: 1, OK: 2, ELECTION: 3}
+
+
+class PriorityMailbox(Queue):
+    """Message queue of a bully process that hands out messages of newer epochs first,
+    and within an epoch coordinator messages before OK and ELECTION messages.
+    When an I_AM_COORDINATOR is put, queued ELECTION and OK messages of that epoch and
+    earlier ones are dropped, their election is already decided.
+    Replaces the FIFO message_queue of a process: process.message_queue = PriorityMailbox(),
+    or pass mailbox=PriorityMailbox to a SimulatedCluster"""
+
+    def _init(self, maxsize):
+        self.heap = []  # (-epoch, priority, seq, message)
+        self.seq = count()  # keeps messages of equal priority in FIFO order
+        self.dropped = 0  # number of messages dropped because a coordinator was announced
+
+    def _qsize(self):
+        return len(self.heap)
+
+    def _put(self, message):
+        if message is None:
+            # wake up comes first
+            heapq.heappush(self.heap, (float("-inf"), -1, next(self.seq), None))
+            return
+        epoch = epoch_of(message)
+        if message[0] == I_AM_COORDINATOR:
+            kept = [entry for entry in self.heap
+                    if entry[3] is None or entry[3][0] not in (ELECTION, OK) or -entry[0] > epoch]
+            if len(kept) < len(self.heap):
+                self.dropped += len(self.heap) - len(kept)
+                heapq.heapify(kept)
+                self.heap = kept
+        heapq.heappush(self.heap, (-epoch, PRIORITY.get(message[0], len(PRIORITY)), next(self.seq), message))
+
+    def _get(self):
+        return heapq.heappop(self.heap)[3]
+
+    def get_batch(self, timeout=None):
+        """Wait up to timeout for the first message, then hand out queued messages in priority order.
+        Messages are taken off the heap as the batch is iterated, so a coordinator message put
+        while the batch is handled still comes next and drops the stale ones"""
+        return self.drain(self.get(timeout=timeout))
+
+    def drain(self, first):
+        """Yield first and then every queued message, one at a time"""
+        yield first
+        while True:
+            with self.mutex:
+                if not self.heap:
+                    return
+                message = self._get()
+            yield message
+
+
+def epoch_of(message):
+    """Epoch of a queued message, messages without one belong to epoch 0"""
+    if len(message) > 2 and message[2] is not None:
+        return message[2]
+    return 0
@@ -0,0 +1,205 @@
+from abc import ABC, abstractmethod
+from threading import Event, Thread
+from queue import Empty
+import time
+from types_ import *
+from batch_mailbox import BatchMailbox
+from metrics import ShardedCounter
+from peer_directory import PeerDirectory
+from rtt import RttEstimator
+from event_trace import ELECT, HANDLE, KILL, SEND, STATE, TIMER
+
+
+class ProcessBase(ABC):
+    """Runtime shared by all election algorithms: thread, message queue, peers, clock,
+    metrics, tracing and listeners. An algorithm subclasses it and implements
+    handle_message, handle_deadline, next_deadline, begin_election and get_coordinator"""
+
+    def __init__(self, _id):
+        self.message_thread = Thread(target=self.state_machine, daemon=True)
+        self.stop_worker = Event()
+        # tuple[type, sender_id], payload and enqueue time are optional. Any queue with put and
+        # get(timeout) can replace it, get_batch(timeout) is used when the queue has it
+        self.message_queue = BatchMailbox()
+        self._id = _id
+        self.state = NORMAL  # initial state
+        self.processes = []
+        # number of messages sent to this process, metric for performance. Counted on the sending threads
+        self.messages = ShardedCounter()
+        self.election_start_time = 0
+        self.clock = time.time  # time source, replaced by the simulator with virtual time
+        self.peer_directory = None  # directory built from a plain process list
+        self.metrics = None  # NodeMetrics, see metrics.py
+        self.threshold = THRESHOLD  # time to wait for OK messages
+        self.rtt = RttEstimator()  # adapts threshold to the observed OK round-trip times, None to keep it fixed
+        self.listeners = []  # called with the process when its coordinator may have changed
+        self.tracer = None  # TraceRecorder, see event_trace.py
+        self.heartbeats = None  # HeartbeatService of the runtime, see failure_detector.py
+
+    def start_thread(self):
+        """Start the message handler thread"""
+        self.message_thread.start()
+
+    def kill(self):
+        """Kill the process by setting state and stopiing worker thread"""
+        if self.tracer is not None:
+            self.tracer.record(self.clock(), self._id, KILL, state=self.state)
+        self.set_state(DEAD)
+        self.stop_worker.set()
+        self.message_queue.put(None)  # wake up the state machine
+        self.notify_listeners()
+
+    def set_state(self, state):
+        """Change the state of the process"""
+        self.state = state
+        if self.tracer is not None:
+            self.tracer.record(self.clock(), self._id, STATE, state=state)
+
+    def get_id(self):
+        """Get process id"""
+        return self._id
+
+    @abstractmethod
+    def get_coordinator(self):
+        """Get the coordinator this process currently agrees on, None during an election"""
+
+    def notify_listeners(self):
+        """Tell listeners that the coordinator of this process may have changed"""
+        for listener in self.listeners:
+            listener(self)
+
+    def get_process(self, _id):
+        """Get process object by id"""
+        return self.get_peers().get(_id)
+
+    def get_peers(self):
+        """Get the peer directory. self.processes is either a PeerDirectory shared by
+        the cluster, or a plain list that is indexed on first use"""
+        if isinstance(self.processes, PeerDirectory):
+            return self.processes
+        peers = self.peer_directory
+        if peers is None or peers.source is not self.processes or len(peers) != len(self.processes):
+            peers = PeerDirectory(self.processes)
+            self.peer_directory = peers
+        return peers
+
+    @property
+    def msg_count(self):
+        """Number of messages sent to this process"""
+        return self.messages.value()
+
+    def enqueue_message(self, sender_id, msg_type, payload=None):
+        """Enqueue message to be processed by the state machine"""
+        self.messages.add()
+        if self.metrics is None:
+            if payload is None:
+                self.message_queue.put((msg_type, sender_id))
+            else:
+                self.message_queue.put((msg_type, sender_id, payload))
+        else:
+            self.message_queue.put((msg_type, sender_id, payload, time.perf_counter()))
+
+    def send(self, process, msg_type, payload=None):
+        """Send message to another process. The payload is an integer, the election epoch
+        of the bully algorithms, the candidate id of the ring or the term of the vote"""
+        if self.tracer is not None:
+            self.tracer.record(self.clock(), self._id, SEND, process.get_id(), msg_type, self.state, payload)
+        if self.metrics is not None:
+            self.metrics.sent[msg_type] += 1
+        if payload is None:
+            process.enqueue_message(self._id, msg_type)
+        else:
+            process.enqueue_message(self._id, msg_type, payload)
+
+    def dispatch(self, message):
+        """Handle a message taken from the message queue"""
+        payload = message[2] if len(message) > 2 else None
+        if self.metrics is None:
+            self.message_handler(message[1], message[0], payload)
+            return
+        start = time.perf_counter()
+        self.metrics.received[message[0]] += 1
+        if len(message) > 3:
+            self.metrics.queue_wait.record(start - message[3])
+        self.message_handler(message[1], message[0], payload)
+        self.metrics.handler_time.record(time.perf_counter() - start)
+
+    def message_handler(self, process_id, msg_type, payload=None):
+        """"Handle message from another process"""
+        if self.tracer is not None:
+            self.tracer.record(self.clock(), self._id, HANDLE, process_id, msg_type, self.state, payload)
+        if msg_type == HEARTBEAT:
+            if self.heartbeats is not None:
+                self.heartbeats.heard(process_id, payload or 0)
+        elif msg_type == SUSPECT:
+            # the failure detector suspects process_id, unless another coordinator was elected since
+            if self.state != DEAD and self.get_coordinator() == process_id:
+                self.start_election()
+        else:
+            self.handle_message(process_id, msg_type, payload)
+
+    @abstractmethod
+    def handle_message(self, process_id, msg_type, payload):
+        """Algorithm specific part of message_handler"""
+
+    def sample_rtt(self):
+        """Measure the round-trip time of an OK to the current election and adapt threshold"""
+        # OKs arriving after the election was decided would overestimate the round-trip time
+        if self.rtt is None or self.state != WAITING_FOR_OK:
+            return
+        self.rtt.sample(self.clock() - self.election_start_time)
+        self.threshold = self.rtt.timeout()
+
+    def state_machine(self):
+        """State machine for process. Worker method"""
+        # wait for messages until the next deadline, then check state and do something
+        while not self.stop_worker.is_set():
+            deadline = self.next_deadline()
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - self.clock()
+                # a busy process still checks its state once the deadline has passed
+                if timeout <= 0:
+                    self.check_state()
+                    continue
+            try:
+                get_batch = getattr(self.message_queue, "get_batch", None)
+                if get_batch is None:
+                    messages = (self.message_queue.get(timeout=timeout),)
+                else:
+                    messages = get_batch(timeout=timeout)
+
+            except Empty:
+                self.check_state()
+
+            # handle all pending messages back to back, the deadline is checked once per batch
+            else:
+                for message in messages:
+                    if self.stop_worker.is_set():
+                        break
+                    if message is not None:
+                        self.dispatch(message)
+
+    def check_state(self):
+        """Check state when the next deadline is reached"""
+        if self.tracer is not None:
+            self.tracer.record(self.clock(), self._id, TIMER, state=self.state)
+        self.handle_deadline()
+
+    @abstractmethod
+    def handle_deadline(self):
+        """Algorithm specific part of check_state"""
+
+    @abstractmethod
+    def next_deadline(self):
+        """Get the time at which check_state has to run next, None if there is nothing to do"""
+
+    def start_election(self):
+        """Start an election at this process"""
+        if self.tracer is not None:
+            self.tracer.record(self.clock(), self._id, ELECT, state=self.state)
+        self.begin_election()
+
+    @abstractmethod
+    def begin_election(self):
+        """Algorithm specific part of start_election"""
@@ -0,0 +1,109 @@
+import random
+from types_ import *
+from process_base import ProcessBase
+
+
+class ProcessRaft(ProcessBase):
+    """Leader election by majority vote with terms and randomized timeouts, as in Raft.
+    A candidate starts a new term and asks every process for its vote with ELECTION,
+    each process votes with OK for the first candidate of a term. A candidate with the
+    votes of a majority of all processes sends I_AM_COORDINATOR. A candidate without a
+    majority retries in a new term after a random timeout between threshold and
+    2 * threshold, so split votes do not repeat. No leader is elected while a majority
+    of the processes is dead"""
+
+    def __init__(self, _id):
+        super().__init__(_id)
+        self.term = 0
+        self.voted_for = None  # candidate this process voted for in the current term
+        self.votes = set()  # ids that voted for this process in the current term
+        self.coordinator = None
+        self.coordinator_msg_sent = False
+        self.election_deadline = None
+        self.random = random.Random(_id)  # seeded, so simulated elections are reproducible
+
+    def get_coordinator(self):
+        """Get the coordinator this process currently agrees on, None during an election"""
+        if self.state == COORDINATOR:
+            return self._id if self.coordinator_msg_sent else None
+        if self.state == NORMAL:
+            return self.coordinator
+        return None
+
+    def new_term(self, term):
+        """Move on to a newer term, nobody has been voted for in it yet"""
+        self.term = term
+        self.voted_for = None
+        self.votes = set()
+
+    def handle_message(self, process_id, msg_type, payload=None):
+        """Handle message from another process, payload is the term of the sender"""
+        # a message without a term can not be placed in a term, drop it
+        if not isinstance(payload, int):
+            return
+        if payload > self.term:
+            self.new_term(payload)
+            if self.state in (ELECTING, COORDINATOR):
+                # a newer term makes candidates and leaders step down
+                self.election_deadline = None
+                self.coordinator = None
+                self.set_state(NORMAL)
+                self.notify_listeners()
+
+        # vote for the first candidate of the current term
+        if msg_type == ELECTION:
+            if payload == self.term and self.voted_for in (None, process_id):
+                self.voted_for = process_id
+                self.send(self.get_process(process_id), OK, self.term)
+
+        # count votes of the current term
+        elif msg_type == OK:
+            if self.state == ELECTING and payload == self.term:
+                self.votes.add(process_id)
+                if len(self.votes) > len(self.get_peers()) // 2:
+                    self.send_coordinator()
+
+        # accept the leader of the current term
+        elif msg_type == I_AM_COORDINATOR:
+            if payload == self.term:
+                self.coordinator = process_id
+                self.election_deadline = None
+                self.set_state(NORMAL)
+                self.notify_listeners()
+
+    def send_coordinator(self):
+        """Send coordinator message to all processes"""
+        self.election_deadline = None
+        self.coordinator = self._id
+        self.set_state(COORDINATOR)
+        for process in self.get_peers().others(self._id):
+            self.send(process, I_AM_COORDINATOR, self.term)
+        self.coordinator_msg_sent = True
+        self.notify_listeners()
+
+    def handle_deadline(self):
+        """Retry an election that did not get a majority in time"""
+        if self.state == ELECTING and self.clock() >= self.election_deadline:
+            self.start_election()
+
+    def next_deadline(self):
+        """Get the time at which check_state has to run next, None if there is nothing to do"""
+        if self.state == ELECTING:
+            return self.election_deadline
+        return None
+
+    def begin_election(self):
+        """Become candidate in a new term and ask all processes for their vote"""
+        self.election_start_time = self.clock()
+        self.new_term(self.term + 1)
+        self.voted_for = self._id
+        self.votes = {self._id}
+        self.coordinator_msg_sent = False
+        self.election_deadline = self.election_start_time + self.threshold * (1 + self.random.random())
+        self.set_state(ELECTING)
+        self.notify_listeners()
+        if len(self.votes) > len(self.get_peers()) // 2:
+            self.send_coordinator()
+            return
+        for process in self.get_peers().others(self._id):
+            self.send(process, ELECTION, self.term)
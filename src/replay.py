@@ -0,0 +1,123 @@
+"""Deterministic replay of recorded election traces, see event_trace.py.
+
+The inputs of a trace (handled messages, deadline checks, elections started and kills
+from outside, heartbeats sent by the failure detector) are fed into fresh processes with a virtual clock set to the recorded
+times. Everything the processes record in turn is compared with the trace, so the
+first record where the replay diverges is found in a single pass. The trace must
+start at the beginning of the run, a wrapped ring file cannot be replayed.
+"""
+from collections import deque
+from types_ import *
+from event_trace import ELECT, EVENT_NAMES, HANDLE, KILL, NO_PAYLOAD, NO_PEER, SEND, STATE, TIMER
+from peer_directory import PeerDirectory
+
+
+class NullInbox:
+    """Message queue that drops messages, deliveries are replayed from the trace instead"""
+
+    def put(self, message):
+        pass
+
+
+class Replay:
+    """Replays records on fresh instances of process_cls, or of a factory taking an id"""
+
+    def __init__(self, records, process_cls, ids=None):
+        self.records = records
+        if ids is None:
+            ids = {record[1] for record in records} | {record[3] for record in records if record[3] != NO_PEER}
+        self.now = 0.0
+        self.processes = [process_cls(_id) for _id in sorted(ids)]
+        self.peers = PeerDirectory(self.processes)
+        self.pending = {}  # id -> records produced by the replay that are not matched yet
+        for process in self.processes:
+            process.processes = self.peers
+            process.clock = self.time
+            process.message_queue = NullInbox()
+            process.tracer = self
+            self.pending[process.get_id()] = deque()
+        self.position = 0  # index of the next record to replay
+        self.divergence = None  # (index, recorded record, replayed record) of the first mismatch
+
+    def time(self):
+        """Virtual clock of the replayed processes"""
+        return self.now
+
+    def record(self, time, node, event, peer=NO_PEER, msg_type=0, state=0, payload=None):
+        """Tracer of the replayed processes"""
+        self.pending[node].append((time, node, event, peer, msg_type, state,
+                                   NO_PAYLOAD if payload is None else payload))
+
+    def apply(self, record):
+        """Feed an input record into its process"""
+        _, node, event, peer, msg_type, _, payload = record
+        process = self.peers.get(node)
+        if event == HANDLE:
+            process.message_handler(peer, msg_type, None if payload == NO_PAYLOAD else payload)
+        elif event == TIMER:
+            process.check_state()
+        elif event == ELECT:
+            process.start_election()
+        elif event == KILL:
+            process.kill()
+        elif event == SEND and msg_type == HEARTBEAT:
+            process.send(self.peers.get(peer), HEARTBEAT, payload)
+
+    def step(self):
+        """Replay the next record, returns False if the replay diverged"""
+        record = self.records[self.position]
+        pending = self.pending[record[1]]
+        # a record the process did not produce itself is an input
+        if not pending:
+            self.now = record[0]
+            self.apply(record)
+        replayed = pending.popleft() if pending else None
+        # times within one step may differ, the recorded clock kept running
+        if replayed is None or replayed[1:] != record[1:]:
+            self.divergence = (self.position, record, replayed)
+            return False
+        self.position += 1
+        return True
+
+    def run(self, until=None):
+        """Replay the records before index `until`, or all of them.
+        Returns the index of the first divergent record, None if the replay matches"""
+        end = len(self.records) if until is None else min(until, len(self.records))
+        while self.divergence is None and self.position < end:
+            self.step()
+        if self.divergence is None and self.position == len(self.records):
+            # records the replay produced beyond the end of the trace
+            for pending in self.pending.values():
+                if pending:
+                    self.divergence = (self.position, None, pending[0])
+                    break
+        return None if self.divergence is None else self.divergence[0]
+
+    def states(self):
+        """State of every replayed process"""
+        return {process.get_id(): process.state for process in self.processes}
+
+    def describe(self):
+        """Readable description of the divergence"""
+        if self.divergence is None:
+            return "replay matches the trace"
+        index, recorded, replayed = self.divergence
+        return f"record {index}: recorded {format_record(recorded)}, replayed {format_record(replayed)}"
+
+
+def format_record(record):
+    """Readable form of a record"""
+    if record is None:
+        return "nothing"
+    time, node, event, peer, msg_type, state, payload = record
+    text = f"{time:.6f} node {node} {EVENT_NAMES[event]}"
+    if event in (HANDLE, SEND):
+        text += f" {MESSAGE_NAMES.get(msg_type, msg_type)} peer {peer}"
+        if payload != NO_PAYLOAD:
+            text += f" payload {payload}"
+    return text + f" state {state}"
+
+
+def recorded_states(records):
+    """Last recorded state of every node in a trace"""
+    return {record[1]: record[5] for record in records if record[2] == STATE}
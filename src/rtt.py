@@ -0,0 +1,35 @@
+from types_ import *
+
+
+class RttEstimator:
+    """Estimates the round-trip time of ELECTION -> OK and derives the time to wait for OK
+    messages from it, like the TCP retransmission timeout of Jacobson/Karels.
+    Before the first sample the timeout is `initial`"""
+
+    def __init__(self, initial=THRESHOLD, lower=MIN_TIMEOUT, upper=MAX_TIMEOUT, alpha=1/8, beta=1/4, k=4):
+        self.initial = initial
+        self.lower = lower
+        self.upper = upper
+        self.alpha = alpha  # gain of the mean
+        self.beta = beta  # gain of the deviation
+        self.k = k  # number of deviations added to the mean
+        self.srtt = None  # smoothed round-trip time
+        self.rttvar = None  # smoothed mean deviation of the round-trip time
+        self.samples = 0
+
+    def sample(self, rtt):
+        """Add a measured round-trip time in seconds"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            # the deviation is updated with the old mean
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - rtt)
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * rtt
+        self.samples += 1
+
+    def timeout(self):
+        """Time to wait for OK messages, srtt + k * rttvar within the bounds"""
+        if self.srtt is None:
+            return self.initial
+        return min(max(self.srtt + self.k * self.rttvar, self.lower), self.upper)
@@ -0,0 +1,159 @@
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from threading import Condition, Lock, Thread
+from types_ import *
+from peer_directory import PeerDirectory
+
+
+class ScheduledInbox:
+    """Message queue of a process that is run by a PoolScheduler"""
+
+    def __init__(self, scheduler, process):
+        self.scheduler = scheduler
+        self.process = process
+        self.messages = deque()
+
+    def put(self, message):
+        """Enqueue message and make sure the process gets scheduled"""
+        self.messages.append(message)
+        self.scheduler.wake(self.process)
+
+    def empty(self):
+        """Check if there are no pending messages"""
+        return not self.messages
+
+
+class PoolScheduler:
+    """Runs the state machines of many processes on a fixed number of worker threads.
+    A process is only scheduled when its inbox is non-empty or its deadline is reached,
+    and at most one worker runs a given process at a time"""
+
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = Lock()
+        self.scheduled = set()  # ids of processes that are queued or running on a worker
+        self.timers = []  # heap of (deadline, seq, process), shared by all processes
+        self.deadlines = {}  # id -> deadline of the pending timer of a process
+        self.seq = count()
+        self.timer_condition = Condition()
+        self.timer_thread = Thread(target=self.run_timers, daemon=True)
+        self.stopped = False
+
+    def add(self, process):
+        """Let the scheduler run process instead of its own thread"""
+        process.message_thread = None
+        process.message_queue = ScheduledInbox(self, process)
+
+    def start(self):
+        """Start the timer thread"""
+        self.timer_thread.start()
+
+    def stop(self):
+        """Stop the timer thread and the workers"""
+        with self.timer_condition:
+            self.stopped = True
+            self.timer_condition.notify()
+        self.executor.shutdown(wait=True)
+
+    def wake(self, process):
+        """Schedule process on a worker unless it is already scheduled"""
+        with self.lock:
+            if self.stopped or process.get_id() in self.scheduled:
+                return
+            self.scheduled.add(process.get_id())
+        self.executor.submit(self.run, process)
+
+    def run(self, process):
+        """Worker method: handle all pending messages and due deadlines of process"""
+        messages = process.message_queue.messages
+        while not process.stop_worker.is_set():
+            if messages:
+                message = messages.popleft()
+                if message is not None:
+                    process.dispatch(message)
+                continue
+
+            deadline = process.next_deadline()
+            if deadline is not None and deadline <= process.clock():
+                process.check_state()
+                continue
+
+            with self.lock:
+                # a message may have arrived after the inbox was found empty
+                if messages:
+                    continue
+                self.scheduled.discard(process.get_id())
+            self.set_timer(process)
+            return
+
+        with self.lock:
+            self.scheduled.discard(process.get_id())
+
+    def set_timer(self, process):
+        """Add the next deadline of process to the shared timer heap"""
+        deadline = process.next_deadline()
+        with self.timer_condition:
+            if deadline is None or self.deadlines.get(process.get_id()) == deadline:
+                return
+            self.deadlines[process.get_id()] = deadline
+            heapq.heappush(self.timers, (deadline, next(self.seq), process))
+            if self.timers[0][2] is process:
+                self.timer_condition.notify()
+
+    def run_timers(self):
+        """Timer thread: wake processes when their deadline is reached"""
+        with self.timer_condition:
+            while not self.stopped:
+                if not self.timers:
+                    self.timer_condition.wait()
+                    continue
+                deadline, _, process = self.timers[0]
+                timeout = deadline - process.clock()
+                if timeout > 0:
+                    self.timer_condition.wait(timeout)
+                    continue
+                heapq.heappop(self.timers)
+                # skip timers that have been replaced by a newer deadline
+                if self.deadlines.get(process.get_id()) != deadline:
+                    continue
+                del self.deadlines[process.get_id()]
+                self.wake(process)
+
+
+class PoolCluster:
+    """Runs ProcessOriginal or ProcessImproved instances on a PoolScheduler instead of one thread each"""
+
+    def __init__(self, process_cls, n, max_workers=4):
+        self.scheduler = PoolScheduler(max_workers)
+        self.processes = [process_cls(i) for i in range(n)]
+        peers = PeerDirectory(self.processes)
+        for process in self.processes:
+            process.processes = peers
+            self.scheduler.add(process)
+
+    def start(self):
+        """Start the scheduler"""
+        self.scheduler.start()
+
+    def start_election(self, _id):
+        """Start an election at process with id _id"""
+        process = self.processes[_id]
+        process.start_election()
+        self.scheduler.set_timer(process)
+
+    def kill(self, _id):
+        """Kill process with id _id"""
+        self.processes[_id].kill()
+
+    def stop(self):
+        """Kill all processes and stop the scheduler"""
+        for process in self.processes:
+            process.kill()
+        self.scheduler.stop()
+
+    @property
+    def msg_count(self):
+        """Total number of messages sent in the cluster"""
+        return sum(process.messages.value() for process in self.processes)
@@ -0,0 +1,208 @@
+import heapq
+from itertools import count
+from types_ import *
+from batch_mailbox import BatchMailbox
+from peer_directory import PeerDirectory
+from failure_detector import HeartbeatService
+
+
+class Simulator:
+    """Single threaded discrete-event scheduler with a virtual clock"""
+
+    def __init__(self):
+        self.now = 0.0  # virtual time in seconds
+        self.events = []  # heap of [time, seq, callback, args], callback is None once cancelled
+        self.seq = count()  # tie breaker, keeps events at equal times in FIFO order
+        self.event_count = 0
+
+    def time(self):
+        """Get the current virtual time. Used as clock by the simulated processes"""
+        return self.now
+
+    def schedule(self, delay, callback, *args):
+        """Schedule callback(*args) to run `delay` seconds from now. Returns the event for cancel"""
+        event = [self.now + delay, next(self.seq), callback, args]
+        heapq.heappush(self.events, event)
+        return event
+
+    def cancel(self, event):
+        """Cancel a scheduled event, it neither runs nor advances the clock"""
+        event[2] = None
+
+    def run(self, until=None):
+        """Run events in time order until the event queue is empty or `until` is reached"""
+        while self.events:
+            if until is not None and self.events[0][0] > until:
+                self.now = until
+                break
+            when, _, callback, args = heapq.heappop(self.events)
+            if callback is None:
+                continue
+            self.now = when
+            callback(*args)
+            self.event_count += 1
+        return self.now
+
+
+class SimulatedInbox:
+    """Replacement for the message queue of a process. Messages are delivered as simulator events.
+    Without a mailbox a message is handled the moment it arrives. With a mailbox, like a
+    PriorityMailbox, arriving messages are put into it and the process takes them out one
+    at a time, service_time apart, so messages that arrive while it is busy queue up.
+    State checks at deadlines do not wait for the queue"""
+
+    def __init__(self, cluster, process, latency, mailbox=None, service_time=0):
+        self.cluster = cluster
+        self.process = process
+        self.latency = latency
+        self.mailbox = mailbox
+        self.service_time = service_time
+        self.busy = False  # a message of the mailbox is being handled
+        self.depth = 0  # messages put but not yet handled
+        self.high_water = 0  # highest depth so far
+
+    def put(self, message):
+        """Schedule delivery of message to the process"""
+        network = self.cluster.network
+        target = self.deliver if self.mailbox is None else self.arrive
+        if network is None or message is None:
+            self.cluster.simulator.schedule(self.latency, target, message)
+            self.depth += 1
+        else:
+            # the network may lose, duplicate or delay the message
+            for delay in network.delays(message[1], self.process.get_id()):
+                self.cluster.simulator.schedule(delay, target, message)
+                self.depth += 1
+        if self.depth > self.high_water:
+            self.high_water = self.depth
+
+    def deliver(self, message):
+        """Handle message, like state_machine does after a successful get"""
+        self.depth -= 1
+        if self.process.stop_worker.is_set():
+            return
+        self.process.dispatch(message)
+        self.cluster.reschedule(self.process)
+
+    def arrive(self, message):
+        """Put an arriving message into the mailbox and start handling it if the process is idle"""
+        if self.process.stop_worker.is_set() or message is None:
+            self.depth -= 1
+            return
+        queued = self.mailbox.qsize()
+        self.mailbox.put(message)
+        # the mailbox may drop queued messages that are no longer needed
+        self.depth -= queued + 1 - self.mailbox.qsize()
+        if not self.busy:
+            self.busy = True
+            self.cluster.simulator.schedule(0, self.handle_next)
+
+    def handle_next(self):
+        """Handle the next message of the mailbox, then stay busy for service_time"""
+        if self.process.stop_worker.is_set() or self.mailbox.empty():
+            self.busy = False
+            return
+        self.deliver(self.mailbox.get_nowait())
+        self.cluster.simulator.schedule(self.service_time, self.handle_next)
+
+
+class SimulatedCluster:
+    """Runs ProcessOriginal or ProcessImproved instances on a simulator instead of threads.
+    n is the number of processes, or the (possibly sparse) ids of the processes.
+    Messages arrive after `latency`, or as decided by a NetworkModel.
+    mailbox is the class of the queue arriving messages wait in, see SimulatedInbox,
+    a FIFO queue if only service_time is given.
+    Clusters that pass the same simulator run side by side"""
+
+    def __init__(self, process_cls, n, latency=0, network=None, simulator=None, mailbox=None, service_time=0):
+        ids = range(n) if isinstance(n, int) else n
+        self.simulator = simulator or Simulator()
+        self.processes = [process_cls(_id) for _id in ids]
+        self.peers = PeerDirectory(self.processes)
+        self.deadlines = {}  # id -> time of the pending state check of a process
+        self.timers = {}  # id -> simulator event of the pending state check
+        self.heartbeats = None  # HeartbeatService, see start_heartbeats
+        self.network = network
+        if mailbox is None and service_time:
+            mailbox = BatchMailbox
+
+        for process in self.processes:
+            process.processes = self.peers
+            process.clock = self.simulator.time
+            process.message_queue = SimulatedInbox(self, process, latency,
+                                                   None if mailbox is None else mailbox(), service_time)
+
+    def reschedule(self, process):
+        """Schedule the state check of a process at its next deadline"""
+        _id = process.get_id()
+        deadline = process.next_deadline()
+        if deadline == self.deadlines.get(_id):
+            return
+        # a replaced or cleared deadline must not advance the clock of the simulator
+        self.cancel_timer(_id)
+        if deadline is None:
+            return
+        self.deadlines[_id] = deadline
+        self.timers[_id] = self.simulator.schedule(max(deadline - self.simulator.now, 0),
+                                                   self.timeout, process, deadline)
+
+    def cancel_timer(self, _id):
+        """Cancel the pending state check of a process"""
+        if _id in self.deadlines:
+            del self.deadlines[_id]
+            self.simulator.cancel(self.timers.pop(_id))
+
+    def timeout(self, process, deadline):
+        """Deadline reached: let the process check its state"""
+        _id = process.get_id()
+        # ignore deadlines that have been replaced by a newer one
+        if deadline != self.deadlines.get(_id) or process.stop_worker.is_set():
+            return
+        del self.deadlines[_id]
+        del self.timers[_id]
+        process.check_state()
+        self.reschedule(process)
+
+    def start_election(self, _id):
+        """Start an election at process with id _id"""
+        process = self.peers.get(_id)
+        process.start_election()
+        self.reschedule(process)
+
+    def kill(self, _id):
+        """Kill process with id _id"""
+        self.peers.get(_id).kill()
+        self.cancel_timer(_id)
+
+    def schedule_partition(self, at, groups, heal_at=None):
+        """Partition the network into groups at time `at`, and heal it at `heal_at`"""
+        self.simulator.schedule(at - self.simulator.now, self.network.partition, *groups)
+        if heal_at is not None:
+            self.simulator.schedule(heal_at - self.simulator.now, self.network.heal)
+
+    def start_heartbeats(self, interval=HEARTBEAT_INTERVAL, phi_threshold=PHI_THRESHOLD):
+        """Detect coordinator failures and start elections automatically.
+        Heartbeats never stop, so the simulation has to be run with `until`"""
+        self.heartbeats = HeartbeatService(self.processes, interval, phi_threshold, self.simulator.time,
+                                           self.suspect)
+        self.simulator.schedule(interval, self.heartbeat)
+
+    def suspect(self, process, coordinator):
+        """Failure detector callback: the process handles the SUSPECT notice at once,
+        the network neither delays nor loses it"""
+        process.dispatch((SUSPECT, coordinator))
+        self.reschedule(process)
+
+    def heartbeat(self):
+        """Heartbeat tick of the failure detector"""
+        self.heartbeats.tick()
+        self.simulator.schedule(self.heartbeats.interval, self.heartbeat)
+
+    def run(self, until=None):
+        """Run the simulation, see Simulator.run"""
+        return self.simulator.run(until)
+
+    @property
+    def msg_count(self):
+        """Total number of messages sent in the cluster"""
+        return sum(process.messages.value() for process in self.processes)
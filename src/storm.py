@@ -0,0 +1,93 @@
+"""Election storms: many processes start an election at about the same time.
+
+When the coordinator dies, every follower notices it at about the same moment and
+starts its own election. A storm kills the highest processes of a simulated cluster
+and lets all or a random subset of the survivors call start_election, at once or
+spread uniformly over `jitter` seconds. The report compares the messages sent with
+those of an election started by the lowest initiator alone, which reaches every process
+the storm reaches (the amplification factor). It also gives the inbox high-water marks
+of the live processes and the time until all live processes agree on the new leader.
+
+Both bully algorithms send O(N) messages per initiator and the original algorithm
+lets every process above an initiator start its own election, so a storm costs up
+to O(N^2) messages. Clusters of 10k processes are practical with a small subset of
+initiators and the improved algorithm.
+
+With a service_time per message, messages queue at busy processes. Once the queueing
+delay approaches the OK threshold, processes time out while their OKs are still queued
+and elect again in new epochs, which takes several rounds with FIFO inboxes. A
+PriorityMailbox, which handles newer epochs and coordinator messages first and drops
+decided ELECTION and OK messages, agrees on the leader after about one threshold in
+that regime and sends fewer messages. Below it the order of the inbox makes little
+difference.
+"""
+import random
+import numpy as np
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from complexity import improved_messages_alive, original_messages_alive
+from convergence import ConvergenceMonitor
+from simulation import SimulatedCluster
+
+# messages of an election started by a single initiator, see complexity.py
+SINGLE_ELECTION = {ProcessOriginal: original_messages_alive, ProcessImproved: improved_messages_alive}
+
+
+def storm_schedule(alive, initiators=None, jitter=0, seed=0):
+    """Pick the initiators among the ids in alive and the time each one starts its election.
+    initiators is None for all, a fraction of the live processes between 0 and 1, or a count.
+    Returns a list of (delay, id) sorted by delay"""
+    rnd = random.Random(seed)
+    alive = list(alive)
+    if initiators is None:
+        chosen = alive
+    else:
+        k = round(initiators * len(alive)) if isinstance(initiators, float) else initiators
+        chosen = rnd.sample(alive, max(min(k, len(alive)), 1))
+    return sorted((rnd.uniform(0, jitter) if jitter else 0.0, _id) for _id in chosen)
+
+
+def run_storm(process_cls, n, initiators=None, jitter=0, failed=1, latency=0.001, seed=0, until=None,
+              mailbox=None, service_time=0):
+    """Kill the `failed` highest of n processes and run a storm of elections, see storm_schedule.
+    mailbox and service_time make messages queue at busy processes, see SimulatedInbox.
+    Returns a report as a dict"""
+    cluster = SimulatedCluster(process_cls, n, latency, mailbox=mailbox, service_time=service_time)
+    for _id in range(n - failed, n):
+        cluster.kill(_id)
+    alive = range(n - failed)
+    schedule = storm_schedule(alive, initiators, jitter, seed)
+    monitor = ConvergenceMonitor(cluster.processes)
+    agreed = []  # (leader, time) whenever the live processes agree on a new leader
+    monitor.add_callback(lambda leader: agreed.append((leader, cluster.simulator.now)))
+    for delay, _id in schedule:
+        cluster.simulator.schedule(delay, cluster.start_election, _id)
+    end = cluster.run(until)
+    monitor.close()
+
+    messages = cluster.msg_count
+    single = SINGLE_ELECTION.get(process_cls)
+    baseline = None
+    if single is not None:
+        mask = np.zeros(n, dtype=bool)
+        mask[:n - failed] = True
+        baseline = int(single(mask, min(_id for _, _id in schedule)))
+    depths = [process.message_queue.high_water for process in cluster.processes if process.state != DEAD]
+    leader, converged = agreed[-1] if agreed else (None, None)
+    return {
+        "algorithm": process_cls.__name__,
+        "n": n,
+        "initiators": len(schedule),
+        "jitter": jitter,
+        "messages": messages,
+        "single_election": baseline,
+        "amplification": messages / baseline if baseline else None,
+        "inbox_high_water": max(depths),
+        "inbox_high_water_mean": sum(depths) / len(depths),
+        "leader": leader if leader == monitor.leader else None,
+        "time_to_leader": converged if leader == monitor.leader else None,
+        "end": end,
+        "mailbox": None if mailbox is None else mailbox.__name__,
+        "service_time": service_time,
+    }
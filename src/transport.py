@@ -0,0 +1,220 @@
+import socket
+import time
+from threading import Lock, Thread, current_thread
+from types_ import *
+import wire
+
+HOST = "127.0.0.1"
+BASE_PORT = 47000  # node with id i listens on BASE_PORT + i
+MAX_DATAGRAM = 65535
+CONNECT_TIMEOUT = 0.1  # seconds a TCP sender waits for one connection attempt
+RECONNECT_INTERVAL = 1  # seconds a peer that could not be reached is not tried again
+JOIN_TIMEOUT = 1  # seconds close waits for each receiver thread
+
+
+class RemoteProcess:
+    """Stand-in for a process living in another OS process.
+    Messages enqueued on it are sent over the transport"""
+
+    def __init__(self, _id, transport):
+        self._id = _id
+        self.transport = transport
+
+    def get_id(self):
+        """Get process id"""
+        return self._id
+
+    def enqueue_message(self, sender_id, msg_type, payload=None):
+        """Send message to the remote process. It is counted by the receiver.
+        The payload travels in the epoch field of the wire format"""
+        self.transport.send(self._id, msg_type, sender_id, payload or 0)
+
+
+class UdpTransport:
+    """Sends messages as UDP datagrams in the wire format, one datagram per message"""
+
+    def __init__(self, _id, base_port=BASE_PORT, host=HOST):
+        self._id = _id
+        self.base_port = base_port
+        self.host = host
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, base_port + _id))
+        self.receiver = None
+        self.closed = False
+
+    def start(self, process):
+        """Start receiving messages for process"""
+        self.receiver = Thread(target=self.receive, args=(process,), daemon=True)
+        self.receiver.start()
+
+    def send(self, _id, msg_type, sender_id, epoch=0):
+        """Send message to process with id _id"""
+        self.sock.sendto(wire.encode(msg_type, sender_id, epoch),
+                         (self.host, self.base_port + _id))
+
+    def receive(self, process):
+        """Receiver thread: enqueue incoming messages at process"""
+        buffer = bytearray(MAX_DATAGRAM)
+        view = memoryview(buffer)
+        while not self.closed:
+            try:
+                n = self.sock.recv_into(buffer)
+            except OSError:
+                break
+            # a datagram may hold a batch of messages
+            for msg_type, sender_id, epoch, _ in wire.decode_batch(view[:n]):
+                process.enqueue_message(sender_id, msg_type, epoch)
+
+    def close(self):
+        """Close the socket and stop receiving"""
+        self.closed = True
+        self.sock.close()
+
+
+class TcpTransport:
+    """Sends messages in the wire format over one TCP connection per peer"""
+
+    def __init__(self, _id, base_port=BASE_PORT, host=HOST):
+        self._id = _id
+        self.base_port = base_port
+        self.host = host
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((host, base_port + _id))
+        self.listener.listen()
+        self.connections = {}  # id -> outgoing socket
+        self.unreachable = {}  # id -> time before which a failed peer is not tried again
+        self.peer_locks = {}  # id -> lock serializing the sends to one peer
+        self.accepted = set()  # incoming sockets, closed by close
+        self.lock = Lock()  # guards peer_locks, accepted and receivers
+        self.receivers = []  # acceptor and receiver threads, joined by close
+        self.closed = False
+
+    def start(self, process):
+        """Start accepting connections and receiving messages for process"""
+        acceptor = Thread(target=self.accept, args=(process,), daemon=True)
+        acceptor.start()
+        self.receivers.append(acceptor)
+
+    def peer_lock(self, _id):
+        """Get the lock of the sends to process with id _id"""
+        with self.lock:
+            lock = self.peer_locks.get(_id)
+            if lock is None:
+                lock = self.peer_locks[_id] = Lock()
+            return lock
+
+    def connect(self, _id):
+        """Get the connection to process with id _id, None if it can not be reached.
+        A failed attempt is remembered, so a dead peer costs one attempt per RECONNECT_INTERVAL"""
+        conn = self.connections.get(_id)
+        if conn is not None:
+            return conn
+        if time.time() < self.unreachable.get(_id, 0):
+            return None
+        try:
+            conn = socket.create_connection((self.host, self.base_port + _id), timeout=CONNECT_TIMEOUT)
+        except OSError:
+            self.unreachable[_id] = time.time() + RECONNECT_INTERVAL
+            return None
+        self.unreachable.pop(_id, None)
+        conn.settimeout(None)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections[_id] = conn
+        return conn
+
+    def send(self, _id, msg_type, sender_id, epoch=0):
+        """Send message to process with id _id. Messages to unreachable processes are lost.
+        Only sends to the same peer wait for each other"""
+        with self.peer_lock(_id):
+            if self.closed:
+                return
+            conn = self.connect(_id)
+            if conn is None:
+                return
+            try:
+                conn.sendall(wire.encode(msg_type, sender_id, epoch))
+            except OSError:
+                # peer is gone, drop the connection so the next send reconnects
+                self.connections.pop(_id, None)
+                conn.close()
+
+    def accept(self, process):
+        """Acceptor thread: start a receiver for every incoming connection"""
+        while not self.closed:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                break
+            with self.lock:
+                # close may have run since accept returned
+                if self.closed:
+                    conn.close()
+                    break
+                self.accepted.add(conn)
+                receiver = Thread(target=self.receive, args=(conn, process), daemon=True)
+                self.receivers.append(receiver)
+            receiver.start()
+
+    def receive(self, conn, process):
+        """Receiver thread: enqueue messages from one connection at process"""
+        buffer = bytearray(wire.message_size(MAX_DATAGRAM))
+        view = memoryview(buffer)
+        try:
+            while not self.closed:
+                if not recv_exact(conn, view[:wire.HEADER.size]):
+                    return
+                msg_type, sender_id, epoch, payload, _ = wire.decode(view)
+                if len(payload) and not recv_exact(conn, view[wire.HEADER.size:wire.message_size(len(payload))]):
+                    return
+                process.enqueue_message(sender_id, msg_type, epoch)
+        finally:
+            with self.lock:
+                self.accepted.discard(conn)
+            conn.close()
+
+    def close(self):
+        """Close all sockets, stop receiving and wait for the receiver threads"""
+        with self.lock:
+            self.closed = True
+            accepted = list(self.accepted)
+            receivers = list(self.receivers)
+        # shutdown wakes up the threads blocked in accept and recv, close alone may not
+        for sock in [self.listener, *accepted]:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        for _id in list(self.connections):
+            with self.peer_lock(_id):
+                conn = self.connections.pop(_id, None)
+                if conn is not None:
+                    conn.close()
+        for receiver in receivers:
+            if receiver is not current_thread():
+                receiver.join(JOIN_TIMEOUT)
+
+
+def recv_exact(conn, view):
+    """Fill view from conn. Returns False if the connection was closed"""
+    received = 0
+    while received < len(view):
+        try:
+            n = conn.recv_into(view[received:])
+        except OSError:
+            return False
+        if n == 0:
+            return False
+        received += n
+    return True
+
+
+TRANSPORTS = {"udp": UdpTransport, "tcp": TcpTransport}
+
+
+def connect_process(process, transport, n):
+    """Give process a process list of n entries where all other processes are remote"""
+    process.processes = [process if i == process.get_id() else RemoteProcess(i, transport)
+                         for i in range(n)]
+    transport.start(process)
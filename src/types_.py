@@ -11,6 +11,28 @@ ELECTION = 2
 OK = 3
 I_AM_COORDINATOR = 1
 YOU_ARE_COORDINATOR = 4
+HEARTBEAT = 5  # sent by the failure detector, see failure_detector.py
+SUSPECT = 6  # local notice of the failure detector, never sent to another process
+
+MESSAGE_NAMES = {
+    ELECTION: "ELECTION",
+    OK: "OK",
+    I_AM_COORDINATOR: "I_AM_COORDINATOR",
+    YOU_ARE_COORDINATOR: "YOU_ARE_COORDINATOR",
+    HEARTBEAT: "HEARTBEAT",
+    SUSPECT: "SUSPECT",
+}
 
 # Time interval for becoming coordinator
 THRESHOLD = 2
+
+# Bounds of the adaptive OK timeout, see rtt.py
+MIN_TIMEOUT = 0.05
+MAX_TIMEOUT = 10
+
+# Heartbeats of the failure detector, see failure_detector.py
+HEARTBEAT_INTERVAL = 0.1
+PHI_THRESHOLD = 8
+
+# Time a coordinator announcement or heartbeat keeps a cached leader valid, see lease.py
+LEASE_DURATION = 1
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""Binary wire format for election messages.
+
+Every message is a fixed 12 byte header, optionally followed by a payload:
+msg_type (int8), padding, payload length (uint16), sender_id (int32), epoch (uint32).
+All helpers work on any writable/readable buffer through memoryview, without copies.
+"""
+import struct
+
+HEADER = struct.Struct("!bxHiI")  # msg_type, payload_len, sender_id, epoch
+EMPTY = memoryview(b"")
+
+
+def message_size(payload_len=0):
+    """Number of bytes a message with the given payload length takes"""
+    return HEADER.size + payload_len
+
+
+def encode(msg_type, sender_id, epoch=0, payload=b""):
+    """Encode a single message to bytes"""
+    header = HEADER.pack(msg_type, len(payload), sender_id, epoch)
+    return header + payload if payload else header
+
+
+def encode_into(buffer, offset, msg_type, sender_id, epoch=0, payload=b""):
+    """Write a message into buffer at offset. Returns the offset after the message"""
+    HEADER.pack_into(buffer, offset, msg_type, len(payload), sender_id, epoch)
+    offset += HEADER.size
+    if payload:
+        memoryview(buffer)[offset:offset + len(payload)] = payload
+    return offset + len(payload)
+
+
+def decode(buffer, offset=0):
+    """Read the message at offset. Returns (msg_type, sender_id, epoch, payload, next_offset)
+    where payload is a memoryview into buffer"""
+    msg_type, payload_len, sender_id, epoch = HEADER.unpack_from(buffer, offset)
+    start = offset + HEADER.size
+    if payload_len == 0:
+        return msg_type, sender_id, epoch, EMPTY, start
+    payload = memoryview(buffer)[start:start + payload_len]
+    return msg_type, sender_id, epoch, payload, start + payload_len
+
+
+def encode_batch(messages):
+    """Encode many (msg_type, sender_id[, epoch[, payload]]) tuples into one buffer"""
+    messages = list(messages)
+    size = sum(message_size(len(message[3]) if len(message) > 3 else 0) for message in messages)
+    buffer = bytearray(size)
+    pack_into = HEADER.pack_into
+    offset = 0
+    for message in messages:
+        if len(message) > 3:
+            offset = encode_into(buffer, offset, *message)
+        else:
+            pack_into(buffer, offset, message[0], 0, message[1], message[2] if len(message) > 2 else 0)
+            offset += HEADER.size
+    return buffer
+
+
+def decode_batch(buffer):
+    """Iterate over (msg_type, sender_id, epoch, payload) of all messages in buffer"""
+    view = memoryview(buffer)
+    unpack_from = HEADER.unpack_from
+    size = HEADER.size
+    end = len(view)
+    offset = 0
+    while offset < end:
+        msg_type, payload_len, sender_id, epoch = unpack_from(view, offset)
+        offset += size
+        if payload_len:
+            yield msg_type, sender_id, epoch, view[offset:offset + payload_len]
+            offset += payload_len
+        else:
+            yield msg_type, sender_id, epoch, EMPTY
@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from async_bully import AsyncCluster, AsyncProcessImproved, AsyncProcessOriginal
+from convergence import ConvergenceMonitor
+
+# Shorter OK threshold, so the tests only wait as long as an election takes
+TEST_THRESHOLD = 0.2
+TIMEOUT = 10
+
+
+async def run_election(process_cls, n, threshold=TEST_THRESHOLD):
+    """Run an election started at process 0 until all processes agree on a leader.
+    Returns the cluster afterwards"""
+    cluster = AsyncCluster(process_cls, n)
+    for process in cluster.processes:
+        process.threshold = threshold
+    # listeners run on the event loop, so the monitor can complete a future directly
+    agreed = asyncio.get_running_loop().create_future()
+    monitor = ConvergenceMonitor(cluster.processes)
+    monitor.add_callback(lambda leader: agreed.done() or agreed.set_result(leader))
+    cluster.start()
+    cluster.start_election(0)
+    await asyncio.wait_for(agreed, TIMEOUT)
+    monitor.close()
+    await cluster.stop()
+    return cluster
+
+
+class AsyncTests(unittest.TestCase):
+    """Testing elections with processes hosted in one event loop"""
+
+    def test_election_original(self):
+        """Test election with the original algorithm"""
+        N = 5
+        cluster = asyncio.run(run_election(AsyncProcessOriginal, N))
+        for i in range(N-1):
+            self.assertEqual(cluster.processes[i].coordinator, N-1)
+        self.assertEqual(cluster.processes[N-1].state, DEAD)
+        self.assertTrue(cluster.processes[N-1].coordinator_msg_sent)
+        # same message count as the threaded version
+        self.assertEqual(cluster.msg_count, 24)
+
+    def test_election_improved(self):
+        """Test election with the improved algorithm, many nodes in one loop"""
+        N = 2000
+        # every OK arrives before the threshold, so the election does not wait for it
+        cluster = asyncio.run(run_election(AsyncProcessImproved, N, THRESHOLD))
+        for i in range(N-1):
+            self.assertEqual(cluster.processes[i].current_coordinator, N-1)
+        self.assertTrue(cluster.processes[N-1].coordinator_msg_sent)
+        self.assertEqual(cluster.msg_count, 3 * (N-1) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from queue import Empty, Queue
+from threading import Event, Thread
+from time import sleep
+from types_ import *
+from batch_mailbox import BatchMailbox
+from bully_orginal import ProcessOriginal
+
+
+class TestBatchMailbox(unittest.TestCase):
+    """Test the swap-and-drain message queue"""
+
+    def setUp(self) -> None:
+        self.mailbox = BatchMailbox()
+
+    def test_batch(self):
+        """All pending messages come out at once, in FIFO order"""
+        for i in range(5):
+            self.mailbox.put((OK, i))
+        self.assertEqual(list(self.mailbox.get_batch(timeout=1)), [(OK, i) for i in range(5)])
+        self.assertTrue(self.mailbox.empty())
+        self.assertRaises(Empty, self.mailbox.get_batch, timeout=0.01)
+
+    def test_get(self):
+        """Single messages can still be taken one by one"""
+        self.mailbox.put((OK, 1))
+        self.mailbox.put(None)
+        self.assertEqual(self.mailbox.qsize(), 2)
+        self.assertEqual(self.mailbox.get(), (OK, 1))
+        self.assertIsNone(self.mailbox.get_nowait())
+        self.assertRaises(Empty, self.mailbox.get_nowait)
+
+    def test_wakeup(self):
+        """A waiting consumer wakes up when a message is put"""
+        thread = Thread(target=lambda: (sleep(0.05), self.mailbox.put((ELECTION, 2))))
+        thread.start()
+        self.assertEqual(list(self.mailbox.get_batch(timeout=5)), [(ELECTION, 2)])
+        thread.join()
+
+
+class TestBatchedStateMachine(unittest.TestCase):
+    """Test the state machine handling batches of messages"""
+
+    def test_backlog(self):
+        """A backlog of OKs is handled before the coordinator message behind it"""
+        processes = [ProcessOriginal(i) for i in range(3)]
+        for process in processes:
+            process.processes = processes
+        process = processes[0]
+        announced = Event()
+        process.listeners.append(lambda process: announced.set())
+        for _ in range(1000):
+            process.enqueue_message(1, OK, 0)
+        process.enqueue_message(2, I_AM_COORDINATOR, 0)
+        process.start_thread()
+        self.assertTrue(announced.wait(5))
+        self.assertEqual(process.get_coordinator(), 2)
+        self.assertEqual(process.oks, 1000)
+        process.kill()
+
+    def test_killed_in_batch(self):
+        """Messages of a batch are not handled once the process is stopped"""
+        process = ProcessOriginal(0)
+        process.processes = [process]
+        # stop when the coordinator message is handled
+        process.listeners.append(lambda process: process.stop_worker.set())
+        process.enqueue_message(1, I_AM_COORDINATOR, 0)
+        process.enqueue_message(1, OK, 0)
+        process.state_machine()
+        self.assertEqual(process.oks, 0)
+
+    def test_plain_queue(self):
+        """A queue without get_batch is read one message at a time"""
+        process = ProcessOriginal(0)
+        process.processes = [process]
+        process.message_queue = Queue()
+        announced = Event()
+        process.listeners.append(lambda process: announced.set())
+        process.start_thread()
+        process.enqueue_message(1, I_AM_COORDINATOR, 0)
+        self.assertTrue(announced.wait(5))
+        self.assertEqual(process.get_coordinator(), 1)
+        process.kill()
+
+
+if __name__ == "__main__":
+    unittest.main()
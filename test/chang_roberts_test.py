@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from async_bully import AsyncCluster, AsyncProcessRing
+from chang_roberts import ProcessRing
+from convergence import ConvergenceMonitor
+from simulation import SimulatedCluster
+
+N = 5
+TIMEOUT = 10
+
+
+class TestRing(unittest.TestCase):
+    """Simulated elections with the Chang-Roberts ring algorithm"""
+
+    def setUp(self) -> None:
+        self.cluster = SimulatedCluster(ProcessRing, N)
+        self.monitor = ConvergenceMonitor(self.cluster.processes)
+
+    def tearDown(self) -> None:
+        self.monitor.close()
+
+    def test_election(self):
+        """The highest id is elected, every hop is acknowledged"""
+        self.cluster.start_election(0)
+        self.cluster.run()
+        self.assertEqual(self.monitor.leader, N-1)
+        for process in self.cluster.processes:
+            self.assertFalse(process.unacked)
+        # ELECTION 0..N-1 and the candidate N-1 around the ring, I_AM_COORDINATOR around once more
+        hops = (N-1) + N + N
+        self.assertEqual(self.cluster.msg_count, 2 * hops)
+
+    def test_dead_successor(self):
+        """A successor that does not acknowledge is skipped"""
+        self.cluster.kill(N-1)
+        self.cluster.start_election(0)
+        self.cluster.run()
+        self.assertEqual(self.monitor.leader, N-2)
+        self.assertIn(N-1, self.cluster.processes[N-2].suspected)
+
+    def test_concurrent_candidates(self):
+        """Elections started by several processes end with one leader"""
+        self.cluster.start_election(0)
+        self.cluster.start_election(2)
+        self.cluster.run()
+        self.assertEqual(self.monitor.leader, N-1)
+
+    def test_async(self):
+        """The ring runs in an event loop too"""
+        async def run():
+            cluster = AsyncCluster(AsyncProcessRing, N)
+            agreed = asyncio.get_running_loop().create_future()
+            monitor = ConvergenceMonitor(cluster.processes)
+            monitor.add_callback(lambda leader: agreed.done() or agreed.set_result(leader))
+            cluster.start()
+            cluster.start_election(0)
+            self.assertEqual(await asyncio.wait_for(agreed, TIMEOUT), N-1)
+            monitor.close()
+            await cluster.stop()
+            return cluster
+        cluster = asyncio.run(run())
+        for process in cluster.processes[:-1]:
+            self.assertEqual(process.coordinator, N-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+import numpy as np
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from compact import CompactCluster, MessageBuffer
+from complexity import improved_messages, improved_messages_alive, original_messages_alive
+from simulation import SimulatedCluster
+
+ALGORITHMS = {"original": (ProcessOriginal, original_messages_alive),
+              "improved": (ProcessImproved, improved_messages_alive)}
+
+
+def simulate(process_cls, n, initiators, dead):
+    """Simulated cluster of process objects with a fixed OK timeout, after the elections"""
+    cluster = SimulatedCluster(process_cls, n, latency=0.001)
+    for process in cluster.processes:
+        process.rtt = None
+    for _id in dead:
+        cluster.kill(_id)
+    for _id in initiators:
+        cluster.start_election(_id)
+    cluster.run()
+    return cluster
+
+
+class TestMessageBuffer(unittest.TestCase):
+    """Test the flat message columns"""
+
+    def test_append(self):
+        """Records are appended across growing, scalars are broadcast"""
+        buffer = MessageBuffer(capacity=2)
+        buffer.append(ELECTION, np.array([0, 1, 2]), np.array([1, 2, 3]), 4, np.array([3, 2, 1]))
+        buffer.append(OK, np.array([0]), 3, 4, 3)
+        msg_type, node, lo, hi, count = buffer.records()
+        self.assertEqual(msg_type.tolist(), [ELECTION] * 3 + [OK])
+        self.assertEqual(node.tolist(), [0, 1, 2, 0])
+        self.assertEqual(hi.tolist(), [4, 4, 4, 4])
+        self.assertEqual(count.sum(), 9)
+        buffer.clear()
+        self.assertEqual(buffer.size, 0)
+
+
+class TestCompactCluster(unittest.TestCase):
+    """Compare the struct-of-arrays cluster with process objects"""
+
+    def test_single_elections(self):
+        """Message counts and leaders match for random sets of dead processes"""
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            n = int(rng.integers(2, 20))
+            alive = rng.random(n) < 0.7
+            alive[0] = True
+            initiator = int(rng.choice(np.flatnonzero(alive)))
+            dead = np.flatnonzero(~alive)
+            for algorithm, (process_cls, messages) in ALGORITHMS.items():
+                cluster = CompactCluster(n, algorithm, latency=0.001)
+                cluster.kill(dead)
+                cluster.start_election(initiator)
+                cluster.run()
+                self.assertEqual(cluster.total_msg_count, messages(alive, initiator))
+                expected = simulate(process_cls, n, [initiator], dead)
+                self.assertEqual(cluster.leader(), expected.processes[initiator].get_coordinator())
+
+    def test_storm(self):
+        """Concurrent elections of all processes match the simulated process objects"""
+        n = 20
+        for algorithm, (process_cls, _) in ALGORITHMS.items():
+            cluster = CompactCluster(n, algorithm, latency=0.001)
+            cluster.kill(n-1)
+            cluster.start_election(np.arange(n-1))
+            end = cluster.run()
+            expected = simulate(process_cls, n, range(n-1), [n-1])
+            self.assertEqual(cluster.total_msg_count, expected.msg_count)
+            self.assertEqual(cluster.msg_count.tolist(), [p.msg_count for p in expected.processes])
+            self.assertEqual(cluster.leader(), n-2)
+            self.assertAlmostEqual(end, expected.simulator.now)
+
+    def test_no_leader_yet(self):
+        """There is no leader while the election is running"""
+        cluster = CompactCluster(5, "improved")
+        cluster.kill(4)
+        cluster.start_election(0)
+        cluster.run(until=1)
+        self.assertIsNone(cluster.leader())
+        cluster.run()
+        self.assertEqual(cluster.leader(), 3)
+
+    def test_coordinator_timeout(self):
+        """Processes waiting for a coordinator that died after answering elect again"""
+        for algorithm in ALGORITHMS:
+            cluster = CompactCluster(5, algorithm, latency=0.001)
+            cluster.start_election(0)
+            cluster.run(until=0.002)
+            self.assertEqual(cluster.state[0], WAITING_FOR_COORDINATOR)
+            cluster.kill(4)
+            end = cluster.run()
+            self.assertEqual(cluster.leader(), 3)
+            self.assertGreaterEqual(end, 2 * THRESHOLD)
+
+    def test_million(self):
+        """A million processes take tens of bytes each"""
+        n = 10**6
+        cluster = CompactCluster(n, "improved", latency=0.001)
+        self.assertLessEqual(cluster.bytes_per_process(), 32)
+        cluster.start_election(0)
+        cluster.run()
+        self.assertEqual(cluster.leader(), n-1)
+        self.assertEqual(cluster.total_msg_count, improved_messages(n))
+
+    def test_unknown_algorithm(self):
+        """Only the bully algorithms are supported"""
+        self.assertRaises(ValueError, CompactCluster, 5, "ring")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+import numpy as np
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from complexity import improved_messages, improved_messages_alive, original_messages, original_messages_alive
+from simulation import SimulatedCluster
+
+
+def simulate(process_cls, n, initiator, dead):
+    """Message count of a simulated election"""
+    cluster = SimulatedCluster(process_cls, n)
+    for _id in dead:
+        cluster.kill(_id)
+    cluster.start_election(initiator)
+    cluster.run()
+    return cluster.msg_count
+
+
+class TestComplexity(unittest.TestCase):
+    """Validate the message count model against simulated elections"""
+
+    def test_measured_counts(self):
+        """Model reproduces the counts measured for the report"""
+        x_num = np.array([2, 5, 10, 15, 17, 20, 22, 25, 30, 32])
+        self.assertEqual(original_messages(x_num).tolist(), [3, 24, 99, 224, 288, 399, 483, 624, 899, 1023])
+        self.assertEqual(improved_messages(x_num).tolist(), [4, 13, 28, 43, 49, 58, 64, 73, 88, 94])
+
+    def test_failed_highest(self):
+        """Model matches simulation when the highest processes are dead"""
+        for n, initiator, failed in [(6, 0, 1), (8, 3, 2), (7, 4, 2), (9, 2, 0)]:
+            dead = range(n - failed, n)
+            self.assertEqual(original_messages(n, initiator, failed),
+                             simulate(ProcessOriginal, n, initiator, dead))
+            self.assertEqual(improved_messages(n, initiator, failed),
+                             simulate(ProcessImproved, n, initiator, dead))
+
+    def test_failed_set(self):
+        """Model matches simulation for arbitrary sets of dead processes"""
+        n = 10
+        dead = [2, 5, 9]
+        alive = np.ones(n, dtype=bool)
+        alive[dead] = False
+        initiators = np.array([0, 1, 3, 6, 8])
+        original = original_messages_alive(alive, initiators)
+        improved = improved_messages_alive(alive, initiators)
+        for i, initiator in enumerate(initiators):
+            self.assertEqual(original[i], simulate(ProcessOriginal, n, initiator, dead))
+            self.assertEqual(improved[i], simulate(ProcessImproved, n, initiator, dead))
+
+    def test_large_n(self):
+        """Model works on large arrays of cluster sizes"""
+        n = np.arange(2, 10**6 + 1)
+        self.assertEqual(original_messages(n)[-1], (10**6 - 1) * (10**6 + 1))
+        self.assertEqual(improved_messages(n)[-1], 3 * (10**6 - 1) + 1)
+
+    def test_dead_initiator(self):
+        """A dead initiator is rejected"""
+        self.assertRaises(ValueError, original_messages, 5, 4, 1)
+        self.assertRaises(ValueError, improved_messages_alive, [True, False], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
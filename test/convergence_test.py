@@ -0,0 +1,58 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from convergence import ConvergenceMonitor, wait_for_leader
+from simulation import SimulatedCluster
+
+N = 5
+
+
+class TestConvergenceMonitor(unittest.TestCase):
+    """Test convergence notifications of simulated elections"""
+
+    def test_callback(self):
+        """The callback is called once with the new leader"""
+        cluster = SimulatedCluster(ProcessOriginal, N)
+        monitor = ConvergenceMonitor(cluster.processes)
+        leaders = []
+        monitor.add_callback(leaders.append)
+        cluster.start_election(0)
+        cluster.run()
+        self.assertEqual(leaders, [N-1])
+        self.assertEqual(monitor.wait(0), N-1)
+
+    def test_coordinator_death(self):
+        """A dead coordinator is no leader, the next election converges again"""
+        cluster = SimulatedCluster(ProcessImproved, N)
+        monitor = ConvergenceMonitor(cluster.processes)
+        cluster.start_election(0)
+        cluster.run()
+        self.assertEqual(monitor.leader, N-1)
+        cluster.kill(N-1)
+        self.assertIsNone(monitor.leader)
+        cluster.start_election(0)
+        cluster.run()
+        self.assertEqual(monitor.leader, N-2)
+
+    def test_timeout(self):
+        """wait returns None when no election converges in time"""
+        processes = [ProcessImproved(i) for i in range(N)]
+        self.assertIsNone(wait_for_leader(processes, timeout=0.01))
+        for process in processes:
+            self.assertEqual(process.listeners, [])
+
+    def test_get_coordinator(self):
+        """Processes only report a coordinator outside of elections"""
+        process = ProcessOriginal(0)
+        self.assertIsNone(process.get_coordinator())
+        process.state = COORDINATOR
+        self.assertIsNone(process.get_coordinator())
+        process.coordinator_msg_sent = True
+        self.assertEqual(process.get_coordinator(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import random
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from convergence import ConvergenceMonitor
+from metrics import ClusterMetrics
+from network import NetworkModel
+from simulation import SimulatedCluster
+from storm import run_storm
+
+N = 10
+JITTER = 0.005  # followers notice the dead coordinator within this time
+
+
+class EpochTests:
+    """Election epochs, shared by the tests of both algorithms"""
+
+    process_cls = None
+
+    def setUp(self) -> None:
+        self.processes = [self.process_cls(i) for i in range(N)]
+        for process in self.processes:
+            process.processes = self.processes
+
+    def test_stale_coordinator_dropped(self):
+        """A coordinator message of an earlier epoch is ignored"""
+        process = self.processes[0]
+        process.epoch = 2
+        process.message_handler(3, I_AM_COORDINATOR, 1)
+        self.assertIsNone(process.get_coordinator())
+        process.message_handler(3, I_AM_COORDINATOR, 2)
+        self.assertEqual(process.get_coordinator(), 3)
+
+    def test_stale_election_answered(self):
+        """A stale election is answered with the newer epoch, without starting an election"""
+        process = self.processes[5]
+        process.epoch = 2
+        process.message_handler(1, ELECTION, 1)
+        self.assertEqual(self.processes[1].message_queue.get_nowait(), (OK, 5, 2))
+        self.assertEqual(process.state, NORMAL)
+
+    def test_newer_epoch_joined(self):
+        """Messages of a newer epoch move the receiver to that epoch"""
+        process = self.processes[5]
+        process.message_handler(1, ELECTION, 3)
+        self.assertEqual(process.epoch, 3)
+
+    def run_storm(self):
+        """Kill the coordinator and let every follower start an election. Returns the sent counts"""
+        cluster = SimulatedCluster(self.process_cls, N, latency=0.001)
+        cluster.start_election(0)
+        cluster.run()
+        cluster.kill(N-1)
+        metrics = ClusterMetrics(cluster.processes)
+        monitor = ConvergenceMonitor(cluster.processes)
+        rnd = random.Random(1)
+        for i in range(N-1):
+            cluster.simulator.schedule(rnd.uniform(0, JITTER), cluster.start_election, i)
+        cluster.run()
+        self.assertEqual(monitor.leader, N-2)
+        for process in cluster.processes[:-1]:
+            self.assertEqual(process.epoch, 1)
+        sent = metrics.snapshot()["sent"]
+        # every follower asks every higher process once, and there is one announcement
+        self.assertEqual(sent["ELECTION"], N * (N-1) // 2)
+        self.assertEqual(sent["I_AM_COORDINATOR"], N-1)
+        return sent
+
+    def test_storm(self):
+        """When every follower notices the dead coordinator, they share one epoch"""
+        self.run_storm()
+
+    def test_coordinator_dies_before_announcing(self):
+        """Processes waiting for a coordinator that died elect again"""
+        cluster = SimulatedCluster(self.process_cls, 5, latency=0.01)
+        cluster.start_election(0)
+        cluster.run(until=0.025)
+        cluster.kill(4)
+        cluster.run(until=10)
+        self.assertEqual(cluster.processes[0].get_coordinator(), 3)
+        for i in range(4):
+            cluster.start_election(i)
+        cluster.run(until=100)
+        for process in cluster.processes[:-1]:
+            self.assertEqual(process.get_coordinator(), 3)
+
+    def test_missed_announcement(self):
+        """A process that missed the announcement of an epoch elects in a new one once it times out"""
+        network = NetworkModel()
+        cluster = SimulatedCluster(self.process_cls, 5, network=network)
+        network.set_link(4, 0, drop=1)
+        cluster.start_election(1)
+        cluster.run()
+        network.set_link(4, 0, drop=0)
+        cluster.kill(4)
+        cluster.start_election(0)
+        cluster.run(until=200)
+        for process in cluster.processes[:-1]:
+            self.assertEqual(process.get_coordinator(), 3)
+            self.assertEqual(process.epoch, 1)
+
+    def test_suspected_coordinator(self):
+        """A process whose coordinator is suspected joins an election of the decided epoch"""
+        cluster = SimulatedCluster(self.process_cls, 5)
+        cluster.start_election(0)
+        cluster.run()
+        cluster.kill(4)
+        cluster.processes[3].suspected.add(4)
+        cluster.processes[3].enqueue_message(0, ELECTION, cluster.processes[0].epoch)
+        cluster.run()
+        for process in cluster.processes[:-1]:
+            self.assertEqual(process.get_coordinator(), 3)
+
+    def test_lower_announcement(self):
+        """A coordinator that receives the announcement of a lower process takes over in a new epoch"""
+        cluster = SimulatedCluster(self.process_cls, 5)
+        cluster.start_election(0)
+        cluster.run()
+        epoch = cluster.processes[4].epoch
+        for process in cluster.processes[3:]:
+            process.enqueue_message(2, I_AM_COORDINATOR, epoch)
+        cluster.run()
+        for process in cluster.processes:
+            self.assertEqual(process.get_coordinator(), 4)
+        self.assertEqual(cluster.processes[4].epoch, epoch + 1)
+
+    def test_overloaded_storm(self):
+        """Processes that time out while their OKs are queued still agree on one leader"""
+        n = 60
+        report = run_storm(self.process_cls, n, jitter=0.5, seed=1, service_time=0.04)
+        self.assertEqual(report["leader"], n-2)
+
+    def test_retry_while_waiting_for_coordinator(self):
+        """A retry once the coordinator timed out starts a new election instead of merging"""
+        process = self.processes[0]
+        process.start_election()
+        process.message_handler(4, OK, process.epoch)
+        process.election_start_time -= process.threshold
+        process.check_state()
+        self.assertEqual(process.state, WAITING_FOR_COORDINATOR)
+        process.start_election()
+        self.assertEqual(process.state, WAITING_FOR_COORDINATOR)
+        process.coordinator_wait_start -= process.coordinator_timeout
+        epoch = process.epoch
+        process.start_election()
+        self.assertEqual(process.state, WAITING_FOR_OK)
+        self.assertEqual(process.epoch, epoch + 1)
+
+
+class TestEpochsOriginal(EpochTests, unittest.TestCase):
+    """Election epochs of the original algorithm"""
+
+    process_cls = ProcessOriginal
+
+    def test_late_election_merged(self):
+        """An election of a decided epoch does not start another one"""
+        cluster = SimulatedCluster(ProcessOriginal, N)
+        cluster.start_election(0)
+        cluster.run()
+        count = cluster.msg_count
+        cluster.processes[N-1].enqueue_message(0, ELECTION, 0)
+        cluster.processes[3].enqueue_message(0, ELECTION, 0)
+        cluster.run()
+        # the two elections, their OKs, and the coordinator repeats its announcement to the sender
+        self.assertEqual(cluster.msg_count - count, 2 + 2 + 1)
+        self.assertEqual(cluster.processes[0].get_coordinator(), N-1)
+
+
+class TestEpochsImproved(EpochTests, unittest.TestCase):
+    """Election epochs of the improved algorithm"""
+
+    process_cls = ProcessImproved
+
+    def test_storm(self):
+        """The new coordinator cross checks once, no matter how many processes ask it to"""
+        sent = self.run_storm()
+        self.assertEqual(sent["YOU_ARE_COORDINATOR"], N-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from event_trace import HANDLE, SEND, STATE, TraceRecorder, read_trace
+from simulation import SimulatedCluster
+
+N = 5
+
+
+class TestTraceRecorder(unittest.TestCase):
+    """Test tracing of simulated elections"""
+
+    def setUp(self) -> None:
+        """Create a trace file"""
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, "election.trace")
+
+    def tearDown(self) -> None:
+        """Remove the trace file"""
+        os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def trace_election(self, process_cls, capacity=1 << 16):
+        """Trace an election started by process 0"""
+        cluster = SimulatedCluster(process_cls, N)
+        recorder = TraceRecorder(self.path, capacity)
+        for process in cluster.processes:
+            recorder.attach(process)
+        cluster.start_election(0)
+        cluster.run()
+        recorder.close()
+        return cluster, read_trace(self.path)
+
+    def test_original(self):
+        """Every message is traced when sent and when handled"""
+        cluster, records = self.trace_election(ProcessOriginal)
+        events = [record[2] for record in records]
+        self.assertEqual(events.count(SEND), cluster.msg_count)
+        self.assertEqual(events.count(HANDLE), cluster.msg_count)
+        transitions = [(record[1], record[5]) for record in records if record[2] == STATE]
+        self.assertEqual(transitions[0], (0, WAITING_FOR_OK))
+        self.assertIn((N-1, COORDINATOR), transitions)
+        # every other process ends up accepting the coordinator
+        final = dict(transitions)
+        for i in range(N-1):
+            self.assertEqual(final[i], NORMAL)
+
+    def test_records_in_time_order(self):
+        """Records are read oldest first"""
+        _, records = self.trace_election(ProcessImproved)
+        times = [record[0] for record in records]
+        self.assertEqual(times, sorted(times))
+
+    def test_ring(self):
+        """A full ring keeps the newest records"""
+        _, records = self.trace_election(ProcessOriginal)
+        _, ring = self.trace_election(ProcessOriginal, capacity=8)
+        self.assertEqual(ring, records[-8:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from convergence import ConvergenceMonitor
+from failure_detector import HeartbeatService, PhiAccrualDetector
+from network import NetworkModel
+from simulation import SimulatedCluster
+
+N = 5
+
+
+class TestPhiAccrualDetector(unittest.TestCase):
+    """Test the suspicion level of the detector"""
+
+    def test_phi(self):
+        """phi is low while heartbeats are on time and grows once they stop"""
+        detector = PhiAccrualDetector(interval=1)
+        self.assertEqual(detector.phi(0), 0)
+        for t in range(10):
+            detector.heartbeat(t)
+        self.assertLess(detector.phi(9.5), 1)
+        self.assertLess(detector.phi(10), detector.phi(11))
+        self.assertGreater(detector.phi(12), PHI_THRESHOLD)
+
+    def test_window(self):
+        """Only the last `window` intervals are used"""
+        detector = PhiAccrualDetector(interval=1, window=3)
+        for t in (0, 5, 10, 11, 12, 13):
+            detector.heartbeat(t)
+        self.assertEqual(list(detector.intervals), [1, 1, 1])
+        self.assertAlmostEqual(detector.total, 3)
+
+
+class TestHeartbeatService(unittest.TestCase):
+    """Test automatic elections after a coordinator failure"""
+
+    def test_simulated(self):
+        """A dead coordinator is replaced without starting an election by hand"""
+        cluster = SimulatedCluster(ProcessImproved, N)
+        cluster.start_heartbeats(interval=0.1)
+        cluster.start_election(0)
+        cluster.run(until=1)
+        cluster.kill(N-1)
+        cluster.run(until=5)
+        self.assertEqual(cluster.processes[N-2].get_coordinator(), N-2)
+        for i in range(N-2):
+            self.assertEqual(cluster.processes[i].get_coordinator(), N-2)
+        # the followers share one detector per coordinator
+        self.assertEqual(set(cluster.heartbeats.detectors), {N-1, N-2})
+        self.assertGreater(cluster.heartbeats.heartbeats, 0)
+
+    def test_partitioned_coordinator(self):
+        """Heartbeats travel through the network, a live coordinator cut off from its followers is replaced"""
+        network = NetworkModel()
+        cluster = SimulatedCluster(ProcessImproved, N, network=network)
+        cluster.start_heartbeats(interval=0.1)
+        cluster.start_election(0)
+        cluster.run(until=1)
+        self.assertEqual(cluster.processes[0].get_coordinator(), N-1)
+        network.partition([N-1], list(range(N-1)))
+        cluster.run(until=5)
+        self.assertEqual(cluster.processes[N-1].state, COORDINATOR)
+        for i in range(N-1):
+            self.assertEqual(cluster.processes[i].get_coordinator(), N-2)
+
+    def test_threads(self):
+        """The service detects a dead coordinator of threaded processes"""
+        processes = [ProcessOriginal(i) for i in range(N)]
+        for process in processes:
+            process.processes = processes
+            process.threshold = 0.2
+            process.start_thread()
+        service = HeartbeatService(processes, interval=0.02)
+        service.start()
+        monitor = ConvergenceMonitor(processes)
+        processes[0].start_election()
+        self.assertEqual(monitor.wait(10), N-1)
+        processes[N-1].kill()
+        self.assertEqual(monitor.wait(10), N-2)
+        service.stop()
+        for process in processes:
+            process.kill()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from hierarchical import HierarchicalCluster
+from simulation import SimulatedCluster
+
+N = 100
+GROUP_SIZE = 10
+
+
+class TestHierarchicalCluster(unittest.TestCase):
+    """Test two-level elections on the simulator"""
+
+    def setUp(self) -> None:
+        """Elect the global leader"""
+        self.cluster = HierarchicalCluster(N, GROUP_SIZE)
+        self.cluster.start()
+        self.cluster.run()
+
+    def live_views(self):
+        """Global leaders announced to the live processes"""
+        return {self.cluster.global_view(_id) for _id in range(N)
+                if self.cluster.process(_id).state != DEAD}
+
+    def test_election(self):
+        """Every process learns the highest process as global leader"""
+        self.assertEqual(self.cluster.global_leader(), N-1)
+        self.assertEqual(self.live_views(), {N-1})
+        self.assertEqual(self.cluster.leaders, list(range(GROUP_SIZE-1, N, GROUP_SIZE)))
+        # one I_AM_COORDINATOR of the global leader reaches every process
+        self.assertEqual(self.cluster.views.msg_count, N)
+
+    def test_local_failure(self):
+        """A failed local leader is replaced without top-level messages"""
+        top_messages = self.cluster.top.msg_count
+        messages = self.cluster.msg_count
+        self.cluster.kill(39)
+        self.cluster.start_election(30)
+        self.cluster.run()
+        self.assertEqual(self.cluster.leaders[3], 38)
+        self.assertEqual(self.cluster.top.msg_count, top_messages)
+        self.assertLess(self.cluster.msg_count - messages, 3 * GROUP_SIZE)
+        self.assertEqual(self.live_views(), {N-1})
+
+    def test_global_failure(self):
+        """A failed global leader is succeeded within its group and announced"""
+        self.cluster.kill(N-1)
+        self.cluster.start_election(N-GROUP_SIZE)
+        self.cluster.run()
+        self.assertEqual(self.cluster.global_leader(), N-2)
+        self.assertEqual(self.live_views(), {N-2})
+        self.assertEqual(self.cluster.views.msg_count, 2*N - 1)
+
+    def test_group_failure(self):
+        """When the whole global group dies the seats elect another group"""
+        for _id in range(N-GROUP_SIZE, N):
+            self.cluster.kill(_id)
+        self.cluster.run()
+        self.assertEqual(self.cluster.global_leader(), N-GROUP_SIZE-1)
+        self.assertEqual(self.live_views(), {N-GROUP_SIZE-1})
+
+    def test_fewer_messages_than_flat(self):
+        """Groups of the original algorithm send far fewer messages than one flat cluster"""
+        hierarchical = HierarchicalCluster(N, GROUP_SIZE, ProcessOriginal)
+        hierarchical.start()
+        hierarchical.run()
+        flat = SimulatedCluster(ProcessOriginal, N)
+        flat.start_election(0)
+        flat.run()
+        self.assertEqual(hierarchical.global_leader(), N-1)
+        self.assertLess(hierarchical.msg_count, flat.msg_count / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
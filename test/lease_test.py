@@ -0,0 +1,55 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from lease import LeaderLookup
+from simulation import SimulatedCluster
+
+N = 5
+
+
+class TestLeaderLookup(unittest.TestCase):
+    """Test the leader lease of simulated processes"""
+
+    def setUp(self) -> None:
+        """Elect a leader with a lookup on the lowest process"""
+        self.cluster = SimulatedCluster(ProcessOriginal, N)
+        self.lookup = LeaderLookup(self.cluster.processes[0], duration=1)
+        self.assertIsNone(self.lookup.leader())
+        self.cluster.start_election(0)
+        self.cluster.run()
+
+    def test_lease(self):
+        """The leader is cached until the lease expires"""
+        self.assertEqual(self.lookup.leader(), N-1)
+        messages = self.cluster.msg_count
+        self.cluster.simulator.now += 0.5
+        self.assertEqual(self.lookup.leader(), N-1)
+        self.assertEqual(self.cluster.msg_count, messages)
+        self.cluster.simulator.now += 5
+        self.assertIsNone(self.lookup.leader())
+
+    def test_election_keeps_lease(self):
+        """Only a new coordinator announcement replaces the lease"""
+        self.cluster.kill(N-1)
+        self.cluster.start_election(0)
+        self.assertEqual(self.lookup.leader(), N-1)
+        self.cluster.run()
+        self.assertEqual(self.lookup.leader(), N-2)
+
+    def test_heartbeats_renew(self):
+        """Heartbeats of the leader renew the lease, the failure detector replaces a dead leader"""
+        self.cluster.start_heartbeats(interval=0.1)
+        self.cluster.heartbeats.add_lease(self.lookup)
+        start = self.cluster.simulator.now
+        self.cluster.run(until=start + 5)
+        self.assertEqual(self.lookup.leader(), N-1)
+        self.cluster.kill(N-1)
+        self.cluster.run(until=start + 5.5)
+        self.assertEqual(self.lookup.leader(), N-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
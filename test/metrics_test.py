@@ -0,0 +1,89 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from metrics import ClusterMetrics, Histogram
+from simulation import SimulatedCluster
+from threading import Thread
+
+
+class TestHistogram(unittest.TestCase):
+    """Test the log-linear histogram"""
+
+    def test_percentiles(self):
+        """Percentiles are within the precision of the buckets"""
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.record(i * 1e-6)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 500e-6, delta=500e-6 / 16)
+        self.assertAlmostEqual(histogram.percentile(99), 990e-6, delta=990e-6 / 16)
+        self.assertEqual(histogram.max, 1000e-6)
+
+    def test_merge(self):
+        """Merged histograms contain the values of both"""
+        first, second = Histogram(), Histogram()
+        first.record(1e-3)
+        second.record(2e-3)
+        first.merge(second)
+        self.assertEqual(first.count, 2)
+        self.assertAlmostEqual(first.summary()["mean"], 1.5e-3)
+
+
+class TestShardedCounter(unittest.TestCase):
+    """Test the message count of processes"""
+
+    def test_concurrent_senders(self):
+        """Messages sent to one process from many threads are all counted"""
+        receiver = ProcessOriginal(0)
+        senders = [ProcessOriginal(i) for i in range(1, 9)]
+
+        def send(sender):
+            for _ in range(10000):
+                sender.send(receiver, OK)
+        threads = [Thread(target=send, args=(sender,)) for sender in senders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(receiver.msg_count, 80000)
+
+
+class TestClusterMetrics(unittest.TestCase):
+    """Test per message type counters of simulated elections"""
+
+    def test_original(self):
+        """Counts of the original algorithm"""
+        cluster = SimulatedCluster(ProcessOriginal, 5)
+        metrics = ClusterMetrics(cluster.processes)
+        cluster.start_election(0)
+        cluster.run()
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["sent"], {"ELECTION": 10, "OK": 10, "I_AM_COORDINATOR": 4, "YOU_ARE_COORDINATOR": 0,
+                                            "HEARTBEAT": 0, "SUSPECT": 0})
+        self.assertEqual(snapshot["received"], snapshot["sent"])
+        self.assertEqual(snapshot["handler_time"]["count"], 24)
+        self.assertEqual(snapshot["queue_wait"]["count"], 24)
+
+    def test_improved_with_dead_process(self):
+        """Messages to a dead process are sent but never received"""
+        cluster = SimulatedCluster(ProcessImproved, 5)
+        metrics = ClusterMetrics(cluster.processes)
+        cluster.kill(4)
+        cluster.start_election(0)
+        cluster.run()
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["sent"], {"ELECTION": 5, "OK": 3, "I_AM_COORDINATOR": 4, "YOU_ARE_COORDINATOR": 1,
+                                            "HEARTBEAT": 0, "SUSPECT": 0})
+        self.assertEqual(snapshot["received"]["ELECTION"], 3)
+        self.assertEqual(snapshot["received"]["I_AM_COORDINATOR"], 3)
+
+    def test_disabled(self):
+        """Processes have no metrics unless attached"""
+        self.assertIsNone(ProcessImproved(0).metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from mp_backend import MpCluster, RingMailbox
+from multiprocessing import Lock, Semaphore
+from queue import Empty
+
+# Shorter OK threshold, so the tests only wait as long as an election takes
+TEST_THRESHOLD = 0.2
+TIMEOUT = 10
+
+
+class RingMailboxTests(unittest.TestCase):
+    """Test the shared-memory ring buffer"""
+
+    def setUp(self) -> None:
+        self.mailbox = RingMailbox(None, 4, Lock(), Semaphore(0), create=True)
+
+    def tearDown(self) -> None:
+        self.mailbox.close()
+        self.mailbox.shm.unlink()
+
+    def test_fifo(self):
+        """Messages come out in the order they were put, across wrap-around"""
+        for i in range(10):
+            self.mailbox.put((OK, i, i))
+            self.assertEqual(self.mailbox.get(timeout=1), (OK, i, i))
+        self.assertTrue(self.mailbox.empty())
+        self.assertEqual(self.mailbox.count(), 10)
+
+    def test_wakeup(self):
+        """put(None) wakes the consumer without a message"""
+        self.mailbox.put(None)
+        self.assertIsNone(self.mailbox.get(timeout=1))
+        self.assertRaises(Empty, self.mailbox.get, timeout=0.01)
+
+    def test_full(self):
+        """A producer does not wait on a full ring, the message is dropped"""
+        for i in range(4):
+            self.assertTrue(self.mailbox.put((OK, i, 0)))
+        self.assertFalse(self.mailbox.put((OK, 4, 0)))
+        self.assertEqual(self.mailbox.dropped(), 1)
+        self.assertEqual(self.mailbox.get(timeout=1), (OK, 0, 0))
+        self.assertTrue(self.mailbox.put((OK, 5, 0)))
+
+
+class MpClusterTests(unittest.TestCase):
+    """Testing elections with one OS process per node"""
+
+    def run_election(self, algorithm, n):
+        cluster = MpCluster(algorithm, n, threshold=TEST_THRESHOLD)
+        cluster.start()
+        cluster.start_election(0)
+        self.assertEqual(cluster.wait_for_leader(TIMEOUT), n-1)
+        return cluster.stop()
+
+    def test_election_original(self):
+        """Test election with the original algorithm"""
+        N = 5
+        results = self.run_election("original", N)
+        for result in results[:-1]:
+            self.assertEqual(result["state"], NORMAL)
+            self.assertEqual(result["leader"], N-1)
+        self.assertEqual(results[-1]["state"], COORDINATOR)
+        self.assertEqual(sum(result["msg_count"] for result in results), 24)
+
+    def test_election_improved(self):
+        """Test election with the improved algorithm"""
+        N = 5
+        results = self.run_election("improved", N)
+        for result in results[:-1]:
+            self.assertEqual(result["leader"], N-1)
+        self.assertEqual(results[-1]["state"], COORDINATOR)
+        self.assertEqual(sum(result["msg_count"] for result in results), 13)
+
+    def test_stop_unresponsive(self):
+        """stop returns after its timeout when a node does not report, and no worker is left running"""
+        N = 3
+        cluster = MpCluster("improved", N, threshold=TEST_THRESHOLD)
+        cluster.start()
+        cluster.workers[0].terminate()
+        results = cluster.stop(timeout=1)
+        self.assertEqual([result["id"] for result in results], [1, 2])
+        for worker in cluster.workers:
+            self.assertFalse(worker.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
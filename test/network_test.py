@@ -0,0 +1,70 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from convergence import ConvergenceMonitor
+from network import NetworkModel
+from simulation import SimulatedCluster
+
+N = 10
+
+
+class TestNetworkModel(unittest.TestCase):
+    """Test simulated elections over a modelled network"""
+
+    def run_election(self, process_cls, network):
+        """Run an election started by process 0, returns the cluster and the time of the last event"""
+        cluster = SimulatedCluster(process_cls, N, network=network)
+        cluster.start_election(0)
+        return cluster, cluster.run(until=30)
+
+    def test_seeded(self):
+        """The same seed gives the same run"""
+        runs = []
+        for _ in range(2):
+            network = NetworkModel(seed=7, latency=0.01, jitter=0.005, drop=0.1, duplicate=0.1, reorder=0.1)
+            cluster, end = self.run_election(ProcessOriginal, network)
+            runs.append((end, cluster.msg_count, network.stats()))
+        self.assertEqual(runs[0], runs[1])
+        self.assertGreater(runs[0][2]["dropped"], 0)
+        self.assertGreater(runs[0][2]["duplicated"], 0)
+
+    def test_lossless(self):
+        """Without drops or duplicates the message count does not change"""
+        expected, _ = self.run_election(ProcessImproved, None)
+        for distribution in ("constant", "uniform", "normal", "exponential", "lognormal"):
+            network = NetworkModel(latency=0.01, jitter=0.005, distribution=distribution)
+            cluster, _ = self.run_election(ProcessImproved, network)
+            self.assertEqual(cluster.msg_count, expected.msg_count)
+            self.assertEqual(network.stats(), {"sent": cluster.msg_count, "dropped": 0, "duplicated": 0})
+
+    def test_link(self):
+        """A lossy link loses the messages sent over it"""
+        network = NetworkModel()
+        network.set_link(0, N-1, drop=1)
+        cluster, _ = self.run_election(ProcessImproved, network)
+        self.assertEqual(network.dropped, 1)
+        self.assertEqual(cluster.processes[N-1].get_coordinator(), N-1)
+
+    def test_partition(self):
+        """Both sides of a partition elect their own leader, after healing one leader remains"""
+        network = NetworkModel(latency=0.01)
+        cluster = SimulatedCluster(ProcessImproved, N, network=network)
+        monitor = ConvergenceMonitor(cluster.processes)
+        cluster.schedule_partition(0, [range(N // 2), range(N // 2, N)], heal_at=5.5)
+        cluster.start_election(0)
+        cluster.start_election(N // 2)
+        cluster.run(until=5)
+        self.assertEqual(cluster.processes[0].get_coordinator(), N // 2 - 1)
+        self.assertEqual(cluster.processes[N // 2].get_coordinator(), N-1)
+        self.assertIsNone(monitor.leader)
+        cluster.run(until=6)
+        cluster.start_election(0)
+        cluster.run(until=10)
+        self.assertEqual(monitor.leader, N-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
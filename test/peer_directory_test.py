@@ -0,0 +1,55 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from peer_directory import PeerDirectory
+
+
+class TestPeerDirectory(unittest.TestCase):
+    """Test the methods in peer_directory.py"""
+
+    def setUp(self) -> None:
+        self.ids = [3, 42, 7, 100, 15]
+        self.directory = PeerDirectory(ProcessImproved(i) for i in self.ids)
+
+    def ids_of(self, processes):
+        return [process.get_id() for process in processes]
+
+    def test_order(self):
+        """Processes are kept in id order"""
+        self.assertEqual(self.ids_of(self.directory), sorted(self.ids))
+        self.assertEqual(len(self.directory), len(self.ids))
+        self.assertEqual(self.directory.get(42).get_id(), 42)
+
+    def test_higher(self):
+        """higher() returns the processes with a higher id"""
+        self.assertEqual(self.ids_of(self.directory.higher(7)), [15, 42, 100])
+        self.assertEqual(self.ids_of(self.directory.higher(8)), [15, 42, 100])
+        self.assertEqual(self.directory.higher(100), [])
+
+    def test_others(self):
+        """others() returns all processes except one"""
+        self.assertEqual(self.ids_of(self.directory.others(15)), [3, 7, 42, 100])
+
+    def test_membership_change(self):
+        """Cached target lists are updated when processes join and leave"""
+        higher = self.directory.higher(7)
+        others = self.directory.others(100)
+        self.directory.add(ProcessImproved(20))
+        self.directory.remove(42)
+        self.assertEqual(self.ids_of(higher), [15, 20, 100])
+        self.assertEqual(self.ids_of(others), [3, 7, 15, 20])
+        self.assertNotIn(42, self.directory)
+        self.assertRaises(ValueError, self.directory.add, ProcessImproved(3))
+
+    def test_process_list(self):
+        """Processes with a plain process list index it on first use"""
+        process = self.directory.get(3)
+        process.processes = list(self.directory)
+        self.assertEqual(process.get_process(100).get_id(), 100)
+        self.assertEqual(self.ids_of(process.get_peers().higher(3)), [7, 15, 42, 100])
+
+
+if __name__ == "__main__":
+    unittest.main()
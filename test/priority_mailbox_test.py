@@ -0,0 +1,108 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from queue import Empty, Queue
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from convergence import wait_for_leader
+from priority_mailbox import PriorityMailbox
+
+N = 100
+
+
+class TestPriorityMailbox(unittest.TestCase):
+    """Test ordering and dropping of queued messages"""
+
+    def setUp(self) -> None:
+        self.mailbox = PriorityMailbox()
+
+    def test_order(self):
+        """Newer epochs first, then coordinator messages, then FIFO"""
+        self.mailbox.put((ELECTION, 1, 0))
+        self.mailbox.put((OK, 2, 0))
+        self.mailbox.put((ELECTION, 3, 1))
+        self.mailbox.put((YOU_ARE_COORDINATOR, 4, 0))
+        self.mailbox.put((OK, 5, 0))
+        order = [self.mailbox.get_nowait()[1] for _ in range(2)]
+        order += [message[1] for message in self.mailbox.get_batch()]
+        self.assertEqual(order, [3, 4, 2, 5, 1])
+
+    def test_drop(self):
+        """A coordinator message drops queued ELECTION and OK messages up to its epoch"""
+        self.mailbox.put((ELECTION, 1, 0))
+        self.mailbox.put((OK, 2, 1))
+        self.mailbox.put((ELECTION, 3, 2))
+        self.mailbox.put((YOU_ARE_COORDINATOR, 4, 1))
+        self.mailbox.put((I_AM_COORDINATOR, 9, 1))
+        self.assertEqual(self.mailbox.dropped, 2)
+        self.assertEqual(self.mailbox.get_nowait(), (ELECTION, 3, 2))
+        self.assertEqual(self.mailbox.get_nowait(), (I_AM_COORDINATOR, 9, 1))
+        self.assertEqual(self.mailbox.get_nowait(), (YOU_ARE_COORDINATOR, 4, 1))
+        self.assertRaises(Empty, self.mailbox.get_nowait)
+
+    def test_coordinator_during_batch(self):
+        """A coordinator message put while a batch is handled comes next and drops the rest"""
+        for i in range(5):
+            self.mailbox.put((ELECTION, i, 0))
+        batch = iter(self.mailbox.get_batch(timeout=1))
+        self.assertEqual(next(batch), (ELECTION, 0, 0))
+        self.mailbox.put((I_AM_COORDINATOR, 9, 0))
+        self.assertEqual(list(batch), [(I_AM_COORDINATOR, 9, 0)])
+        self.assertEqual(self.mailbox.dropped, 4)
+
+    def test_wakeup(self):
+        """None wakes the consumer before any message"""
+        self.mailbox.put((OK, 1, 0))
+        self.mailbox.put(None)
+        self.assertIsNone(self.mailbox.get(timeout=1))
+        self.assertEqual(self.mailbox.qsize(), 1)
+
+    def check_backlog(self, process_cls):
+        """A backlog of elections, answered in FIFO order and skipped with the priority mailbox"""
+        handled = {}
+        for mailbox_cls in (Queue, PriorityMailbox):
+            processes = [process_cls(i) for i in range(N + 1)]
+            process = processes[N-1]
+            process.message_queue = mailbox_cls()
+            for p in processes:
+                p.processes = processes
+            for i in range(N-1):
+                process.enqueue_message(i, ELECTION, 0)
+            process.enqueue_message(N, I_AM_COORDINATOR, 0)
+            sent = sum(p.msg_count for p in processes)
+            count = 0
+            while not process.message_queue.empty():
+                process.dispatch(process.message_queue.get_nowait())
+                count += 1
+            self.assertEqual(process.get_coordinator(), N)
+            handled[mailbox_cls] = (count, sum(p.msg_count for p in processes) - sent)
+        # FIFO answers every election with OK and elects on its own
+        self.assertGreaterEqual(handled[Queue][1], N-1)
+        self.assertEqual(handled[PriorityMailbox], (1, 0))
+
+    def test_backlog_original(self):
+        """Backlog of the original algorithm"""
+        self.check_backlog(ProcessOriginal)
+
+    def test_backlog_improved(self):
+        """Backlog of the improved algorithm"""
+        self.check_backlog(ProcessImproved)
+
+    def test_threads(self):
+        """Threaded elections with the priority mailbox elect the highest process"""
+        for process_cls in (ProcessOriginal, ProcessImproved):
+            processes = [process_cls(i) for i in range(5)]
+            for process in processes:
+                process.processes = processes
+                process.threshold = 0.2
+                process.message_queue = PriorityMailbox()
+                process.start_thread()
+            processes[0].start_election()
+            self.assertEqual(wait_for_leader(processes, 10), 4)
+            for process in processes:
+                process.kill()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from convergence import ConvergenceMonitor
+from process_base import ProcessBase
+from raft_vote import ProcessRaft
+from simulation import SimulatedCluster
+
+N = 5
+
+
+class TestRaft(unittest.TestCase):
+    """Simulated elections with majority votes and randomized timeouts"""
+
+    def setUp(self) -> None:
+        self.cluster = SimulatedCluster(ProcessRaft, N, latency=0.01)
+        self.monitor = ConvergenceMonitor(self.cluster.processes)
+
+    def tearDown(self) -> None:
+        self.monitor.close()
+
+    def test_election(self):
+        """The initiator wins with a majority of votes"""
+        self.cluster.start_election(0)
+        self.cluster.run()
+        self.assertEqual(self.monitor.leader, 0)
+        self.assertEqual(self.cluster.processes[0].term, 1)
+        # every process votes once and hears the coordinator once
+        self.assertEqual(self.cluster.msg_count, 3 * (N-1))
+
+    def test_leader_failure(self):
+        """A new leader is elected in a newer term after the leader died"""
+        self.cluster.start_election(0)
+        self.cluster.run()
+        self.cluster.kill(0)
+        self.cluster.start_election(N-1)
+        self.cluster.run()
+        self.assertEqual(self.monitor.leader, N-1)
+        self.assertEqual(self.cluster.processes[1].term, 2)
+
+    def test_concurrent_candidates(self):
+        """Candidates of the same term split the votes, only one of them is elected"""
+        for i in range(N):
+            self.cluster.start_election(i)
+        self.cluster.run(until=10)
+        self.assertIsNotNone(self.monitor.leader)
+        leaders = [p for p in self.cluster.processes if p.state == COORDINATOR]
+        self.assertEqual(len(leaders), 1)
+
+    def test_no_majority(self):
+        """No leader is elected while a majority is dead"""
+        for i in range(N // 2 + 1):
+            self.cluster.kill(i)
+        self.cluster.start_election(N-1)
+        # the candidate keeps retrying in new terms
+        self.cluster.run(until=10)
+        self.assertIsNone(self.monitor.leader)
+        self.assertGreater(self.cluster.processes[N-1].term, 1)
+
+    def test_message_without_term(self):
+        """Messages without a term are dropped"""
+        process = self.cluster.processes[0]
+        process.message_handler(1, ELECTION)
+        process.message_handler(1, I_AM_COORDINATOR)
+        self.assertEqual(process.term, 0)
+        self.assertIsNone(process.get_coordinator())
+        self.assertEqual(self.cluster.msg_count, 0)
+
+
+class TestProcessBase(unittest.TestCase):
+    """The runtime can only be used through an algorithm"""
+
+    def test_abstract_hooks(self):
+        """An algorithm has to implement every hook"""
+        class Partial(ProcessBase):
+            def get_coordinator(self):
+                return None
+
+        self.assertRaises(TypeError, ProcessBase, 0)
+        self.assertRaises(TypeError, Partial, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from event_trace import TraceRecorder, read_trace
+from replay import Replay, recorded_states
+from simulation import SimulatedCluster
+
+N = 5
+
+
+class TestReplay(unittest.TestCase):
+    """Test replaying traces of simulated elections"""
+
+    def setUp(self) -> None:
+        """Create a trace file"""
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, "election.trace")
+
+    def tearDown(self) -> None:
+        """Remove the trace file"""
+        os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def record(self, process_cls):
+        """Trace an election, the death of its coordinator and the election found by the failure detector"""
+        cluster = SimulatedCluster(process_cls, N, latency=0.01)
+        recorder = TraceRecorder(self.path)
+        for process in cluster.processes:
+            recorder.attach(process)
+        cluster.start_heartbeats(interval=0.1)
+        cluster.start_election(0)
+        cluster.run(until=1)
+        cluster.kill(N-1)
+        cluster.run(until=5)
+        recorder.close()
+        return cluster, read_trace(self.path)
+
+    def test_same_algorithm(self):
+        """Replaying a trace with the recorded algorithm ends in the recorded states"""
+        for process_cls in (ProcessOriginal, ProcessImproved):
+            cluster, records = self.record(process_cls)
+            replay = Replay(records, process_cls)
+            self.assertIsNone(replay.run(), replay.describe())
+            self.assertEqual(replay.states(), {p.get_id(): p.state for p in cluster.processes})
+            self.assertEqual(replay.states(), recorded_states(records))
+
+    def test_divergence(self):
+        """Replaying with the other algorithm stops at the first divergent record"""
+        _, records = self.record(ProcessOriginal)
+        replay = Replay(records, ProcessImproved)
+        index = replay.run()
+        self.assertIsNotNone(index)
+        # the prefix before the divergence replays cleanly
+        prefix = Replay(records, ProcessImproved)
+        self.assertIsNone(prefix.run(until=index))
+        self.assertEqual(prefix.position, index)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_orginal import ProcessOriginal
+from convergence import ConvergenceMonitor
+from rtt import RttEstimator
+from simulation import SimulatedCluster
+
+N = 5
+
+
+class TestRttEstimator(unittest.TestCase):
+    """Test the adaptive OK timeout"""
+
+    def test_initial(self):
+        """The timeout is the initial one until the first sample"""
+        self.assertEqual(RttEstimator().timeout(), THRESHOLD)
+
+    def test_samples(self):
+        """The timeout follows mean and deviation of the samples"""
+        estimator = RttEstimator(lower=0)
+        estimator.sample(0.1)
+        self.assertAlmostEqual(estimator.timeout(), 0.1 + 4 * 0.05)
+        estimator.sample(0.1)
+        self.assertAlmostEqual(estimator.srtt, 0.1)
+        self.assertAlmostEqual(estimator.rttvar, 0.75 * 0.05)
+        estimator.sample(0.5)
+        self.assertGreater(estimator.timeout(), 0.1 + 4 * 0.75 * 0.05)
+
+    def test_bounds(self):
+        """The timeout stays within its bounds"""
+        estimator = RttEstimator(lower=0.05, upper=1)
+        estimator.sample(0)
+        self.assertEqual(estimator.timeout(), 0.05)
+        estimator.sample(10)
+        self.assertEqual(estimator.timeout(), 1)
+
+    def test_election_after_failure(self):
+        """After a measured election, a dead coordinator is replaced within the adapted timeout"""
+        cluster = SimulatedCluster(ProcessOriginal, N, latency=0.01)
+        monitor = ConvergenceMonitor(cluster.processes)
+        agreed = []
+        monitor.add_callback(lambda leader: agreed.append((leader, cluster.simulator.now)))
+        cluster.start_election(0)
+        cluster.run()
+        self.assertLess(cluster.processes[N-2].threshold, THRESHOLD)
+        cluster.kill(N-1)
+        start = cluster.simulator.now
+        cluster.start_election(0)
+        cluster.run()
+        leader, when = agreed[-1]
+        self.assertEqual(leader, N-2)
+        self.assertLess(when - start, THRESHOLD)
+
+
+if __name__ == "__main__":
+    unittest.main()
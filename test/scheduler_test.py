@@ -0,0 +1,56 @@
+import threading
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from convergence import wait_for_leader
+from scheduler import PoolCluster
+
+# Shorter OK threshold, so the tests only wait as long as an election takes
+TEST_THRESHOLD = 0.2
+TIMEOUT = 10
+
+
+class PoolSchedulerTests(unittest.TestCase):
+    """Testing elections with processes multiplexed on a worker pool"""
+
+    def test_election_original(self):
+        """Test election with the original algorithm"""
+        N = 5
+        cluster = PoolCluster(ProcessOriginal, N)
+        for process in cluster.processes:
+            process.threshold = TEST_THRESHOLD
+        cluster.start()
+        cluster.start_election(0)
+        self.assertEqual(wait_for_leader(cluster.processes, TIMEOUT), N-1)
+
+        for i in range(N-1):
+            self.assertEqual(cluster.processes[i].state, NORMAL)
+            self.assertEqual(cluster.processes[i].coordinator, N-1)
+        self.assertEqual(cluster.processes[N-1].state, COORDINATOR)
+        self.assertEqual(cluster.msg_count, 24)
+        cluster.stop()
+
+    def test_election_improved(self):
+        """Test election with many improved processes and a bounded number of threads"""
+        N = 2000
+        threads_before = threading.active_count()
+        cluster = PoolCluster(ProcessImproved, N, max_workers=4)
+        cluster.start()
+        cluster.start_election(0)
+        # every OK arrives before the threshold, so the election does not wait for it
+        self.assertEqual(wait_for_leader(cluster.processes, TIMEOUT), N-1)
+
+        # 4 workers and the timer thread
+        self.assertLessEqual(threading.active_count() - threads_before, 5)
+        for i in range(N-1):
+            self.assertEqual(cluster.processes[i].current_coordinator, N-1)
+        self.assertEqual(cluster.processes[N-1].state, COORDINATOR)
+        self.assertEqual(cluster.msg_count, 3 * (N-1) + 1)
+        cluster.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from simulation import SimulatedCluster, Simulator
+
+
+class TestSimulator(unittest.TestCase):
+    """Test the event scheduler in simulation.py"""
+
+    def test_event_order(self):
+        """Events run in time order, and in FIFO order at equal times"""
+        simulator = Simulator()
+        order = []
+        simulator.schedule(2, order.append, "c")
+        simulator.schedule(1, order.append, "a")
+        simulator.schedule(1, order.append, "b")
+        self.assertEqual(simulator.run(), 2)
+        self.assertEqual(order, ["a", "b", "c"])
+
+    def test_run_until(self):
+        """run() stops at the given virtual time"""
+        simulator = Simulator()
+        order = []
+        simulator.schedule(1, order.append, "a")
+        simulator.schedule(5, order.append, "b")
+        self.assertEqual(simulator.run(until=3), 3)
+        self.assertEqual(order, ["a"])
+
+    def test_cancel(self):
+        """A cancelled event does not run and does not advance the clock"""
+        simulator = Simulator()
+        order = []
+        simulator.schedule(1, order.append, "a")
+        simulator.cancel(simulator.schedule(5, order.append, "b"))
+        self.assertEqual(simulator.run(), 1)
+        self.assertEqual(order, ["a"])
+
+
+class SimulationTestsOriginal(unittest.TestCase):
+    """Simulated elections with the original bully algorithm"""
+
+    def setUp(self) -> None:
+        self.N = 5
+        self.cluster = SimulatedCluster(ProcessOriginal, self.N)
+        self.all_processes = self.cluster.processes
+
+    def test_election(self):
+        """Test election"""
+        self.cluster.start_election(0)
+        self.cluster.run()
+
+        for i in range(self.N-1):
+            self.assertEqual(self.all_processes[i].state, NORMAL)
+            self.assertEqual(self.all_processes[i].coordinator, self.N-1)
+        self.assertEqual(self.all_processes[self.N-1].state, COORDINATOR)
+        self.assertEqual(self.cluster.msg_count, 24)
+
+    def test_coordinator_death(self):
+        """Test coordinator death"""
+        self.cluster.start_election(0)
+        self.cluster.run()
+        self.cluster.kill(self.N-1)
+        self.cluster.start_election(0)
+        self.cluster.run()
+
+        for i in range(self.N-2):
+            self.assertEqual(self.all_processes[i].state, NORMAL)
+            self.assertEqual(self.all_processes[i].coordinator, self.N-2)
+        self.assertEqual(self.all_processes[self.N-2].state, COORDINATOR)
+
+    def test_deterministic(self):
+        """Two runs of the same scenario give the same result"""
+        self.cluster.start_election(2)
+        end = self.cluster.run()
+        other = SimulatedCluster(ProcessOriginal, self.N)
+        other.start_election(2)
+        self.assertEqual(other.run(), end)
+        self.assertEqual(other.msg_count, self.cluster.msg_count)
+
+    def test_service_time(self):
+        """Messages that arrive at a busy process queue up and are handled service_time apart"""
+        cluster = SimulatedCluster(ProcessOriginal, self.N, service_time=0.1)
+        handled = []
+        coordinator = cluster.processes[self.N-1]
+        dispatch = coordinator.dispatch
+        coordinator.dispatch = lambda message: handled.append(cluster.simulator.now) or dispatch(message)
+        for i in range(self.N-1):
+            cluster.start_election(i)
+        self.assertEqual(coordinator.message_queue.depth, self.N-1)
+        cluster.run()
+        self.assertEqual(len(handled), self.N-1)
+        for i, when in enumerate(handled):
+            self.assertAlmostEqual(when, 0.1 * i)
+        self.assertEqual(coordinator.message_queue.depth, 0)
+        self.assertEqual(cluster.processes[0].coordinator, self.N-1)
+
+
+class SimulationTestsImproved(unittest.TestCase):
+    """Simulated elections with the improved bully algorithm"""
+
+    def setUp(self) -> None:
+        self.N = 5
+        self.cluster = SimulatedCluster(ProcessImproved, self.N)
+        self.all_processes = self.cluster.processes
+
+    def test_election(self):
+        """Test election"""
+        self.cluster.start_election(0)
+        self.cluster.run()
+
+        for i in range(self.N-1):
+            self.assertEqual(self.all_processes[i].state, NORMAL)
+            self.assertEqual(
+                self.all_processes[i].current_coordinator, self.N-1)
+        self.assertEqual(self.all_processes[self.N-1].state, COORDINATOR)
+        self.assertEqual(self.cluster.msg_count, 13)
+
+    def test_coordinator_death(self):
+        """Test coordinator death"""
+        self.cluster.start_election(0)
+        self.cluster.run()
+        self.cluster.kill(self.N-1)
+        self.cluster.start_election(0)
+        self.cluster.run()
+
+        for i in range(self.N-2):
+            self.assertEqual(self.all_processes[i].state, NORMAL)
+            self.assertEqual(
+                self.all_processes[i].current_coordinator, self.N-2)
+        self.assertEqual(self.all_processes[self.N-2].state, COORDINATOR)
+
+    def test_sparse_ids(self):
+        """Processes do not need contiguous ids"""
+        ids = [5, 17, 230, 9001]
+        cluster = SimulatedCluster(ProcessImproved, ids)
+        cluster.start_election(17)
+        cluster.run()
+        self.assertEqual(cluster.peers.get(9001).state, COORDINATOR)
+        for _id in ids[:-1]:
+            self.assertEqual(cluster.peers.get(_id).current_coordinator, 9001)
+
+    def test_large_cluster(self):
+        """A large election finishes without threads or sleeps"""
+        N = 10000
+        cluster = SimulatedCluster(ProcessImproved, N)
+        cluster.start_election(0)
+        cluster.run()
+        self.assertEqual(cluster.processes[N-1].state, COORDINATOR)
+        self.assertEqual(cluster.processes[0].current_coordinator, N-1)
+        self.assertEqual(cluster.msg_count, 3 * (N-1) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
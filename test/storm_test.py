@@ -0,0 +1,79 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+from bully_improved import ProcessImproved
+from bully_orginal import ProcessOriginal
+from priority_mailbox import PriorityMailbox
+from simulation import SimulatedCluster
+from storm import run_storm, storm_schedule
+
+N = 20
+
+
+class TestStormSchedule(unittest.TestCase):
+    """Test picking initiators and start times"""
+
+    def test_all(self):
+        """By default every live process starts at once"""
+        self.assertEqual(storm_schedule(range(5)), [(0.0, i) for i in range(5)])
+
+    def test_subset(self):
+        """A fraction or a count of the processes starts, within the jitter"""
+        schedule = storm_schedule(range(100), 0.1, jitter=0.5, seed=1)
+        self.assertEqual(len(schedule), 10)
+        self.assertEqual(schedule, sorted(schedule))
+        for delay, _id in schedule:
+            self.assertTrue(0 <= delay <= 0.5)
+        self.assertEqual(len(storm_schedule(range(100), 3)), 3)
+        self.assertEqual(storm_schedule(range(100), 0.1, seed=1), storm_schedule(range(100), 0.1, seed=1))
+
+
+class TestStorm(unittest.TestCase):
+    """Storms of elections on the simulator"""
+
+    def test_original(self):
+        """All elections of the original algorithm merge into the one of the lowest initiator"""
+        report = run_storm(ProcessOriginal, N, jitter=0.01)
+        self.assertEqual(report["leader"], N-2)
+        self.assertEqual(report["initiators"], N-1)
+        self.assertEqual(report["amplification"], 1)
+        self.assertGreaterEqual(report["time_to_leader"], THRESHOLD)
+
+    def test_improved(self):
+        """Concurrent initiators of the improved algorithm each ask all higher processes"""
+        report = run_storm(ProcessImproved, N)
+        self.assertEqual(report["leader"], N-2)
+        self.assertGreater(report["amplification"], 1)
+        # process 0 gets an OK from every higher live process at once
+        self.assertEqual(report["inbox_high_water"], N-2)
+        subset = run_storm(ProcessImproved, N, initiators=5, jitter=0.01)
+        self.assertEqual(subset["leader"], N-2)
+        self.assertLess(subset["messages"], report["messages"])
+
+    def test_priority_mailbox(self):
+        """When messages queue up for about the OK threshold, FIFO inboxes time out and elect again,
+        the priority mailbox agrees sooner and sends fewer messages"""
+        for process_cls, n, service_time in ((ProcessOriginal, 60, 0.04), (ProcessImproved, 100, 0.03)):
+            fifo = run_storm(process_cls, n, jitter=0.5, seed=1, service_time=service_time)
+            priority = run_storm(process_cls, n, jitter=0.5, seed=1, service_time=service_time,
+                                 mailbox=PriorityMailbox)
+            self.assertEqual(fifo["leader"], n-2)
+            self.assertEqual(priority["leader"], n-2)
+            self.assertLess(priority["time_to_leader"], fifo["time_to_leader"] - THRESHOLD / 2)
+            self.assertLess(priority["messages"], fifo["messages"])
+            self.assertEqual(priority["mailbox"], "PriorityMailbox")
+
+    def test_inbox_depth(self):
+        """The simulated inbox counts messages that have not been handled yet"""
+        cluster = SimulatedCluster(ProcessImproved, 3, latency=0.1)
+        cluster.start_election(0)
+        self.assertEqual(cluster.processes[1].message_queue.depth, 1)
+        cluster.run()
+        for process in cluster.processes:
+            self.assertEqual(process.message_queue.depth, 0)
+        self.assertEqual(cluster.processes[0].message_queue.high_water, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
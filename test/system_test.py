@@ -1,10 +1,14 @@
 import unittest
 import sys
 sys.path.insert(0, "./src")
-from time import sleep
 from types_ import *
 from bully_improved import ProcessImproved
 from bully_orginal import ProcessOriginal
+from convergence import ConvergenceMonitor
+
+# Shorter OK threshold, so the tests only wait as long as an election takes
+TEST_THRESHOLD = 0.2
+TIMEOUT = 10
 
 
 class SystemTestsOriginal(unittest.TestCase):
@@ -19,6 +23,8 @@ class SystemTestsOriginal(unittest.TestCase):
         # inform each process of all the other all_processes by adding them to the process list and remove self from list
         for i in range(self.N):
             self.all_processes[i].processes = self.all_processes
+            self.all_processes[i].threshold = TEST_THRESHOLD
+        self.monitor = ConvergenceMonitor(self.all_processes)
 
         # start processes
         for p in self.all_processes:
@@ -37,7 +43,7 @@ class SystemTestsOriginal(unittest.TestCase):
         self.all_processes[0].start_election()
 
         # wait for convergence
-        sleep(5)
+        self.assertEqual(self.monitor.wait(TIMEOUT), self.N-1)
 
         # check that all all_processes have the correct state
         for i in range(self.N-2):
@@ -52,13 +58,12 @@ class SystemTestsOriginal(unittest.TestCase):
         """Test coordinator death"""
         # start election at lowest priority process
         self.all_processes[0].start_election()
-        sleep(10)
+        self.assertEqual(self.monitor.wait(TIMEOUT), self.N-1)
         # kill coordinator
         self.all_processes[self.N-1].kill()
-        sleep(2)
         # simulate process 0 finding out about coordinator death and starting election
         self.all_processes[0].start_election()
-        sleep(10)
+        self.assertEqual(self.monitor.wait(TIMEOUT), self.N-2)
 
         # check that all all_processes have the correct state
         for i in range(self.N-3):
@@ -82,6 +87,8 @@ class SystemTestsImproved(unittest.TestCase):
         # inform each process of all the other all_processes by adding them to the process list and remove self from list
         for i in range(self.N):
             self.all_processes[i].processes = self.all_processes
+            self.all_processes[i].threshold = TEST_THRESHOLD
+        self.monitor = ConvergenceMonitor(self.all_processes)
 
         # start processes
         for p in self.all_processes:
@@ -100,7 +107,7 @@ class SystemTestsImproved(unittest.TestCase):
         self.all_processes[0].start_election()
 
         # wait for convergence
-        sleep(10)
+        self.assertEqual(self.monitor.wait(TIMEOUT), self.N-1)
 
         # check that all all_processes have the correct state
         for i in range(self.N-2):
@@ -116,14 +123,12 @@ class SystemTestsImproved(unittest.TestCase):
         """Test coordinator death"""
         # start election at lowest priority process
         self.all_processes[0].start_election()
-        sleep(10)
+        self.assertEqual(self.monitor.wait(TIMEOUT), self.N-1)
         # kill coordinator
         self.all_processes[self.N-1].kill()
-        sleep(2)
         # simulate process 0 finding out about coordinator death and starting election
         self.all_processes[0].start_election()
-
-        sleep(10)
+        self.assertEqual(self.monitor.wait(TIMEOUT), self.N-2)
 
         # check that all all_processes have the correct state
         for i in range(self.N-3):
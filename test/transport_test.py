@@ -0,0 +1,98 @@
+import json
+import subprocess
+import time
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from queue import Queue
+from types_ import *
+from transport import CONNECT_TIMEOUT, RemoteProcess, TcpTransport, UdpTransport
+
+
+class Receiver:
+    """Minimal process that only collects enqueued messages"""
+
+    def __init__(self, _id):
+        self._id = _id
+        self.message_queue = Queue()
+
+    def get_id(self):
+        return self._id
+
+    def enqueue_message(self, sender_id, msg_type, payload=None):
+        self.message_queue.put((msg_type, sender_id, payload))
+
+
+class TransportTests(unittest.TestCase):
+    """Test sending messages between two transports on localhost"""
+
+    def check_transport(self, transport_cls, base_port):
+        sender = transport_cls(0, base_port)
+        receiver = transport_cls(1, base_port)
+        process = Receiver(1)
+        receiver.start(process)
+        remote = RemoteProcess(1, sender)
+        try:
+            remote.enqueue_message(0, ELECTION, 3)
+            remote.enqueue_message(0, I_AM_COORDINATOR)
+            self.assertEqual(process.message_queue.get(timeout=1), (ELECTION, 0, 3))
+            self.assertEqual(process.message_queue.get(timeout=1), (I_AM_COORDINATOR, 0, 0))
+        finally:
+            sender.close()
+            receiver.close()
+
+    def test_udp(self):
+        """Test UDP transport"""
+        self.check_transport(UdpTransport, 47100)
+
+    def test_tcp(self):
+        """Test TCP transport"""
+        self.check_transport(TcpTransport, 47200)
+
+    def test_tcp_close(self):
+        """close closes the accepted connections and stops their receiver threads"""
+        sender = TcpTransport(0, 47300)
+        receiver = TcpTransport(1, 47300)
+        process = Receiver(1)
+        receiver.start(process)
+        try:
+            RemoteProcess(1, sender).enqueue_message(0, ELECTION, 1)
+            self.assertEqual(process.message_queue.get(timeout=1), (ELECTION, 0, 1))
+            self.assertEqual(len(receiver.accepted), 1)
+            self.assertEqual(len(receiver.receivers), 2)
+        finally:
+            receiver.close()
+            sender.close()
+        self.assertEqual(receiver.accepted, set())
+        for thread in receiver.receivers:
+            self.assertFalse(thread.is_alive())
+
+    def test_tcp_unreachable(self):
+        """A peer that can not be reached costs one connection attempt, later sends are dropped at once"""
+        sender = TcpTransport(0, 47250)
+        try:
+            sender.send(1, ELECTION, 0)
+            self.assertIn(1, sender.unreachable)
+            start = time.perf_counter()
+            for _ in range(100):
+                sender.send(1, ELECTION, 0)
+            self.assertLess(time.perf_counter() - start, CONNECT_TIMEOUT)
+        finally:
+            sender.close()
+
+
+class LauncherTests(unittest.TestCase):
+    """Test the multi-process cluster launcher"""
+
+    def test_launch(self):
+        """Elect a leader among OS processes talking UDP"""
+        output = subprocess.check_output(
+            [sys.executable, "src/launcher.py", "--algorithm", "original", "--nodes", "3",
+             "--duration", str(THRESHOLD + 1), "--base-port", "47300"], text=True)
+        result = json.loads(output)
+        self.assertEqual(result["leaders"], [2])
+        self.assertEqual(result["msg_count"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -65,7 +65,7 @@ class TestBullyOriginal(unittest.TestCase):
         for i in range(self.N-1):
             process = self.all_processes[i]
             self.assertEqual(process.message_queue.get(),
-                             (1, self.N-1))
+                             (1, self.N-1, 0))
             self.assertEqual(process.state, NORMAL)
 
     def test_kill(self):
@@ -139,7 +139,7 @@ class TestBullyImproved(unittest.TestCase):
         for i in range(self.N-1):
             process = self.all_processes[i]
             self.assertEqual(process.message_queue.get(),
-                             (1, self.N-1))
+                             (1, self.N-1, 0))
             self.assertEqual(process.state, NORMAL)
 
     def test_kill(self):
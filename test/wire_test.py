@@ -0,0 +1,44 @@
+import unittest
+import sys
+sys.path.insert(0, "./src")
+from types_ import *
+import wire
+
+
+class WireTests(unittest.TestCase):
+    """Test the binary wire format"""
+
+    def test_round_trip(self):
+        """A message decodes to what was encoded"""
+        data = wire.encode(ELECTION, 7, 3, b"abc")
+        self.assertEqual(len(data), wire.message_size(3))
+        msg_type, sender_id, epoch, payload, end = wire.decode(data)
+        self.assertEqual((msg_type, sender_id, epoch, bytes(payload)), (ELECTION, 7, 3, b"abc"))
+        self.assertEqual(end, len(data))
+
+    def test_encode_into(self):
+        """Messages can be written at any offset of an existing buffer"""
+        buffer = bytearray(2 * wire.message_size())
+        offset = wire.encode_into(buffer, 0, OK, 1)
+        offset = wire.encode_into(buffer, offset, I_AM_COORDINATOR, -1, 9)
+        self.assertEqual(offset, len(buffer))
+        self.assertEqual(wire.decode(buffer, wire.message_size())[:3], (I_AM_COORDINATOR, -1, 9))
+
+    def test_payload_is_zero_copy(self):
+        """Decoded payloads are views into the buffer"""
+        buffer = bytearray(wire.encode(OK, 1, 0, b"xy"))
+        payload = wire.decode(buffer)[3]
+        buffer[-1] = ord("z")
+        self.assertEqual(bytes(payload), b"xz")
+
+    def test_batch(self):
+        """A batch decodes to the encoded messages in order"""
+        messages = [(ELECTION, 0), (OK, 1, 2), (YOU_ARE_COORDINATOR, 3, 4, b"p")]
+        buffer = wire.encode_batch(messages)
+        decoded = [(msg_type, sender_id, epoch, bytes(payload))
+                   for msg_type, sender_id, epoch, payload in wire.decode_batch(buffer)]
+        self.assertEqual(decoded, [(ELECTION, 0, 0, b""), (OK, 1, 2, b""), (YOU_ARE_COORDINATOR, 3, 4, b"p")])
+
+
+if __name__ == "__main__":
+    unittest.main()